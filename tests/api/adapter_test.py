@@ -54,6 +54,12 @@ class TestReprAdapter(TestCase):
         expected = dict(one=1, two=2, three=3, four=4)
         assert_equal(self.adapter.get_repr(), expected)
 
+    def test_select(self):
+        self.adapter.get_four = mock.Mock()
+        self.adapter.translators["four"] = self.adapter.get_four
+        assert_equal(self.adapter.select(["one", "three"]).get_repr(), dict(one=1, three=3))
+        assert not self.adapter.get_four.called
+
 
 class SampleClassStub:
     def __init__(self):
@@ -0,0 +1,205 @@
+from unittest import mock
+
+import pytest
+from twisted.internet import defer
+from twisted.web import server
+
+from tron.api import async_resource
+from tron.api.async_resource import ApiPool
+from tron.api.async_resource import AsyncResource
+from tron.api.streaming import StreamingResponse
+from tron.utils.rwlock import ReadWriteLock
+
+
+class ThreadCalls:
+    """Stands in for thread pools, so tests choose when calls finish."""
+
+    def __init__(self):
+        self.calls = []
+
+    def defer_to_thread_pool(self, reactor, pool, fn, *args):
+        d = defer.Deferred()
+        self.calls.append((d, fn, args))
+        return d
+
+    def run(self, index=0):
+        d, fn, args = self.calls.pop(index)
+        defer.maybeDeferred(fn, *args).chainDeferred(d)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    pools = {
+        async_resource.LISTING_POOL: ApiPool(async_resource.LISTING_POOL, 2),
+        async_resource.LOGS_POOL: ApiPool(async_resource.LOGS_POOL, 1),
+    }
+    with mock.patch.object(AsyncResource, "pools", pools), mock.patch.object(AsyncResource, "lock", ReadWriteLock()):
+        yield
+
+
+@pytest.fixture
+def thread_calls():
+    thread_calls = ThreadCalls()
+    with mock.patch(
+        "tron.api.async_resource.threads.deferToThreadPool",
+        autospec=True,
+        side_effect=thread_calls.defer_to_thread_pool,
+    ):
+        yield thread_calls
+
+
+def build_request():
+    request = mock.create_autospec(server.Request, method=b"GET")
+    request.notifyFinish.return_value = defer.Deferred()
+    return request
+
+
+class Resource:
+    def __init__(self):
+        self.calls = []
+
+    @AsyncResource.bounded
+    def render_GET(self, request):
+        self.calls.append("GET")
+        return b"read"
+
+    @AsyncResource.exclusive
+    def render_POST(self, request):
+        self.calls.append("POST")
+        return b"write"
+
+    @AsyncResource.snapshot
+    def render_HEAD(self, request):
+        self.calls.append("HEAD")
+        return b"snapshot"
+
+
+class LogsResource(Resource):
+    api_pool = async_resource.LOGS_POOL
+
+
+def test_bounded(thread_calls):
+    request = build_request()
+    assert Resource().render_GET(request) == server.NOT_DONE_YET
+    thread_calls.run()
+    request.write.assert_called_once_with(b"read")
+    request.finish.assert_called_once_with()
+
+
+def test_exclusive_waits_for_reads(thread_calls):
+    resource = Resource()
+    resource.render_GET(build_request())
+    request = build_request()
+    resource.render_POST(request)
+    assert resource.calls == []
+
+    thread_calls.run()
+    assert resource.calls == ["GET", "POST"]
+    request.write.assert_called_once_with(b"write")
+    assert AsyncResource.lock.writer is False
+
+
+def test_reads_wait_for_exclusive(thread_calls):
+    resource = Resource()
+    resource.render_GET(build_request())
+    resource.render_POST(build_request())
+    resource.render_GET(build_request())
+    thread_calls.run()
+    assert resource.calls == ["GET", "POST"]
+    # The read queued behind the write runs once it's done
+    assert len(thread_calls.calls) == 1
+
+
+def test_snapshot_doesnt_wait_for_exclusive(thread_calls):
+    resource = Resource()
+    resource.render_GET(build_request())
+    resource.render_POST(build_request())
+    request = build_request()
+    resource.render_HEAD(request)
+    assert len(thread_calls.calls) == 2
+
+    thread_calls.run(1)
+    request.write.assert_called_once_with(b"snapshot")
+    assert AsyncResource.lock.readers == 1
+
+
+def test_pool_size(thread_calls):
+    resource = LogsResource()
+    resource.render_GET(build_request())
+    resource.render_GET(build_request())
+    assert len(thread_calls.calls) == 1
+    thread_calls.run()
+    assert len(thread_calls.calls) == 1
+
+
+def test_pools_independent(thread_calls):
+    LogsResource().render_GET(build_request())
+    LogsResource().render_GET(build_request())
+    Resource().render_GET(build_request())
+    assert len(thread_calls.calls) == 2
+
+
+def test_cancelled_while_queued(thread_calls):
+    resource = LogsResource()
+    resource.render_GET(build_request())
+    request = build_request()
+    resource.render_GET(request)
+    request.notifyFinish.return_value.errback(Exception("disconnected"))
+
+    thread_calls.run()
+    assert resource.calls == ["GET"]
+    assert thread_calls.calls == []
+    assert not request.write.called
+    assert not request.processingFailed.called
+    assert AsyncResource.pools[async_resource.LOGS_POOL].semaphore.tokens == 1
+
+
+def test_cancelled_while_running(thread_calls):
+    resource = Resource()
+    request = build_request()
+    resource.render_GET(request)
+    request.notifyFinish.return_value.errback(Exception("disconnected"))
+    assert AsyncResource.lock.readers == 1
+
+    thread_calls.run()
+    assert not request.write.called
+    assert AsyncResource.lock.readers == 0
+
+
+def test_cancelled_exclusive(thread_calls):
+    resource = Resource()
+    resource.render_GET(build_request())
+    request = build_request()
+    resource.render_POST(request)
+    request.notifyFinish.return_value.errback(Exception("disconnected"))
+    thread_calls.run()
+    assert resource.calls == ["GET"]
+    assert AsyncResource.lock.get_queue_depth() == 0
+
+
+def test_error(thread_calls):
+    class BrokenResource:
+        @AsyncResource.bounded
+        def render_GET(self, request):
+            raise ValueError("oops")
+
+    request = build_request()
+    BrokenResource().render_GET(request)
+    thread_calls.run()
+    assert request.processingFailed.call_count == 1
+    assert AsyncResource.lock.readers == 0
+
+
+def test_streaming_response(thread_calls):
+    response = mock.create_autospec(StreamingResponse, instance=True)
+
+    class StreamingResource:
+        @AsyncResource.bounded
+        def render_GET(self, request):
+            return response
+
+    request = build_request()
+    StreamingResource().render_GET(request)
+    thread_calls.run()
+    response.start.assert_called_once_with(request, run_in_thread=mock.ANY)
+    assert not request.finish.called
@@ -0,0 +1,157 @@
+import json
+from unittest import mock
+
+import pytest
+from twisted.internet import task
+
+from tron.api import output
+from tron.core.actionrun import KubernetesActionRun
+from tron.core.actionrun import SSHActionRun
+from tron.utils.timerqueue import TimerQueue
+
+
+@pytest.fixture
+def stdout_path(tmp_path):
+    return tmp_path / ".stdout"
+
+
+@pytest.fixture
+def action_run():
+    return mock.create_autospec(SSHActionRun, instance=True, is_done=False)
+
+
+@pytest.fixture
+def run_output(action_run, stdout_path):
+    with mock.patch("tron.api.output.adapter.ActionRunAdapter", autospec=True) as mock_adapter:
+        mock_adapter.return_value.get_output_path.side_effect = (
+            lambda _: str(stdout_path) if stdout_path.exists() else None
+        )
+        yield output.ActionRunOutput(action_run, mock.Mock(), "stdout", num_lines=2)
+
+
+def write(path, content):
+    with open(path, "ab") as fh:
+        fh.write(content)
+
+
+class TestActionRunOutput:
+    def test_read_no_file(self, run_output):
+        assert run_output.read() == {"lines": [], "offset": None, "complete": False}
+
+    def test_read_from_token(self, run_output, action_run, stdout_path):
+        write(stdout_path, b"one\ntwo\nthree\nfo")
+        result = run_output.read()
+        assert result["lines"] == ["two", "three"]
+        assert not result["complete"]
+
+        write(stdout_path, b"ur\n")
+        result = run_output.read(result["offset"])
+        assert result["lines"] == ["four"]
+
+        action_run.is_done = True
+        assert run_output.read(result["offset"]) == {"lines": [], "offset": result["offset"], "complete": True}
+
+    def test_read_done_with_more_to_read(self, run_output, action_run, stdout_path):
+        action_run.is_done = True
+        write(stdout_path, b"one\ntwo\n")
+        result = run_output.read(max_bytes=4)
+        assert result["lines"] == ["two"]
+        assert result["complete"]
+
+        stat = stdout_path.stat()
+        result = run_output.read(f"{stat.st_dev}-{stat.st_ino}-0", max_bytes=4)
+        assert result["lines"] == ["one"]
+        assert not result["complete"]
+
+    def test_read_log_stream(self):
+        action_run = mock.create_autospec(KubernetesActionRun, instance=True, is_done=False)
+        run_output = output.ActionRunOutput(action_run, mock.Mock(), "stderr", num_lines=1)
+        with mock.patch("tron.api.output.adapter.ActionRunAdapter", autospec=True) as mock_adapter:
+            read_log_stream_parts = mock_adapter.return_value.read_log_stream_parts
+            read_log_stream_parts.return_value = (["one", "two"], [])
+            assert run_output.read() == {"lines": ["two"], "offset": "2", "complete": False}
+            read_log_stream_parts.return_value = (["one", "two", "three"], [])
+            assert run_output.read("2") == {"lines": ["three"], "offset": "3", "complete": False}
+            # the default limit on lines read applies
+            read_log_stream_parts.assert_called_with("stderr")
+        assert run_output.follow_interval == output.PAASTA_FOLLOW_INTERVAL_SECONDS
+
+    def test_read_log_stream_truncated(self):
+        action_run = mock.create_autospec(KubernetesActionRun, instance=True, is_done=False)
+        run_output = output.ActionRunOutput(action_run, mock.Mock(), "stdout", num_lines=1)
+        with mock.patch("tron.api.output.adapter.ActionRunAdapter", autospec=True) as mock_adapter:
+            read_log_stream_parts = mock_adapter.return_value.read_log_stream_parts
+            read_log_stream_parts.return_value = (["one", "two"], ["truncated"])
+            # notices aren't counted in tokens, and are only sent with new lines
+            assert run_output.read("1") == {"lines": ["two", "truncated"], "offset": "2", "complete": False}
+            assert run_output.read("2") == {"lines": [], "offset": "2", "complete": False}
+            # fewer lines than the token, so the read starts again
+            read_log_stream_parts.return_value = (["one"], ["truncated"])
+            assert run_output.read("2") == {"lines": ["one", "truncated"], "offset": "1", "complete": False}
+
+
+class TestOutputFollower:
+    @pytest.fixture(autouse=True)
+    def setup_follower(self, run_output):
+        self.clock = task.Clock()
+        self.run_output = run_output
+        with mock.patch("tron.api.output.timer_queue", TimerQueue(self.clock)):
+            yield
+
+    def start(self, **kwargs):
+        follower = output.OutputFollower(self.run_output, **kwargs)
+        self.request = mock.Mock()
+        self.thread_calls = []
+
+        def run_in_thread(fn):
+            self.thread_calls.append(fn)
+            d = mock.Mock()
+            d.addCallbacks.side_effect = lambda callback, errback: callback(fn())
+            return d
+
+        follower.start(self.request, run_in_thread=run_in_thread)
+        return follower
+
+    def written(self):
+        return b"".join(call.args[0] for call in self.request.write.call_args_list)
+
+    def test_follow(self, action_run, stdout_path):
+        write(stdout_path, b"one\n")
+        follower = self.start()
+        assert json.loads(self.written()) == {"lines": ["one"], "offset": follower.token, "complete": False}
+
+        # nothing new, so the next read waits
+        assert len(self.thread_calls) == 2
+        self.clock.advance(output.FOLLOW_INTERVAL_SECONDS)
+        assert len(self.thread_calls) == 3
+
+        write(stdout_path, b"two\n")
+        action_run.is_done = True
+        self.request.write.reset_mock()
+        self.clock.advance(output.FOLLOW_INTERVAL_SECONDS)
+        assert json.loads(self.written()) == {"lines": ["two"], "offset": follower.token, "complete": True}
+        self.request.finish.assert_called_once_with()
+
+    def test_follow_sse(self, stdout_path):
+        write(stdout_path, b"one\n")
+        follower = self.start(sse=True)
+        event = self.written().decode()
+        assert event.startswith(f"id: {follower.token}\ndata: ")
+        assert event.endswith("\n\n")
+
+        with mock.patch("tron.api.output.time.time", return_value=follower.last_write + output.KEEPALIVE_SECONDS):
+            self.request.write.reset_mock()
+            self.clock.advance(output.FOLLOW_INTERVAL_SECONDS)
+        assert self.written() == b": keepalive\n\n"
+
+    def test_follow_timeout(self, stdout_path):
+        follower = self.start()
+        with mock.patch("tron.api.output.time.time", return_value=follower.started_at + output.MAX_FOLLOW_SECONDS):
+            self.clock.advance(output.FOLLOW_INTERVAL_SECONDS)
+        self.request.finish.assert_called_once_with()
+
+    def test_stop(self):
+        follower = self.start()
+        follower.stopProducing()
+        self.clock.advance(output.FOLLOW_INTERVAL_SECONDS)
+        assert len(self.thread_calls) == 2
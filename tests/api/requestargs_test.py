@@ -8,6 +8,7 @@ from testifycompat import TestCase
 from tron.api.requestargs import get_bool
 from tron.api.requestargs import get_datetime
 from tron.api.requestargs import get_integer
+from tron.api.requestargs import get_list
 from tron.api.requestargs import get_string
 
 
@@ -48,6 +49,13 @@ class TestRequestArgs(TestCase):
     def test_get_string_missing(self):
         assert not get_string(self.request, "missing")
 
+    def test_get_list(self):
+        self._add_arg("fields", "name, status,,runs")
+        assert_equal(get_list(self.request, "fields"), ["name", "status", "runs"])
+
+    def test_get_list_missing(self):
+        assert get_list(self.request, "fields") is None
+
     def test_get_bool(self):
         assert get_bool(self.request, "boolean")
 
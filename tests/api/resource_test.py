@@ -1,26 +1,30 @@
 """
 Test cases for the web services interface to tron
 """
+import json
 from unittest import mock
-from unittest.mock import MagicMock
 
 import pytest
 import staticconf.testing
 import twisted.web.http
 import twisted.web.resource
 import twisted.web.server
+from twisted.internet import defer
 from twisted.web import http
 
-from tests.assertions import assert_call
 from tests.testingutils import autospec_method
 from tron import __version__
 from tron import mcp
 from tron import node
 from tron.api import controller
+from tron.api import output
 from tron.core import job
 from tron.core import jobrun
+from tron.core.change_log import ChangeLog
 from tron.core.job_collection import JobCollection
 from tron.core.job_scheduler import JobScheduler
+from tron.core.jobgraph import JobGraph
+from tron.core.jobgraph import TriggerEdge
 
 with mock.patch(
     "tron.api.async_resource.AsyncResource.bounded",
@@ -32,7 +36,12 @@ with mock.patch(
         lambda fn: fn,
         autospec=None,
     ):
-        from tron.api import resource as www
+        with mock.patch(
+            "tron.api.async_resource.AsyncResource.snapshot",
+            lambda fn: fn,
+            autospec=None,
+        ):
+            from tron.api import resource as www
 
 REQUEST = twisted.web.server.Request(mock.Mock(), None)
 REQUEST.childLink = lambda val: "/jobs/%s" % val
@@ -43,6 +52,10 @@ def build_request(**kwargs):
     return mock.create_autospec(twisted.web.server.Request, args=args)
 
 
+def read_stream(response):
+    return b"".join(response.chunks)
+
+
 @pytest.fixture
 def mock_request():
     return build_request()
@@ -143,6 +156,28 @@ class TestActionRunResource(WWWTestCase):
             response = self.resource.render_GET(request)
         assert response["id"] == self.resource.action_run.id
 
+    def test_render_output_unknown_stream(self, mock_respond):
+        response = self.resource.render_output(build_request(output="stdin"), "stdin", 10)
+        assert "Unknown output" in response["error"]
+        assert mock_respond.call_args[1]["code"] == http.BAD_REQUEST
+
+    def test_render_output(self):
+        request = build_request(output="stdout", offset="1-2-3")
+        with mock.patch("tron.api.resource.output.ActionRunOutput", autospec=True) as mock_output:
+            response = self.resource.render_output(request, "stdout", 10)
+        mock_output.assert_called_once_with(self.action_run, self.job_run, "stdout", 10)
+        mock_output.return_value.read.assert_called_once_with("1-2-3")
+        assert response == mock_output.return_value.read.return_value
+
+    def test_render_output_follow(self):
+        request = build_request(output="stderr", follow="1")
+        request.getHeader.side_effect = {b"accept": b"text/event-stream", b"last-event-id": b"1-2-3"}.get
+        with mock.patch("tron.api.resource.output.ActionRunOutput", autospec=True):
+            response = self.resource.render_output(request, "stderr", 10)
+        assert isinstance(response, output.OutputFollower)
+        assert (response.token, response.sse) == ("1-2-3", True)
+        request.setHeader.assert_any_call(b"content-type", b"text/event-stream")
+
 
 class TestJobrunResource(WWWTestCase):
     @pytest.fixture(autouse=True)
@@ -165,6 +200,9 @@ class TestApiRootResource(WWWTestCase):
     def test__init__(self):
         expected_children = [
             b"jobs",
+            b"schedule_horizon",
+            b"changes",
+            b"triggers",
             b"config",
             b"metrics",
             b"status",
@@ -208,9 +246,11 @@ class TestActionRunHistoryResource(WWWTestCase):
         self.action_runs = [mock.MagicMock(), mock.MagicMock()]
         self.resource = www.ActionRunHistoryResource(self.action_runs)
 
-    def test_render_GET(self, request):
-        response = self.resource.render_GET(request)
-        assert len(response) == len(self.action_runs)
+    def test_render_GET(self, mock_request):
+        with mock.patch("tron.api.resource.adapter.ActionRunAdapter", autospec=True) as mock_adapter:
+            mock_adapter.return_value.get_repr.return_value = {"id": "MASTER.foo.1.bar"}
+            response = self.resource.render_GET(mock_request)
+            assert json.loads(read_stream(response)) == [{"id": "MASTER.foo.1.bar"}] * len(self.action_runs)
 
 
 class TestJobCollectionResource(WWWTestCase):
@@ -220,11 +260,89 @@ class TestJobCollectionResource(WWWTestCase):
         job_collection.get_by_name = lambda name: name if name == "testname" else None
         self.resource = www.JobCollectionResource(job_collection)
 
-    def test_render_GET(self):
-        self.resource.get_data = MagicMock()
-        result = self.resource.render_GET(REQUEST)
-        assert_call(self.resource.get_data, 0, False, False, True, True)
-        assert "jobs" in result
+    @pytest.fixture
+    def mock_job(self):
+        mock_job = mock.Mock(enabled=True)
+        mock_job.get_name.return_value = "MASTER.foo"
+        self.resource.job_collection.get_jobs.return_value = [mock_job]
+        return mock_job
+
+    @pytest.fixture
+    def mock_adapter(self):
+        with mock.patch("tron.api.snapshot.adapter.JobAdapter", autospec=True) as mock_adapter:
+            mock_adapter.return_value.get_repr.return_value = {
+                "name": "MASTER.foo",
+                "status": "enabled",
+                "node_pool": "pool",
+                "action_graph": "graph",
+                "runs": [],
+            }
+            yield mock_adapter
+
+    @pytest.fixture
+    def published(self, mock_job, mock_adapter):
+        with mock.patch("tron.api.snapshot.change_log", ChangeLog()) as self.change_log, mock.patch(
+            "tron.api.resource.change_log", self.change_log
+        ):
+            with mock.patch.object(self.change_log, "wait", autospec=True):
+                self.resource.snapshots.publish()
+                yield
+
+    def test_render_GET(self, mock_job, mock_adapter, published):
+        result = self.resource.render_GET(twisted.web.server.Request(mock.Mock(), None))
+        assert json.loads(read_stream(result)) == {
+            "jobs": [
+                {"name": "MASTER.foo", "status": "enabled", "node_pool": "pool", "action_graph": "graph", "runs": None}
+            ],
+        }
+
+    def test_render_GET_include_job_runs(self, mock_job, mock_adapter, published):
+        request = build_request(include_job_runs="1", include_node_pool="0")
+        result = self.resource.render_GET(request)
+        assert json.loads(read_stream(result)) == {
+            "jobs": [
+                {"name": "MASTER.foo", "status": "enabled", "node_pool": None, "action_graph": "graph", "runs": []}
+            ],
+        }
+        assert not request.setETag.called
+
+    def test_render_GET_page(self, mock_job, mock_adapter, published):
+        request = build_request(namespace="MASTER", state="enabled,running", fields="name", limit="1")
+        result = self.resource.render_GET(request)
+        assert json.loads(read_stream(result)) == {"jobs": [{"name": "MASTER.foo"}], "next_cursor": None}
+
+        request = build_request(namespace="other", limit="1")
+        assert json.loads(read_stream(self.resource.render_GET(request))) == {"jobs": [], "next_cursor": None}
+
+    def test_render_GET_updated_since(self, mock_job, mock_adapter, published):
+        since = self.change_log.version
+        request = build_request(updated_since=str(since), fields="name")
+        assert json.loads(read_stream(self.resource.render_GET(request))) == {"jobs": []}
+
+        self.change_log.record_job(mock_job)
+        request = build_request(updated_since=str(since), fields="name")
+        assert json.loads(read_stream(self.resource.render_GET(request))) == {"jobs": [{"name": "MASTER.foo"}]}
+
+    def test_render_GET_reads_snapshot(self, mock_job, mock_adapter, published):
+        first = read_stream(self.resource.render_GET(twisted.web.server.Request(mock.Mock(), None)))
+        mock_adapter.return_value.get_repr.return_value = {"name": "MASTER.foo", "runs": []}
+        assert read_stream(self.resource.render_GET(twisted.web.server.Request(mock.Mock(), None))) == first
+
+        self.change_log.record_job(mock_job)
+        self.resource.snapshots.publish()
+        assert read_stream(self.resource.render_GET(twisted.web.server.Request(mock.Mock(), None))) != first
+        assert mock_adapter.call_count == 2
+
+    def test_render_GET_not_modified(self, mock_job, mock_adapter, published):
+        request = twisted.web.server.Request(mock.Mock(), None)
+        self.resource.render_GET(request)
+        etag = request.etag
+
+        request = twisted.web.server.Request(mock.Mock(), None)
+        request.method = b"GET"
+        request.requestHeaders.setRawHeaders(b"if-none-match", [etag])
+        assert self.resource.render_GET(request) == b""
+        assert request.code == http.NOT_MODIFIED
 
     def test_getChild(self):
         child = self.resource.getChild(b"testname", mock.Mock())
@@ -261,6 +379,19 @@ class TestJobResource(WWWTestCase):
         result = self.resource.render_GET(mock_request)
         assert result["name"] == self.job_scheduler.get_job().get_name()
 
+    def test_render_GET_filtered(self):
+        self.job_runs.__iter__.return_value = [
+            mock.Mock(run_num=3, state="running"),
+            mock.Mock(run_num=2, state="succeeded"),
+            mock.Mock(run_num=1, state="succeeded"),
+        ]
+        request = build_request(fields="name,runs", before="3", run_state="succeeded", num_runs="1")
+        with mock.patch("tron.api.adapter.JobRunAdapter", autospec=True) as mock_adapter:
+            mock_adapter.return_value.get_repr.return_value = {"id": "foo.2"}
+            result = self.resource.render_GET(request)
+        assert result == {"name": "foo", "runs": [{"id": "foo.2"}]}
+        assert mock_adapter.call_count == 1
+
     def test_get_run_from_identifier_HEAD(self):
         job_run = self.resource.get_run_from_identifier("HEAD")
         self.job_scheduler.get_job_runs.assert_called_with()
@@ -297,6 +428,132 @@ class TestJobResource(WWWTestCase):
         assert resource.action_runs == action_runs
 
 
+class TestScheduleHorizonResource(WWWTestCase):
+    @pytest.fixture(autouse=True)
+    def setup_resource(self):
+        self.job_collection = mock.create_autospec(JobCollection)
+        self.resource = www.ScheduleHorizonResource(self.job_collection)
+
+    @mock.patch("tron.api.resource.schedule_horizon.build_schedule_horizon", autospec=True)
+    def test_render_GET(self, mock_build):
+        response = self.resource.render_GET(build_request(hours="6"))
+        assert response == mock_build.return_value
+        assert mock_build.call_args[0][0] == self.job_collection.get_jobs.return_value
+        assert mock_build.call_args[0][2] == 6
+
+    @mock.patch("tron.api.resource.schedule_horizon.build_schedule_horizon", autospec=True)
+    def test_render_GET_default_hours(self, mock_build):
+        self.resource.render_GET(build_request())
+        assert mock_build.call_args[0][2] == 24
+
+    def test_render_GET_hours_too_large(self, mock_respond):
+        response = self.resource.render_GET(build_request(hours="1000"))
+        assert "error" in response
+        assert mock_respond.call_args[1]["code"] == http.BAD_REQUEST
+
+
+class TestTriggersResource(WWWTestCase):
+    @pytest.fixture(autouse=True)
+    def setup_resource(self):
+        self.mcp = mock.create_autospec(mcp.MasterControlProgram, instance=True)
+        self.mcp.job_graph = mock.create_autospec(JobGraph, instance=True)
+        self.edge = TriggerEdge("MASTER.a.b", "MASTER.c.d", "MASTER.a.b.shortdate.{shortdate}", True)
+        self.resource = www.TriggersResource(self.mcp)
+
+    def test_render_GET_action(self):
+        job_graph = self.mcp.job_graph
+        job_graph.get_trigger_edges.side_effect = lambda name, downstream=False: [self.edge] if downstream else []
+        response = self.resource.render_GET(build_request(action="MASTER.a.b"))
+        assert response == {
+            "action": "MASTER.a.b",
+            "publishes": job_graph.get_published_triggers.return_value,
+            "upstream": [],
+            "downstream": [self.edge._asdict()],
+        }
+
+    def test_render_GET_event(self):
+        self.mcp.job_graph.get_event_waiters.return_value = [self.edge]
+        response = self.resource.render_GET(build_request(event="MASTER.a.b.shortdate.2024-01-01"))
+        assert response == {"event": "MASTER.a.b.shortdate.2024-01-01", "waiting": [self.edge._asdict()]}
+        self.mcp.job_graph.get_event_waiters.assert_called_once_with("MASTER.a.b.shortdate.2024-01-01")
+
+    def test_render_GET_missing_args(self, mock_respond):
+        response = self.resource.render_GET(build_request())
+        assert "error" in response
+        assert mock_respond.call_args[1]["code"] == http.BAD_REQUEST
+
+    def test_render_GET_not_loaded(self, mock_respond):
+        self.mcp.job_graph = None
+        response = self.resource.render_GET(build_request(action="MASTER.a.b"))
+        assert "error" in response
+        assert mock_respond.call_args[1]["code"] == http.SERVICE_UNAVAILABLE
+
+
+class TestChangesResource(WWWTestCase):
+    @pytest.fixture(autouse=True)
+    def setup_resource(self):
+        self.job_collection = mock.create_autospec(JobCollection)
+        self.resource = www.ChangesResource(self.job_collection)
+        with mock.patch("tron.api.resource.change_log", ChangeLog()) as self.change_log:
+            yield
+
+    def test_render_GET_without_since(self):
+        response = self.resource.render_GET(build_request())
+        assert response == {"version": self.change_log.version, "reset": True}
+
+    def test_render_GET_since_too_old(self):
+        response = self.resource.render_GET(build_request(since=str(self.change_log.version - 1)))
+        assert response["reset"]
+
+    @mock.patch("tron.api.resource.adapter", autospec=True)
+    def test_render_GET(self, mock_adapter):
+        since = self.change_log.version
+        job_scheduler = self.job_collection.get_by_name.return_value
+        job_run = job_scheduler.get_job.return_value.runs.get_run_by_num.return_value
+        job_run.job_name, job_run.run_num = "MASTER.foo", 3
+        job_run.action_runs = {"action": mock.Mock(action_name="action")}
+        self.change_log.record_job(mock.Mock(get_name=mock.Mock(return_value="MASTER.foo")))
+        self.change_log.record_job_run(job_run)
+        self.change_log.record_action_run(job_run, job_run.action_runs["action"])
+
+        response = self.resource.render_GET(build_request(since=str(since)))
+        assert response == {
+            "version": since + 3,
+            "reset": False,
+            "jobs": [mock_adapter.JobAdapter.return_value.get_repr.return_value],
+            "job_runs": [mock_adapter.JobRunAdapter.return_value.get_repr.return_value],
+            "action_runs": [mock_adapter.ActionRunAdapter.return_value.get_repr.return_value],
+            "removed_jobs": [],
+            "removed_job_runs": [],
+        }
+        mock_adapter.ActionRunAdapter.assert_called_once_with(job_run.action_runs["action"], job_run)
+
+    def test_render_GET_removed(self):
+        since = self.change_log.version
+        self.change_log.record_job_run_removed(mock.Mock(job_name="MASTER.foo", run_num=3, action_runs=[]))
+        self.change_log.record_job_removed("MASTER.bar")
+        response = self.resource.render_GET(build_request(since=str(since)))
+        assert response["removed_job_runs"] == ["MASTER.foo.3"]
+        assert response["removed_jobs"] == ["MASTER.bar"]
+
+    def test_render_GET_wait(self):
+        since = self.change_log.version
+        request = build_request(since=str(since), wait="30")
+        with mock.patch.object(self.change_log, "wait", autospec=True, return_value=defer.Deferred()) as mock_wait:
+            assert self.resource.render_GET(request) == twisted.web.server.NOT_DONE_YET
+            mock_wait.assert_called_once_with(30)
+            self.change_log.record_job(mock.Mock(get_name=mock.Mock(return_value="MASTER.foo")))
+            with mock.patch.object(self.resource, "render_changes", autospec=True) as mock_render:
+                mock_wait.return_value.callback(True)
+                mock_render.assert_called_once_with(request)
+
+    def test_render_GET_wait_with_changes(self):
+        since = self.change_log.version
+        self.change_log.record_job_removed("MASTER.foo")
+        response = self.resource.render_GET(build_request(since=str(since), wait="30"))
+        assert response["removed_jobs"] == ["MASTER.foo"]
+
+
 class TestConfigResource:
     @pytest.fixture(autouse=True)
     def setup_resource(self):
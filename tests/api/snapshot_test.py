@@ -0,0 +1,245 @@
+import datetime
+import json
+import time
+from unittest import mock
+
+import pytest
+from twisted.internet import task
+
+from tron.api import snapshot
+from tron.core import change_log as change_log_module
+from tron.utils.timerqueue import TimerQueue
+
+ALL = snapshot.JobView(True, True, True, True)
+
+
+def build_action_run_repr(start_time=None, end_time=None, in_delay=None):
+    return {
+        "id": "MASTER.foo.1.bar",
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration": "",
+        "in_delay": in_delay,
+    }
+
+
+def build_job_repr(action_runs=(), start_time=None, end_time=None):
+    return {
+        "name": "MASTER.foo",
+        "node_pool": {"name": "pool"},
+        "action_graph": [{"name": "bar"}],
+        "runs": [
+            {
+                "id": "MASTER.foo.1",
+                "start_time": start_time,
+                "end_time": end_time,
+                "duration": "",
+                "runs": list(action_runs),
+            },
+        ],
+    }
+
+
+def encode(data):
+    return json.dumps(data, default=str).encode()
+
+
+class TestJobSnapshotEntry:
+    def test_render_options(self):
+        entry = snapshot.JobSnapshotEntry("MASTER.foo", 1, build_job_repr([build_action_run_repr()]), 0)
+        rendered = entry.render(snapshot.JobView(True, False, False, True))
+        assert rendered["action_graph"] is None
+        assert rendered["node_pool"] == {"name": "pool"}
+        assert rendered["runs"][0]["runs"] is None
+        assert entry.render(snapshot.JobView(False, False, True, False))["runs"] is None
+        assert entry.render(snapshot.JobView(False, False, True, False))["node_pool"] is None
+        # the entry itself is never changed
+        assert entry.job_repr == build_job_repr([build_action_run_repr()])
+
+    def test_render_refreshes_timers(self):
+        start_time = datetime.datetime(2020, 1, 1, 12, 0)
+        job_repr = build_job_repr([build_action_run_repr(in_delay=30.0)], start_time=start_time)
+        entry = snapshot.JobSnapshotEntry("MASTER.foo", 1, job_repr, published_at=100)
+        assert entry.has_timers
+
+        with mock.patch(
+            "tron.api.snapshot.timeutils.current_time",
+            return_value=start_time + datetime.timedelta(minutes=5),
+            autospec=True,
+        ):
+            run = entry.render(ALL, now=110)["runs"][0]
+        assert run["duration"] == "0:05:00"
+        assert run["runs"][0]["in_delay"] == 20.0
+
+    def test_render_fields(self):
+        job_repr = build_job_repr()
+        job_repr["runs"].append(dict(job_repr["runs"][0], id="MASTER.foo.0"))
+        entry = snapshot.JobSnapshotEntry("MASTER.foo", 1, job_repr, 0)
+        view = ALL._replace(num_runs=1, fields=("name", "runs", "missing"))
+        assert entry.render(view) == {"name": "MASTER.foo", "runs": [job_repr["runs"][0]]}
+        assert entry.render(view._replace(fields=("name",))) == {"name": "MASTER.foo"}
+
+    def test_get_fragment_cached(self):
+        entry = snapshot.JobSnapshotEntry("MASTER.foo", 1, build_job_repr(), 0)
+        mock_encode = mock.Mock(side_effect=encode)
+        fragment = entry.get_fragment(ALL, mock_encode)
+        assert entry.get_fragment(ALL, mock_encode) is fragment
+        entry.get_fragment(snapshot.JobView(False, False, True, True), mock_encode)
+        assert mock_encode.call_count == 2
+
+    def test_get_fragment_with_timers_not_cached(self):
+        job_repr = build_job_repr([build_action_run_repr(start_time=datetime.datetime(2020, 1, 1))])
+        entry = snapshot.JobSnapshotEntry("MASTER.foo", 1, job_repr, 0)
+        mock_encode = mock.Mock(side_effect=encode)
+        entry.get_fragment(ALL, mock_encode)
+        entry.get_fragment(ALL, mock_encode)
+        assert mock_encode.call_count == 2
+        assert entry.is_cacheable(snapshot.JobView(False, False, True, True))
+
+
+def build_entry(name, status="enabled"):
+    return snapshot.JobSnapshotEntry(name, 1, {"name": name, "status": status, "runs": None}, 0)
+
+
+class TestJobSnapshot:
+    @pytest.fixture(autouse=True)
+    def setup_snapshot(self):
+        self.snapshot = snapshot.JobSnapshot(
+            [
+                build_entry("other.a"),
+                build_entry("MASTER.foo_b", status="disabled"),
+                build_entry("MASTER.bar"),
+                build_entry("MASTER.foo_a"),
+            ]
+        )
+
+    def select(self, **kwargs):
+        entries, next_cursor = self.snapshot.select(**kwargs)
+        return [entry.name for entry in entries], next_cursor
+
+    def test_select_all(self):
+        assert self.select() == (["MASTER.bar", "MASTER.foo_a", "MASTER.foo_b", "other.a"], None)
+
+    def test_select_filters(self):
+        assert self.select(namespace="MASTER", states={"enabled"}) == (["MASTER.bar", "MASTER.foo_a"], None)
+        assert self.select(name_prefix="MASTER.foo") == (["MASTER.foo_a", "MASTER.foo_b"], None)
+        assert self.select(names={"other.a", "MASTER.bar"}) == (["MASTER.bar", "other.a"], None)
+        assert self.select(namespace="missing") == ([], None)
+
+    def test_select_pages(self):
+        assert self.select(namespace="MASTER", limit=2) == (["MASTER.bar", "MASTER.foo_a"], "MASTER.foo_a")
+        assert self.select(namespace="MASTER", limit=2, cursor="MASTER.foo_a") == (["MASTER.foo_b"], None)
+        # the cursor needn't be a job which still exists
+        assert self.select(name_prefix="MASTER.", limit=1, cursor="MASTER.c") == (["MASTER.foo_a"], "MASTER.foo_a")
+
+
+def build_job(name):
+    job = mock.Mock(enabled=True)
+    job.get_name.return_value = name
+    return job
+
+
+class TestSnapshotPublisher:
+    @pytest.fixture(autouse=True)
+    def setup_publisher(self):
+        self.clock = task.Clock()
+        timer_queue = TimerQueue(self.clock)
+        with mock.patch("tron.core.change_log.timer_queue", timer_queue), mock.patch(
+            "tron.api.snapshot.timer_queue", timer_queue
+        ), mock.patch("tron.api.snapshot.PUBLISH_BUDGET_SECONDS", 60), mock.patch(
+            "tron.api.snapshot.adapter.JobAdapter", autospec=True
+        ) as self.mock_adapter:
+            self.change_log = change_log_module.ChangeLog()
+            with mock.patch("tron.api.snapshot.change_log", self.change_log):
+                self.mock_adapter.return_value.get_repr.side_effect = lambda: build_job_repr()
+                self.jobs = [build_job("MASTER.foo"), build_job("MASTER.bar")]
+                self.job_collection = mock.Mock()
+                self.job_collection.get_jobs.side_effect = lambda: list(self.jobs)
+                self.publisher = snapshot.SnapshotPublisher(self.job_collection)
+                yield
+
+    def get_versions(self):
+        return {entry.name: entry.version for entry in self.publisher.snapshot.entries}
+
+    def test_start_builds_all(self):
+        self.publisher.start()
+        assert [entry.name for entry in self.publisher.snapshot.entries] == ["MASTER.bar", "MASTER.foo"]
+        assert self.mock_adapter.call_count == 2
+
+    def test_versions_differ_after_restart(self):
+        self.publisher.start()
+        versions = self.get_versions()
+        with mock.patch("tron.api.snapshot.time.time", return_value=time.time() + 1, autospec=True):
+            self.publisher = snapshot.SnapshotPublisher(self.job_collection)
+        self.publisher.start()
+        new_versions = self.get_versions()
+        assert all(new_versions[name] > version for name, version in versions.items())
+
+    def test_publish_on_change(self):
+        self.publisher.start()
+        versions = self.get_versions()
+        self.change_log.record_job(self.jobs[1])
+        self.clock.advance(0)
+
+        assert self.mock_adapter.call_count == 3
+        new_versions = self.get_versions()
+        assert new_versions["MASTER.foo"] == versions["MASTER.foo"]
+        assert new_versions["MASTER.bar"] > versions["MASTER.bar"]
+
+    def test_publish_replaced_job(self):
+        self.publisher.start()
+        self.jobs[0].enabled = False
+        self.jobs.pop()
+        self.publisher.publish()
+        assert list(self.get_versions()) == ["MASTER.foo"]
+        assert self.mock_adapter.call_count == 3
+
+    def test_publish_within_budget(self):
+        with mock.patch("tron.api.snapshot.PUBLISH_BUDGET_SECONDS", 0.05), mock.patch(
+            "tron.api.snapshot.time.time", side_effect=[0, 0, 1, 1, 1, 1, 1], autospec=True
+        ):
+            self.publisher.publish()
+        # the second job is left for the next tick
+        assert list(self.get_versions()) == ["MASTER.foo"]
+        assert self.publisher.dirty == {"MASTER.bar"}
+
+        self.clock.advance(0)
+        assert list(self.get_versions()) == ["MASTER.bar", "MASTER.foo"]
+        assert self.mock_adapter.call_count == 2
+
+    def test_publish_build_failure(self):
+        self.mock_adapter.return_value.get_repr.side_effect = [build_job_repr(), ValueError("bad")]
+        self.publisher.publish()
+        assert list(self.get_versions()) == ["MASTER.foo"]
+        assert self.publisher.dirty == {"MASTER.bar"}
+
+    def test_publish_build_failure_retried(self):
+        self.publisher.start()
+        versions = self.get_versions()
+        self.mock_adapter.return_value.get_repr.side_effect = ValueError("bad")
+        self.change_log.record_job(self.jobs[1])
+        self.clock.advance(0)
+        # the previous entry is kept, and the job is retried after a delay
+        assert self.get_versions() == versions
+        assert self.mock_adapter.call_count == 3
+        self.clock.advance(0)
+        assert self.mock_adapter.call_count == 3
+
+        self.mock_adapter.return_value.get_repr.side_effect = lambda: build_job_repr()
+        self.clock.advance(snapshot.RETRY_SECONDS)
+        assert self.mock_adapter.call_count == 4
+        assert self.get_versions()["MASTER.bar"] > versions["MASTER.bar"]
+        assert self.publisher.dirty == set()
+
+    def test_publish_rebuilds_all_after_reset(self):
+        self.publisher.start()
+        self.change_log.min_version = self.change_log.version + 1
+        self.publisher.publish()
+        assert self.mock_adapter.call_count == 4
+
+    def test_stop(self):
+        self.publisher.start()
+        self.publisher.stop()
+        self.change_log.record_job(self.jobs[0])
+        self.clock.advance(0)
+        assert self.mock_adapter.call_count == 2
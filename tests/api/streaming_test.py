@@ -0,0 +1,117 @@
+import gzip
+import json
+from unittest import mock
+
+import pytest
+from twisted.internet import defer
+from twisted.web import server
+
+from tron.api import streaming
+
+
+@pytest.fixture(autouse=True)
+def sync_threads():
+    with mock.patch(
+        "tron.api.streaming.threads.deferToThread",
+        autospec=True,
+        side_effect=defer.maybeDeferred,
+    ):
+        yield
+
+
+@pytest.fixture
+def small_chunks():
+    with mock.patch("tron.api.streaming.CHUNK_SIZE", 1):
+        yield
+
+
+@pytest.fixture
+def request_():
+    return mock.create_autospec(server.Request)
+
+
+def written(request):
+    return b"".join(call[0][0] for call in request.write.call_args_list)
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, False),
+        (b"identity", False),
+        (b"gzip", True),
+        (b"deflate, GZIP;q=0.5", True),
+        (b"x-gzip", False),
+    ],
+)
+def test_accepts_gzip(request_, header, expected):
+    request_.getHeader.return_value = header
+    assert streaming.accepts_gzip(request_) is expected
+
+
+def test_iter_json_array():
+    assert json.loads(b"".join(streaming.iter_json_array([b"1", b'"two"']))) == [1, "two"]
+    assert json.loads(b"".join(streaming.iter_json_array([]))) == []
+
+
+def test_start(request_, small_chunks):
+    response = streaming.StreamingResponse([b"[", b"1", b"]"])
+    response.start(request_)
+    request_.registerProducer.assert_called_once_with(response, True)
+    assert written(request_) == b"[1]"
+    assert request_.write.call_count == 3
+    request_.unregisterProducer.assert_called_once_with()
+    request_.finish.assert_called_once_with()
+
+
+def test_start_gzip(request_):
+    response = streaming.StreamingResponse([b"[", b"1", b"]"], compress=True)
+    response.start(request_)
+    request_.setHeader.assert_any_call(b"content-encoding", b"gzip")
+    assert gzip.decompress(written(request_)) == b"[1]"
+    request_.finish.assert_called_once_with()
+
+
+def test_start_run_in_thread(request_):
+    run_in_thread = mock.Mock(side_effect=defer.maybeDeferred)
+    streaming.StreamingResponse([b"[]"]).start(request_, run_in_thread=run_in_thread)
+    assert run_in_thread.call_count == 1
+    assert written(request_) == b"[]"
+
+
+def test_pause_and_resume(request_, small_chunks):
+    response = streaming.StreamingResponse([b"[", b"1", b"]"])
+    request_.write.side_effect = lambda data: response.pauseProducing()
+    response.start(request_)
+    assert written(request_) == b"["
+
+    response.resumeProducing()
+    assert written(request_) == b"[1"
+    assert not request_.finish.called
+
+
+def test_stop_producing(request_, small_chunks):
+    response = streaming.StreamingResponse([b"[", b"1", b"]"])
+    request_.write.side_effect = lambda data: response.stopProducing()
+    response.start(request_)
+    assert written(request_) == b"["
+    assert not request_.finish.called
+
+
+def failing_chunks(before_error):
+    yield from before_error
+    raise ValueError("oops")
+
+
+def test_error_before_writing(request_):
+    streaming.StreamingResponse(failing_chunks([])).start(request_)
+    assert request_.processingFailed.call_count == 1
+    assert not request_.loseConnection.called
+
+
+def test_error_while_writing(request_, small_chunks):
+    streaming.StreamingResponse(failing_chunks([b"["])).start(request_)
+    assert written(request_) == b"["
+    request_.loseConnection.assert_called_once_with()
+    assert not request_.processingFailed.called
+    assert not request_.finish.called
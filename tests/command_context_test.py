@@ -127,6 +127,30 @@ class ChainedObjectOverrideContextTestCase(SimpleContextTestCaseBase):
         assert_equal(self.context["next_foo"], "next_bar")
 
 
+class TestChainedContextLookup(TestCase):
+    @setup
+    def build_context(self):
+        self.root_context = command_context.CommandContext()
+        self.next_context = command_context.CommandContext(
+            command_context.ActionRunContext(mock.Mock(action_name="act")),
+            self.root_context,
+        )
+        self.context = command_context.CommandContext(dict(foo="bar"), self.next_context)
+
+    def test_lookup_order(self):
+        assert_equal(self.context["foo"], "bar")
+        assert_equal(self.context["actionname"], "act")
+        assert_equal(self.context["action_run.action_name"], "act")
+        # Attributes of the dicts and contexts in the chain are found too
+        assert_equal(self.context["items"](), dict(foo="bar").items())
+        assert self.context["base"] is self.root_context.base
+
+    def test_chain_changed(self):
+        assert_raises(KeyError, self.context.__getitem__, "mcp_key")
+        self.root_context.base = dict(mcp_key="value")
+        assert_equal(self.context["mcp_key"], "value")
+
+
 class TestJobContext(TestCase):
     @setup
     def setup_job(self):
@@ -201,6 +225,21 @@ class TestJobRunContext(TestCase):
         mock_date_math.parse.assert_called_with(name, self.jobrun.run_time)
         assert_equal(time_value, mock_date_math.parse.return_value)
 
+    def test__getitem__cached_per_run_time(self):
+        self.jobrun.run_time = datetime.datetime(2024, 1, 2, 3, 4)
+        with mock.patch(
+            "tron.command_context.timeutils.DateArithmetic.parse",
+            autospec=True,
+            side_effect=command_context.timeutils.DateArithmetic.parse,
+        ) as mock_parse:
+            assert_equal(self.context["shortdate-1"], "2024-01-01")
+            assert_equal(self.context["shortdate-1"], "2024-01-01")
+            assert_equal(mock_parse.call_count, 1)
+
+            self.jobrun.run_time = datetime.datetime(2024, 2, 2, 3, 4)
+            assert_equal(self.context["shortdate-1"], "2024-02-01")
+            assert_equal(mock_parse.call_count, 2)
+
 
 class TestActionRunContext(TestCase):
     @setup
@@ -1,3 +1,4 @@
+import gzip
 from unittest import mock
 from urllib.error import HTTPError
 from urllib.error import URLError
@@ -60,6 +61,12 @@ class TestRequest(TestCase):
         assert_equal(response.error, client.DECODE_ERROR)
         assert_equal(response.content, content.decode("utf-8"))
 
+    def test_load_response_content_gzip(self):
+        http_response = build_file_mock(gzip.compress(b'{"jobs": []}'))
+        http_response.headers.get.return_value = "gzip"
+        response = client.load_response_content(http_response)
+        assert_equal(response.content, {"jobs": []})
+
     @mock.patch("tron.commands.client.log", autospec=True)
     def test_request_http_error(self, _):
         self.mock_urlopen.side_effect = HTTPError(
@@ -175,6 +182,44 @@ class TestClient(TestCase):
             "/api/jobs?include_action_graph=1&include_action_runs=0&include_job_runs=0&include_node_pool=1",
         )
 
+    def test_jobs_filtered(self):
+        self.client.jobs(namespace="MASTER", state="enabled", fields=["name", "status"])
+        self.client.request.assert_called_with(
+            "/api/jobs?fields=name%2Cstatus&include_action_graph=1&include_action_runs=0&include_job_runs=0"
+            "&include_node_pool=1&namespace=MASTER&state=enabled",
+        )
+
+    def test_jobs_paged(self):
+        self.client.request.side_effect = [
+            {"jobs": [{"name": "MASTER.a"}], "next_cursor": "MASTER.a"},
+            {"jobs": [{"name": "MASTER.b"}], "next_cursor": None},
+        ]
+        assert self.client.jobs(page_size=1) == [{"name": "MASTER.a"}, {"name": "MASTER.b"}]
+        self.client.request.assert_called_with(
+            "/api/jobs?cursor=MASTER.a&include_action_graph=1&include_action_runs=0&include_job_runs=0"
+            "&include_node_pool=1&limit=1",
+        )
+
+    def test_action_run_output(self):
+        self.client.action_run_output("/api/jobs/name/1/act", offset="1-2-3")
+        self.client.request.assert_called_with("/api/jobs/name/1/act?offset=1-2-3&output=stdout")
+
+    def test_schedule_horizon(self):
+        self.client.schedule_horizon(hours=6)
+        self.client.request.assert_called_with("/api/schedule_horizon?hours=6")
+
+    def test_triggers(self):
+        self.client.triggers(action="MASTER.job.action")
+        self.client.request.assert_called_with("/api/triggers?action=MASTER.job.action")
+        self.client.triggers(event="MASTER.job.action.shortdate.2024-01-01")
+        self.client.request.assert_called_with("/api/triggers?event=MASTER.job.action.shortdate.2024-01-01")
+
+    def test_changes(self):
+        self.client.changes()
+        self.client.request.assert_called_with("/api/changes")
+        self.client.changes(since=5, wait=30)
+        self.client.request.assert_called_with("/api/changes?since=5&wait=30")
+
 
 class TestUserAttribution(TestCase):
     def test_default_user_agent(self):
@@ -7,6 +7,8 @@ from tron.commands import display
 from tron.commands.display import DisplayActionRuns
 from tron.commands.display import DisplayJobRuns
 from tron.commands.display import DisplayJobs
+from tron.commands.display import format_schedule_horizon
+from tron.commands.display import format_triggers
 from tron.core import actionrun
 from tron.core import job
 
@@ -156,6 +158,56 @@ class TestDisplayActions(TestCase):
         assert len(lines) == 16, "\n".join(lines)
 
 
+class TestFormatScheduleHorizon(TestCase):
+    @setup
+    def setup_data(self):
+        self.content = dict(
+            start_time="2012-01-23 10:00:00",
+            end_time="2012-01-24 10:00:00",
+            jobs=[dict(name="MASTER.hourly"), dict(name="MASTER.daily")],
+            minutes=[
+                dict(minute="2012-01-23 11:00:00", starts=1, cpus=0.5, mem=512.0),
+                dict(minute="2012-01-24 00:00:00", starts=2, cpus=1.5, mem=1024.0),
+                dict(minute="2012-01-23 12:00:00", starts=1, cpus=0.5, mem=512.0),
+            ],
+            total_starts=4,
+            peak_starts=2,
+            peak_cpus=1.5,
+            peak_mem=1024.0,
+        )
+
+    def test_format(self):
+        lines = format_schedule_horizon(self.content, num_shown=2).split("\n")
+        assert "Peak starts/minute  : 2" in lines
+        assert lines[-2].startswith("2012-01-24 00:00:00")
+        assert len(lines) == 11
+
+
+class TestFormatTriggers(TestCase):
+    @setup
+    def setup_data(self):
+        self.edge = dict(
+            upstream="MASTER.job1.action2",
+            downstream="other.job2.action3",
+            event="MASTER.job1.action2.shortdate.{shortdate}",
+            published=False,
+        )
+
+    def test_format_action(self):
+        content = dict(action="MASTER.job1.action2", publishes=[], upstream=[], downstream=[self.edge])
+        lines = format_triggers(content).split("\n")
+        assert "Publishes : nothing" in lines
+        assert "No Upstream triggers" in lines
+        assert lines[-1].startswith("MASTER.job1.action2")
+        assert lines[-1].split()[-1] == "no"
+
+    def test_format_event(self):
+        content = dict(event="MASTER.job1.action2.shortdate.2024-01-01", waiting=[self.edge])
+        lines = format_triggers(content).split("\n")
+        assert lines[0] == "Event     : MASTER.job1.action2.shortdate.2024-01-01"
+        assert lines[-1].split()[2] == "other.job2.action3"
+
+
 class TestAddColorForState(TestCase):
     @setup_teardown
     def enable_color(self):
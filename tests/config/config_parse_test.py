@@ -119,6 +119,10 @@ def make_k8s_options():
     return schema.ConfigKubernetes(enabled=False, non_retryable_exit_codes=(), default_volumes=())
 
 
+def make_concurrency_limits():
+    return schema.ConfigConcurrencyLimits(namespaces={}, pools={}, executors={}, weights={})
+
+
 def make_action(**kwargs):
     kwargs.setdefault("name", "action"),
     kwargs.setdefault("command", "command")
@@ -162,6 +166,7 @@ def make_job(**kwargs):
     kwargs.setdefault("allow_overlap", False)
     kwargs.setdefault("time_zone", None)
     kwargs.setdefault("expected_runtime", datetime.timedelta(0, 3600))
+    kwargs.setdefault("priority", 0)
     kwargs.setdefault("use_k8s", False)
     return schema.ConfigJob(**kwargs)
 
@@ -337,6 +342,7 @@ def make_tron_config(
     jobs=None,
     mesos_options=None,
     k8s_options=None,
+    concurrency_limits=None,
     read_json=False,
 ):
     return schema.TronConfig(
@@ -351,6 +357,7 @@ def make_tron_config(
         jobs=jobs or make_master_jobs(),
         mesos_options=mesos_options or make_mesos_options(),
         k8s_options=k8s_options or make_k8s_options(),
+        concurrency_limits=concurrency_limits or make_concurrency_limits(),
         read_json=read_json,
     )
 
@@ -1320,6 +1327,18 @@ class TestConfigContainer(TestCase):
         container = config_parse.ConfigContainer.create(config_mapping)
         assert_equal(set(container.configs.keys()), {"MASTER", "other"})
 
+    def test_with_fragment(self):
+        master = self.container.get_master()
+        fragment = config_parse.validate_named_fragment("another", TestNamedConfig.config, master)
+        container = self.container.with_fragment("another", fragment)
+        assert_equal(set(container.configs), {"MASTER", "other", "another"})
+        assert_equal(container["another"], fragment)
+        # the original is unchanged
+        assert "another" not in self.container
+
+        container = container.with_fragment("other", None)
+        assert_equal(set(container.configs), {"MASTER", "another"})
+
     def test_create_missing_master(self):
         config_mapping = {"other": mock.Mock()}
         assert_raises(
@@ -1842,6 +1861,32 @@ class TestValidKubeconfigPaths:
         assert config_parse.valid_kubernetes_options.validate(k8s_options, self.context)
 
 
+class TestValidateConcurrencyLimits:
+    def test_valid(self):
+        limits = config_parse.valid_concurrency_limits.validate(
+            {"namespaces": {"backfill": 10}, "pools": {"default": 100}, "weights": {"critical": 3}},
+            config_utils.NullConfigContext,
+        )
+        assert limits == schema.ConfigConcurrencyLimits(
+            namespaces={"backfill": 10},
+            pools={"default": 100},
+            executors={},
+            weights={"critical": 3},
+        )
+
+    @pytest.mark.parametrize(
+        "concurrency_limits",
+        [
+            {"namespaces": {"backfill": -1}},
+            {"pools": {"default": -2}},
+            {"weights": {"critical": 0}},
+        ],
+    )
+    def test_invalid(self, concurrency_limits):
+        with pytest.raises(ConfigError):
+            config_parse.valid_concurrency_limits.validate(concurrency_limits, config_utils.NullConfigContext)
+
+
 class TestValidateStatePersistenceDefaults(TestCase):
     def test_post_validation_sees_defaults_for_omitted_keys(self):
         input_config = {
@@ -15,6 +15,34 @@ from tron.config.config_utils import ConfigContext
 from tron.config.config_utils import valid_identifier
 
 
+class TestCompileTemplate(TestCase):
+    @setup
+    def setup_context(self):
+        self.context = {"name": "foo", "count": 3, "item": {"key": "value"}}
+
+    def assert_renders_like_formatter(self, template):
+        expected = config_utils.StringFormatter(self.context).format(template)
+        assert_equal(config_utils.compile_template(template).render(self.context), expected)
+
+    def test_render(self):
+        for template in [
+            "plain",
+            "run {name} {count:03d} {{literal}} {name!r}",
+            "{name:>{count}}",
+            "{item[key]}",
+        ]:
+            self.assert_renders_like_formatter(template)
+
+    def test_simple_templates_compiled(self):
+        assert config_utils.compile_template("run {name} {count:03d}").is_simple
+        assert not config_utils.compile_template("{item[key]}").is_simple
+        assert config_utils.compile_template("run {name}") is config_utils.compile_template("run {name}")
+
+    def test_render_errors(self):
+        assert_raises(KeyError, config_utils.compile_template("{missing}").render, self.context)
+        assert_raises(ValueError, config_utils.compile_template, "unmatched }")
+
+
 class TestUniqueNameDict(TestCase):
     @setup
     def setup_dict(self):
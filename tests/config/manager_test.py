@@ -94,6 +94,14 @@ class TestManifestFile(TestCase):
         manager.write(self.manifest.filename, file_mapping)
         assert_equal(self.manifest.get_file_mapping(), file_mapping)
 
+    def test_read_once(self):
+        self.manifest.add("zing", "zing.yaml")
+        with mock.patch("tron.config.manager.read", autospec=True) as mock_read:
+            assert "zing" in self.manifest
+            assert_equal(self.manifest.get_file_name("zing"), "zing.yaml")
+            assert_equal(self.manifest.get_file_mapping(), {"zing": "zing.yaml"})
+        assert not mock_read.called
+
 
 class TestConfigManager(TestCase):
 
@@ -146,9 +154,21 @@ class TestConfigManager(TestCase):
         assert not self.manifest.add.call_count
         self.manager.validate_with_fragment.assert_called_with(
             name,
-            self.content,
+            content=self.content,
             should_validate_missing_dependency=False,
+            content_hash=manager.hash_config(self.content),
         )
+        self.manifest.__contains__.return_value = True
+        assert_equal(self.manager.get_hash(name), manager.hash_config(self.content))
+
+    def test_read_raw_config_stored(self):
+        name = "filename"
+        self.manifest.get_file_name.return_value = self.manager.build_file_path(name)
+        autospec_method(self.manager.validate_with_fragment)
+        self.manager.write_config(name, self.raw_content)
+        with mock.patch("tron.config.manager.read_raw", autospec=True) as mock_read_raw:
+            assert_equal(self.manager.read_raw_config(name), self.raw_content)
+        assert not mock_read_raw.called
 
     def test_write_config_new_name(self):
         name = "filename2"
@@ -169,6 +189,16 @@ class TestConfigManager(TestCase):
         self.manifest.delete.assert_called_with(name)
         mock_remove.assert_called_with(path)
 
+    @mock.patch("os.remove", autospec=True)
+    def test_delete_config_updates_loaded(self, mock_remove):
+        self.manifest.get_file_name.return_value = "namespace.yaml"
+        autospec_method(self.manager.get_config_name_mapping, return_value={})
+        self.manager.config_container = mock.Mock()
+        loaded = self.manager.config_container
+        self.manager.delete_config("namespace")
+        loaded.with_fragment.assert_called_once_with("namespace", None)
+        assert_equal(self.manager.load(), loaded.with_fragment.return_value)
+
     @mock.patch("os.remove", autospec=True)
     def test_delete_missing_namespace(self, mock_remove):
         name = "namespace"
@@ -176,6 +206,7 @@ class TestConfigManager(TestCase):
         self.manager.delete_config(name)
         assert_equal(mock_remove.call_count, 0)
 
+    @mock.patch("tron.config.manager.validate_dependencies", autospec=True)
     @mock.patch(
         "tron.config.manager.JobGraph",
         autospec=True,
@@ -184,19 +215,69 @@ class TestConfigManager(TestCase):
         "tron.config.manager.config_parse.ConfigContainer",
         autospec=True,
     )
-    def test_validate_with_fragment(self, mock_config_container, mock_job_graph):
-        name = "the_name"
+    def test_validate_with_fragment_master(self, mock_config_container, mock_job_graph, mock_validate_dependencies):
+        name = schema.MASTER_NAMESPACE
         name_mapping = {"something": "content", name: "old_content"}
         autospec_method(self.manager.get_config_name_mapping)
         self.manager.get_config_name_mapping.return_value = name_mapping
-        self.manager.validate_with_fragment(name, self.content)
+        config_container = self.manager.validate_with_fragment(name, self.content)
         expected_mapping = dict(name_mapping)
         expected_mapping[name] = self.content
-        mock_config_container.create.assert_called_with(expected_mapping)
-        mock_job_graph.assert_called_once_with(
-            mock_config_container.create.return_value,
-            should_validate_missing_dependency=True,
+        mock_config_container.create.assert_called_with(
+            expected_mapping,
+            validate_named_fragment=self.manager.validate_named_fragment,
+        )
+        assert_equal(config_container, mock_config_container.create.return_value)
+        mock_job_graph.assert_called_once_with(config_container)
+        mock_validate_dependencies.assert_called_once_with(config_container.get_jobs.return_value)
+        # the shared mapping isn't changed
+        assert_equal(name_mapping[name], "old_content")
+
+    @mock.patch("tron.config.manager.validate_dependencies", autospec=True)
+    @mock.patch(
+        "tron.config.manager.JobGraph",
+        autospec=True,
+    )
+    @mock.patch(
+        "tron.config.manager.config_parse",
+        autospec=True,
+    )
+    def test_validate_with_fragment(self, mock_config_parse, mock_job_graph, mock_validate_dependencies):
+        name = "the_name"
+        autospec_method(self.manager.load)
+        autospec_method(self.manager.validate_named_fragment)
+        current = self.manager.load.return_value
+        config_container = self.manager.validate_with_fragment(name, self.content)
+
+        self.manager.validate_named_fragment.assert_called_once_with(
+            name,
+            self.content,
+            current.get_master.return_value,
+            None,
         )
+        config = self.manager.validate_named_fragment.return_value
+        current.with_fragment.assert_called_once_with(name, config)
+        assert_equal(config_container, current.with_fragment.return_value)
+        # only the new fragment's actions are built
+        mock_config_parse.ConfigContainer.assert_called_once_with({name: config})
+        mock_job_graph.assert_called_once_with(mock_config_parse.ConfigContainer.return_value)
+        mock_validate_dependencies.assert_called_once_with(config_container.get_jobs.return_value)
+
+    @mock.patch("tron.config.manager.JobGraph", autospec=True)
+    @mock.patch("tron.config.manager.config_parse", autospec=True)
+    def test_validate_with_fragment_invalid(self, mock_config_parse, mock_job_graph):
+        autospec_method(self.manager.load)
+        autospec_method(self.manager.validate_named_fragment)
+        mock_job_graph.side_effect = ValueError("bad")
+        assert_raises(ConfigError, self.manager.validate_with_fragment, "the_name", self.content)
+
+    def test_write_config_updates_loaded(self):
+        name = "filename"
+        self.manifest.get_file_name.return_value = self.manager.build_file_path(name)
+        autospec_method(self.manager.validate_with_fragment)
+        autospec_method(self.manager.get_config_name_mapping, return_value={})
+        self.manager.write_config(name, self.raw_content)
+        assert_equal(self.manager.load(), self.manager.validate_with_fragment.return_value)
 
     @mock.patch("tron.config.manager.read", autospec=True)
     @mock.patch(
@@ -211,13 +292,28 @@ class TestConfigManager(TestCase):
         assert_equal(container, mock_config_container.create.return_value)
 
         expected = {name: call.return_value for ((name, _), call) in zip(content_items, mock_read.mock_calls)}
-        mock_config_container.create.assert_called_with(expected)
+        mock_config_container.create.assert_called_with(
+            expected,
+            validate_named_fragment=self.manager.validate_named_fragment,
+        )
+
+        # later loads don't validate again
+        assert_equal(self.manager.load(), container)
+        assert_equal(mock_config_container.create.call_count, 1)
 
     def test_get_hash_default(self):
         self.manifest.__contains__.return_value = False
         hash_digest = self.manager.get_hash("name")
         assert_equal(hash_digest, self.manager.DEFAULT_HASH)
 
+    def test_get_hash_stored(self):
+        self.manifest.__contains__.return_value = True
+        autospec_method(self.manager.get_config_name_mapping, return_value={"name": self.content})
+        with mock.patch("tron.config.manager.hash_config", autospec=True) as mock_hash_config:
+            assert_equal(self.manager.get_hash("name"), mock_hash_config.return_value)
+            assert_equal(self.manager.get_hash("name"), mock_hash_config.return_value)
+        mock_hash_config.assert_called_once_with(self.content)
+
     def test_get_hash(self):
         content = "OkOkOk"
         autospec_method(self.manager.read_raw_config, return_value=content)
@@ -226,6 +322,104 @@ class TestConfigManager(TestCase):
         assert_equal(hash_digest, manager.hash_digest(content))
 
 
+class TestConfigManagerValidationCache(TestCase):
+
+    master_content = "nodes:\n  - hostname: localhost\ncommand_context:\n  a: b\n"
+    fragment_content = "jobs:\n  - name: job\n    node: localhost\n    schedule: daily\n    actions:\n      - name: action\n        command: echo {a}\n"
+
+    @setup
+    def setup_config_manager(self):
+        self.temp_dir = tempfile.mkdtemp()
+        path = os.path.join(self.temp_dir, "config")
+        manager.create_new_config(path, self.master_content)
+        self.manager = manager.ConfigManager(path)
+        self.manager.write_config("other", self.fragment_content)
+
+    @teardown
+    def teardown_dir(self):
+        shutil.rmtree(self.temp_dir)
+
+    def validate_count(self, fn, *args):
+        with mock.patch(
+            "tron.config.manager.config_parse.validate_named_fragment",
+            wraps=manager.config_parse.validate_named_fragment,
+        ) as mock_validate:
+            fn(*args)
+        return mock_validate.call_count
+
+    def test_unchanged_fragment_not_validated(self):
+        content = manager.from_string(self.fragment_content)
+        assert_equal(self.validate_count(self.manager.validate_with_fragment, "other", content), 0)
+        assert_equal(self.validate_count(self.manager.write_config, "other", self.fragment_content), 0)
+
+    def test_changed_fragment_validated(self):
+        content = self.fragment_content.replace("echo", "printf")
+        assert_equal(self.validate_count(self.manager.write_config, "other", content), 1)
+        assert_equal(
+            self.manager.load()["other"].jobs["other.job"].actions["action"].command,
+            "printf {a}",
+        )
+
+    def test_master_change(self):
+        # the fragment doesn't depend on the time zone
+        master_content = self.master_content + "time_zone: US/Pacific\n"
+        assert_equal(self.validate_count(self.manager.write_config, schema.MASTER_NAMESPACE, master_content), 0)
+        # ...but does on the nodes
+        master_content = self.master_content.replace("localhost", "otherhost")
+        assert_raises(
+            ConfigError,
+            self.manager.write_config,
+            schema.MASTER_NAMESPACE,
+            master_content,
+        )
+
+
+class TestConfigManagerLoadParallel(TestCase):
+
+    master_content = TestConfigManagerValidationCache.master_content
+    fragment_content = TestConfigManagerValidationCache.fragment_content
+
+    @setup
+    def setup_config_manager(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "config")
+        manager.create_new_config(self.path, self.master_content)
+        config_manager = manager.ConfigManager(self.path)
+        for name in ("one", "two", "three"):
+            config_manager.write_config(name, self.fragment_content)
+
+    @teardown
+    def teardown_dir(self):
+        shutil.rmtree(self.temp_dir)
+
+    def load(self, min_namespaces):
+        config_manager = manager.ConfigManager(self.path)
+        with mock.patch("tron.config.manager.PARALLEL_LOAD_MIN_NAMESPACES", min_namespaces):
+            return config_manager, config_manager.load()
+
+    def test_load_parallel(self):
+        config_manager, container = self.load(1)
+        sequential_manager, expected = self.load(100)
+        assert_equal(list(container.configs), list(expected.configs))
+        assert_equal(container.configs, expected.configs)
+        assert_equal(config_manager.get_config_name_mapping(), sequential_manager.get_config_name_mapping())
+        assert_equal(config_manager.get_hash("two"), sequential_manager.get_hash("two"))
+
+        # the validated fragments are cached
+        with mock.patch("tron.config.manager.config_parse.validate_named_fragment", autospec=True) as mock_validate:
+            config_manager.write_config("two", self.fragment_content)
+        assert not mock_validate.called
+
+    def test_load_parallel_errors(self):
+        config_manager = manager.ConfigManager(self.path)
+        for name in ("one", "three"):
+            manager.write_raw(config_manager.build_file_path(name), "jobs: [{name: job}]")
+        error = str(assert_raises(ConfigError, self.load, 1))
+        assert "one: ConfigError" in error
+        assert "three: ConfigError" in error
+        assert "two:" not in error
+
+
 class TestCreateNewConfig(TestCase):
     @mock.patch("tron.config.manager.os.makedirs", autospec=True)
     @mock.patch("tron.config.manager.ManifestFile", autospec=True)
@@ -66,6 +66,13 @@ class TestActionGraph(TestCase):
     def test__getitem__miss(self):
         assert_raises(KeyError, lambda: self.action_graph["unknown"])
 
+    def test_get_changed_actions(self):
+        action_map = dict(self.action_map, base_two=mock.MagicMock(), new=mock.MagicMock())
+        action_map["dep_one"] = mock.MagicMock(command_config=self.action_map["dep_one"].command_config)
+        new_graph = actiongraph.ActionGraph(action_map, self.required_actions, self.required_triggers)
+        assert new_graph.get_changed_actions(self.action_graph) == {"base_two", "new"}
+        assert new_graph.config_version > self.action_graph.config_version
+
     def test__eq__(self):
         other_graph = mock.MagicMock(
             action_map=self.action_map,
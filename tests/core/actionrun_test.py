@@ -344,6 +344,30 @@ class TestActionRun:
         self.action_run.fail()
         assert not self.action_run.start()
 
+    @mock.patch("tron.core.actionrun.concurrency_limiter", autospec=True)
+    def test_start_over_concurrency_limit(self, mock_limiter):
+        mock_limiter.try_acquire.return_value = False
+        self.action_run.machine.transition("ready")
+        assert not self.action_run.start()
+        mock_limiter.try_acquire.assert_called_once_with(self.action_run)
+        assert not self.action_run.submit_command.called
+        assert self.action_run.is_waiting
+
+    @mock.patch("tron.core.actionrun.concurrency_limiter", autospec=True)
+    def test_start_scheduled_over_concurrency_limit(self, mock_limiter):
+        mock_limiter.try_acquire.return_value = False
+        assert not self.action_run.start()
+        # waiting for a slot, so no longer scheduled
+        assert self.action_run.is_waiting
+
+    @mock.patch("tron.core.actionrun.concurrency_limiter", autospec=True)
+    def test_done_releases_concurrency_slot(self, mock_limiter):
+        self.action_run.machine.transition("ready")
+        self.action_run.start()
+        assert not mock_limiter.release.called
+        self.action_run.success()
+        mock_limiter.release.assert_called_once_with(self.action_run)
+
     @mock.patch("tron.core.actionrun.log", autospec=True)
     def test_start_invalid_command(self, _log):
         self.action_run.original_command = "{notfound}"
@@ -593,12 +617,12 @@ class TestActionRun:
         assert self.action_run.is_starting
         assert self.action_run.last_attempt.rendered_command == "new"
 
-    @mock.patch("twisted.internet.reactor.callLater", autospec=True)
-    def test_retries_delay(self, callLater):
+    @mock.patch("tron.core.actionrun.timer_queue", autospec=True)
+    def test_retries_delay(self, timer_queue):
         self.action_run.retries_delay = datetime.timedelta()
         self.action_run.retries_remaining = 2
         self.action_run.machine.transition("start")
-        callLater.return_value = "delayed call"
+        timer_queue.call_later.return_value = "delayed call"
         assert self.action_run._exit_unsuccessful(-1)
         assert self.action_run.in_delay == "delayed call"
 
@@ -659,42 +683,42 @@ class TestActionRunTriggerTimeout:
         timeout_call.cancel.assert_called_with()
 
     @mock.patch("tron.core.actionrun.EventBus", autospec=True)
-    @mock.patch("tron.core.actionrun.reactor", autospec=True)
-    def test_setup_subscriptions_no_triggers(self, reactor, eventbus):
+    @mock.patch("tron.core.actionrun.timer_queue", autospec=True)
+    def test_setup_subscriptions_no_triggers(self, timer_queue, eventbus):
         self.action_run.triggered_by = []
         self.action_run.setup_subscriptions()
-        assert not reactor.callLater.called
+        assert not timer_queue.call_later.called
         assert not eventbus.subscribe.called
 
     @mock.patch("tron.core.actionrun.EventBus", autospec=True)
-    @mock.patch("tron.core.actionrun.reactor", autospec=True)
-    def test_setup_subscriptions_no_remaining(self, reactor, eventbus):
+    @mock.patch("tron.core.actionrun.timer_queue", autospec=True)
+    def test_setup_subscriptions_no_remaining(self, timer_queue, eventbus):
         self.action_run.triggered_by = ["hello"]
         self.action_run.trigger_timeout_timestamp = None
         eventbus.has_event.return_value = True
         self.action_run.setup_subscriptions()
-        assert not reactor.callLater.called
+        assert not timer_queue.call_later.called
         assert not eventbus.subscribe.called
         assert eventbus.has_event.call_args_list == [mock.call("hello")]
 
-    @mock.patch("tron.core.actionrun.reactor", autospec=True)
-    def test_setup_subscriptions_timeout_in_future(self, reactor, mock_current_time):
+    @mock.patch("tron.core.actionrun.timer_queue", autospec=True)
+    def test_setup_subscriptions_timeout_in_future(self, timer_queue, mock_current_time):
         now = datetime.datetime.now()
         mock_current_time.return_value = now
         self.action_run.trigger_timeout_timestamp = now.timestamp() + 10
         self.action_run.setup_subscriptions()
-        reactor.callLater.assert_called_once_with(
+        timer_queue.call_later.assert_called_once_with(
             10.0,
             self.action_run.trigger_timeout_reached,
         )
 
-    @mock.patch("tron.core.actionrun.reactor", autospec=True)
-    def test_setup_subscriptions_timeout_in_past(self, reactor, mock_current_time):
+    @mock.patch("tron.core.actionrun.timer_queue", autospec=True)
+    def test_setup_subscriptions_timeout_in_past(self, timer_queue, mock_current_time):
         now = datetime.datetime.now()
         mock_current_time.return_value = now
         self.action_run.trigger_timeout_timestamp = now.timestamp() - 10
         self.action_run.setup_subscriptions()
-        reactor.callLater.assert_called_once_with(
+        timer_queue.call_later.assert_called_once_with(
             1,
             self.action_run.trigger_timeout_reached,
         )
@@ -1057,6 +1081,30 @@ class TestActionRunStateRestore:
         assert action_run.is_succeeded
         assert action_run.last_attempt.mesos_task_id == state_data["mesos_task_id"]
 
+    @mock.patch("tron.core.actionrun.concurrency_limiter", autospec=True)
+    def test_from_state_running_holds_concurrency_slot(self, mock_limiter, state_data_old):
+        state_data_old.update(state="running", end_time=None)
+        action_run = ActionRun.from_state(
+            state_data_old,
+            self.parent_context,
+            list(self.output_path),
+            self.run_node,
+            self.action_graph,
+        )
+        assert action_run.is_unknown
+        mock_limiter.restore.assert_called_once_with(action_run)
+
+    @mock.patch("tron.core.actionrun.concurrency_limiter", autospec=True)
+    def test_from_state_done_holds_no_concurrency_slot(self, mock_limiter, state_data_old):
+        ActionRun.from_state(
+            state_data_old,
+            self.parent_context,
+            list(self.output_path),
+            self.run_node,
+            self.action_graph,
+        )
+        assert not mock_limiter.restore.called
+
     def test_from_state_old_not_started(self, state_data_old):
         state_data = state_data_old
         state_data["start_time"] = None
@@ -1313,6 +1361,13 @@ class TestActionRunCollection:
             else:
                 assert run.command_config.command == "new"
 
+    def test_update_action_config_for_actions(self):
+        new_actions = {name: mock.Mock(command_config=ActionCommandConfig(command="new")) for name in self.run_map}
+        new_action_graph = actiongraph.ActionGraph(new_actions, {}, {})
+        assert self.collection.update_action_config(new_action_graph, {"second_name", "missing"}) is True
+        assert self.run_map["second_name"].command_config.command == "new"
+        assert self.run_map["action_name"].command_config.command == "old"
+
     def test_state_data(self):
         state_data = self.collection.state_data
         assert_length(state_data, len(self.action_runs[:2]))
@@ -1464,6 +1519,32 @@ class TestActionRunCollectionIsRunBlocked:
     def test_is_run_blocked_no_required_actions(self):
         assert not self.collection._is_run_blocked(self.run_map["action_name"])
 
+    def test_get_startable_action_runs_after_update(self):
+        assert self.collection.get_startable_action_runs() == [self.run_map["action_name"]]
+
+        self.run_map["action_name"].machine.state = ActionRun.SUCCEEDED
+        with mock.patch.object(self.action_graph, "get_dependencies", autospec=True) as mock_get_dependencies:
+            self.collection.update_run_state(self.run_map["action_name"])
+            assert self.collection.get_startable_action_runs() == [self.run_map["second_name"]]
+        # the dependency counts are kept, not recomputed
+        assert not mock_get_dependencies.called
+
+        self.run_map["action_name"].machine.state = ActionRun.FAILED
+        self.collection.update_run_state(self.run_map["action_name"])
+        assert self.collection.get_startable_action_runs() == []
+
+    def test_get_startable_action_runs_retried(self):
+        self.run_map["action_name"].machine.state = ActionRun.FAILED
+        assert self.collection.get_startable_action_runs() == []
+
+        self.run_map["action_name"].machine.reset()
+        self.collection.update_run_state(self.run_map["action_name"])
+        assert self.collection.get_startable_action_runs() == [self.run_map["action_name"]]
+
+    def test_get_startable_action_runs_blocked_on_trigger(self):
+        self.run_map["action_name"].triggered_by = ["trigger"]
+        assert self.collection.get_startable_action_runs() == []
+
     def test_is_run_blocked_completed_run(self):
         self.run_map["second_name"].machine.state = ActionRun.FAILED
         assert not self.collection._is_run_blocked(self.run_map["second_name"])
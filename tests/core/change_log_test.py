@@ -0,0 +1,126 @@
+from unittest import mock
+
+import pytest
+from twisted.internet import task
+
+from tron.core import change_log as change_log_module
+from tron.utils.timerqueue import TimerQueue
+
+
+def build_job_run(job_name="MASTER.foo", run_num=1, action_names=()):
+    return mock.Mock(
+        job_name=job_name,
+        run_num=run_num,
+        action_runs=[mock.Mock(action_name=name) for name in action_names],
+    )
+
+
+def build_job(name="MASTER.foo"):
+    job = mock.Mock()
+    job.get_name.return_value = name
+    return job
+
+
+@pytest.fixture
+def clock():
+    return task.Clock()
+
+
+@pytest.fixture
+def change_log(clock):
+    with mock.patch("tron.core.change_log.timer_queue", TimerQueue(clock)):
+        yield change_log_module.ChangeLog()
+
+
+def keys(changes):
+    return [key for key, _ in changes]
+
+
+def test_get_changes(change_log):
+    since = change_log.version
+    job_run = build_job_run(action_names=["a"])
+    change_log.record_job(build_job())
+    change_log.record_job_run(job_run)
+    middle = change_log.version
+    change_log.record_action_run(job_run, job_run.action_runs[0])
+
+    version, changes = change_log.get_changes(since)
+    assert version == since + 3
+    assert keys(changes) == [
+        ("job", "MASTER.foo"),
+        ("job_run", "MASTER.foo", 1),
+        ("action_run", "MASTER.foo", 1, "a"),
+    ]
+    assert keys(change_log.get_changes(middle)[1]) == [("action_run", "MASTER.foo", 1, "a")]
+    assert change_log.get_changes(version) == (version, [])
+
+
+def test_get_changes_latest_change_only(change_log):
+    since = change_log.version
+    job = build_job()
+    change_log.record_job(job)
+    change_log.record_job_run(build_job_run())
+    change_log.record_job(job)
+    assert keys(change_log.get_changes(since)[1]) == [("job_run", "MASTER.foo", 1), ("job", "MASTER.foo")]
+
+
+def test_record_job_run_removed(change_log):
+    job_run = build_job_run(action_names=["a"])
+    change_log.record_action_run(job_run, job_run.action_runs[0])
+    change_log.record_job_run_removed(job_run)
+    assert change_log.get_changes(0)[1] == [(("job_run", "MASTER.foo", 1), True)]
+
+
+def test_record_job_removed(change_log):
+    job_run = build_job_run()
+    change_log.record_job_run(job_run)
+    change_log.record_job_run(build_job_run(job_name="MASTER.bar"))
+    change_log.record_job_removed("MASTER.foo")
+    assert change_log.get_changes(0)[1] == [
+        (("job_run", "MASTER.bar", 1), False),
+        (("job", "MASTER.foo"), True),
+    ]
+
+
+def test_is_valid(change_log):
+    assert change_log.is_valid(change_log.version)
+    assert not change_log.is_valid(change_log.version - 1)
+    assert not change_log.is_valid(change_log.version + 1)
+
+
+def test_removed_pruned(change_log):
+    with mock.patch("tron.core.change_log.MAX_REMOVED", 2):
+        since = change_log.version
+        for run_num in range(3):
+            change_log.record_job_run_removed(build_job_run(run_num=run_num))
+    assert not change_log.is_valid(since)
+    assert change_log.is_valid(since + 1)
+    assert keys(change_log.get_changes(since + 1)[1]) == [
+        ("job_run", "MASTER.foo", 1),
+        ("job_run", "MASTER.foo", 2),
+    ]
+
+
+def test_wait_woken_by_change(change_log, clock):
+    d = change_log.wait(30)
+    change_log.record_job(build_job())
+    change_log.record_job(build_job("MASTER.bar"))
+    assert not d.called
+    clock.advance(0)
+    assert d.result is True
+    assert not change_log.waiters
+
+
+def test_wait_timeout(change_log, clock):
+    d = change_log.wait(30)
+    clock.advance(30)
+    assert d.result is False
+    assert not change_log.waiters
+
+
+def test_wait_cancelled(change_log, clock):
+    d = change_log.wait(30)
+    d.addErrback(lambda _: None)
+    d.cancel()
+    assert not change_log.waiters
+    clock.advance(30)
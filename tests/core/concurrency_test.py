@@ -0,0 +1,170 @@
+from unittest import mock
+
+import pytest
+
+from tron.config.schema import ConfigConcurrencyLimits
+from tron.core import concurrency
+
+
+def build_run(name, executor="kubernetes", pool=None):
+    run = mock.Mock(
+        id=f"{name}.0.action",
+        job_run_id=f"{name}.0",
+        executor=executor,
+        command_config=mock.Mock(node_selectors={concurrency.POOL_NODE_SELECTOR: pool} if pool else {}),
+    )
+    run.machine.check.return_value = True
+    return run
+
+
+@pytest.fixture
+def limiter():
+    limiter = concurrency.ConcurrencyLimiter()
+    with mock.patch("tron.core.concurrency.timer_queue", autospec=True):
+        yield limiter
+
+
+def configure(limiter, namespaces=None, pools=None, executors=None, weights=None):
+    limiter.configure(
+        ConfigConcurrencyLimits(
+            namespaces=namespaces or {},
+            pools=pools or {},
+            executors=executors or {},
+            weights=weights or {},
+        )
+    )
+
+
+def test_get_scopes():
+    run = build_run("ns.job", pool="default")
+    assert concurrency.get_scopes(run) == [("namespace", "ns"), ("pool", "default"), ("executor", "kubernetes")]
+
+
+def test_no_limits(limiter):
+    configure(limiter)
+    runs = [build_run(f"ns.job{i}") for i in range(10)]
+    assert all(limiter.try_acquire(run) for run in runs)
+    assert limiter.running[("namespace", "ns")] == 10
+
+
+def test_limit_queues_run(limiter):
+    configure(limiter, namespaces={"ns": 1})
+    first, second = build_run("ns.first"), build_run("ns.second")
+    assert limiter.try_acquire(first)
+    assert limiter.try_acquire(first)
+    assert not limiter.try_acquire(second)
+    assert not limiter.try_acquire(second)
+    assert limiter.get_queue_depths() == {"ns": 1}
+
+    limiter.dispatch()
+    assert not second.start.called
+
+    limiter.release(first)
+    limiter.dispatch()
+    second.start.assert_called_once_with()
+    assert limiter.get_queue_depths() == {}
+    assert limiter.running[("namespace", "ns")] == 1
+
+
+def test_pool_and_executor_limits(limiter):
+    configure(limiter, pools={"small": 1}, executors={"ssh": 1})
+    assert limiter.try_acquire(build_run("a.job", pool="small"))
+    assert not limiter.try_acquire(build_run("b.job", pool="small"))
+    assert limiter.try_acquire(build_run("c.job", pool="large"))
+    assert limiter.try_acquire(build_run("d.job", executor="ssh"))
+    assert not limiter.try_acquire(build_run("e.job", executor="ssh"))
+
+
+def test_release_waiting_run(limiter):
+    configure(limiter, namespaces={"ns": 0})
+    run = build_run("ns.job")
+    assert not limiter.try_acquire(run)
+    limiter.release(run)
+    assert limiter.get_queue_depths() == {}
+
+
+def test_release_waiting_run_removes_it(limiter):
+    configure(limiter, namespaces={"ns": 1})
+    limiter.try_acquire(build_run("ns.first"))
+    cancelled, waiting = build_run("ns.cancelled"), build_run("ns.waiting")
+    limiter.try_acquire(cancelled)
+    limiter.try_acquire(waiting)
+    assert limiter.is_waiting(cancelled)
+
+    limiter.release(cancelled)
+    assert not limiter.is_waiting(cancelled)
+    assert limiter.get_queue_depths() == {"ns": 1}
+
+    configure(limiter, namespaces={"ns": 2})
+    limiter.dispatch()
+    assert not cancelled.start.called
+    waiting.start.assert_called_once_with()
+    assert limiter.get_queue_depths() == {}
+
+
+def test_restore(limiter):
+    configure(limiter, namespaces={"ns": 1})
+    restored = build_run("ns.restored")
+    limiter.restore(restored)
+    limiter.restore(restored)
+    assert limiter.running[("namespace", "ns")] == 1
+    assert not limiter.try_acquire(build_run("ns.new"))
+
+    limiter.release(restored)
+    assert limiter.running[("namespace", "ns")] == 0
+
+
+def test_dispatch_skips_runs_which_cant_start(limiter):
+    configure(limiter, namespaces={"ns": 1})
+    limiter.try_acquire(build_run("ns.first"))
+    cancelled, waiting = build_run("ns.cancelled"), build_run("ns.waiting")
+    limiter.try_acquire(cancelled)
+    limiter.try_acquire(waiting)
+    cancelled.machine.check.return_value = False
+
+    configure(limiter, namespaces={"ns": 2})
+    limiter.dispatch()
+    assert not cancelled.start.called
+    waiting.start.assert_called_once_with()
+
+
+def test_dispatch_drops_many_cancelled_runs(limiter):
+    configure(limiter, namespaces={"ns": 1})
+    limiter.try_acquire(build_run("ns.first"))
+    cancelled = [build_run(f"ns.cancelled{i}") for i in range(2000)]
+    for run in cancelled:
+        limiter.try_acquire(run)
+        run.machine.check.return_value = False
+
+    with mock.patch("tron.core.concurrency.prom_metrics", autospec=True) as mock_metrics:
+        configure(limiter, namespaces={"ns": 2})
+        limiter.dispatch()
+    assert limiter.get_queue_depths() == {}
+    mock_metrics.tron_concurrency_waiting_gauge.labels.return_value.set.assert_called_with(0)
+
+
+def test_dispatch_is_fair_across_namespaces(limiter):
+    configure(limiter, executors={"kubernetes": 2}, weights={"important": 2})
+    limiter.try_acquire(build_run("backfill.running0"))
+    limiter.try_acquire(build_run("backfill.running1"))
+    waiting = [build_run(f"backfill.job{i}") for i in range(3)]
+    waiting += [build_run(f"important.job{i}") for i in range(3)]
+    waiting += [build_run(f"other.job{i}") for i in range(3)]
+    for run in waiting:
+        assert not limiter.try_acquire(run)
+
+    started = []
+    for run in waiting:
+        run.start.side_effect = lambda run=run: started.append(run.job_run_id)
+
+    configure(limiter, executors={"kubernetes": 8}, weights={"important": 2})
+    limiter.dispatch()
+    # backfill already has 2 running and important gets 2 slots per other's 1
+    assert started == [
+        "important.job0.0",
+        "other.job0.0",
+        "important.job1.0",
+        "important.job2.0",
+        "other.job1.0",
+        "backfill.job0.0",
+    ]
@@ -61,6 +61,27 @@ class TestJobCollection(TestCase):
             job_scheduler.schedule.assert_called_with()
             job_scheduler.get_job.assert_called_with()
 
+    def test_update_from_config_reconfigure_job_names(self):
+        autospec_method(self.collection.jobs.filter_by_name)
+        autospec_method(self.collection.add)
+        factory = mock.create_autospec(JobSchedulerFactory)
+        job_configs = {
+            "a.foo": mock.Mock(namespace="a"),
+            "a.bar": mock.Mock(namespace="a"),
+            "b.foo": mock.Mock(namespace="b"),
+        }
+        for name, config in job_configs.items():
+            config.name = name
+        result = self.collection.update_from_config(
+            job_configs,
+            factory,
+            True,
+            namespace_to_reconfigure="a",
+            job_names_to_reconfigure={"a.foo", "b.foo"},
+        )
+        list(result)
+        assert factory.build.call_args_list == [mock.call(job_configs["a.foo"]), mock.call(job_configs["b.foo"])]
+
     def test_move_running_job(self):
         with mock.patch(
             "tron.core.job_collection.JobCollection.get_by_name",
@@ -1,4 +1,5 @@
 import datetime
+import tempfile
 from unittest import mock
 
 from testifycompat import assert_equal
@@ -7,10 +8,16 @@ from testifycompat import TestCase
 from tests import testingutils
 from tests.assertions import assert_length
 from tron import actioncommand
+from tron.config.schema import ConfigConcurrencyLimits
+from tron.core import action
+from tron.core import actiongraph
 from tron.core import job
 from tron.core.actionrun import ActionRun
+from tron.core.concurrency import ConcurrencyLimiter
 from tron.core.job_scheduler import JobScheduler
 from tron.core.job_scheduler import JobSchedulerFactory
+from tron.core.jobrun import JobRunCollection
+from tron.serialize import filehandler
 
 
 class TestJobSchedulerGetRunsToSchedule(TestCase):
@@ -129,28 +136,28 @@ class TestJobSchedulerSchedule(TestCase):
         self.original_build_new_runs = self.job.build_new_runs
         self.job.build_new_runs = mock.Mock(return_value=[mock_run])
 
-    @mock.patch("tron.core.job_scheduler.reactor", autospec=True)
-    def test_enable(self, reactor):
+    @mock.patch("tron.core.job_scheduler.timer_queue", autospec=True)
+    def test_enable(self, timer_queue):
         self.job.enabled = False
         self.job_scheduler.enable()
         assert self.job.enabled
-        assert_length(reactor.callLater.mock_calls, 1)
+        assert_length(timer_queue.call_later.mock_calls, 1)
 
-    @mock.patch("tron.core.job_scheduler.reactor", autospec=True)
-    def test_enable_noop(self, reactor):
+    @mock.patch("tron.core.job_scheduler.timer_queue", autospec=True)
+    def test_enable_noop(self, timer_queue):
         self.job.enabled = True
         self.job_scheduler.enable()
         assert self.job.enabled
-        assert_length(reactor.callLater.mock_calls, 0)
+        assert_length(timer_queue.call_later.mock_calls, 0)
 
-    @mock.patch("tron.core.job_scheduler.reactor", autospec=True)
-    def test_schedule(self, reactor):
+    @mock.patch("tron.core.job_scheduler.timer_queue", autospec=True)
+    def test_schedule(self, timer_queue):
         self.job.build_new_runs = self.original_build_new_runs
         self.job_scheduler.schedule()
-        assert reactor.callLater.call_count == 1
+        assert timer_queue.call_later.call_count == 1
 
-        # Args passed to callLater
-        call_args = reactor.callLater.mock_calls[0][1]
+        # Args passed to call_later
+        call_args = timer_queue.call_later.mock_calls[0][1]
         assert_equal(call_args[1], self.job_scheduler.run_job)
         secs = call_args[0]
         run = call_args[2]
@@ -159,11 +166,11 @@ class TestJobSchedulerSchedule(TestCase):
         # Assert that we use the seconds we get from the run to schedule
         assert_equal(run.seconds_until_run_time.return_value, secs)
 
-    @mock.patch("tron.core.job_scheduler.reactor", autospec=True)
-    def test_schedule_disabled_job(self, reactor):
+    @mock.patch("tron.core.job_scheduler.timer_queue", autospec=True)
+    def test_schedule_disabled_job(self, timer_queue):
         self.job.enabled = False
         self.job_scheduler.schedule()
-        assert reactor.callLater.call_count == 0
+        assert timer_queue.call_later.call_count == 0
 
     @mock.patch("tron.core.job_scheduler.reactor", autospec=True)
     def test_handle_job_events_no_schedule_on_complete(self, reactor):
@@ -246,11 +253,13 @@ class TestJobSchedulerOther(TestCase):
 
     def test_disable(self):
         self.job.runs.cancel_pending = mock.Mock()
+        self.job.notify = mock.Mock()
 
         self.job_scheduler.disable()
 
         assert not self.job.enabled
         assert self.job.runs.cancel_pending.call_count == 1
+        self.job.notify.assert_called_once_with(job.Job.NOTIFY_STATE_CHANGE)
 
     def test_update_from_job_scheduler_disable(self):
         new_job, new_job_scheduler = self._make_job_scheduler("jobname", False)
@@ -296,6 +305,56 @@ class TestJobSchedulerOther(TestCase):
         assert not self.job.enabled
 
 
+class TestJobSchedulerConcurrencyLimited(TestCase):
+    @setup
+    def setup_job(self):
+        self.run_time = datetime.datetime(2024, 1, 1, 10)
+        self.scheduler = mock.Mock(schedule_on_complete=False)
+        self.scheduler.next_run_time.side_effect = lambda last: (last or self.run_time) + datetime.timedelta(hours=1)
+        action_graph = actiongraph.ActionGraph(
+            action_map={"act": action.Action("act", action.ActionCommandConfig("command"), None)},
+            required_actions={"act": set()},
+            required_triggers={"act": set()},
+        )
+        self.job = job.Job(
+            "MASTER.jobname",
+            self.scheduler,
+            node_pool=mock.Mock(),
+            action_graph=action_graph,
+            run_collection=JobRunCollection(5),
+            action_runner=actioncommand.NoActionRunnerFactory(),
+            output_path=filehandler.OutputPath(tempfile.mkdtemp()),
+        )
+        self.job_scheduler = JobScheduler(self.job)
+        self.limiter = ConcurrencyLimiter()
+        self.limiter.configure(ConfigConcurrencyLimits(namespaces={"MASTER": 0}, pools={}, executors={}, weights={}))
+        patches = [
+            mock.patch("tron.core.job_scheduler.timer_queue", autospec=True),
+            mock.patch("tron.core.concurrency.timer_queue", autospec=True),
+            mock.patch("tron.core.actionrun.concurrency_limiter", self.limiter),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_throttled_run_keeps_schedule(self):
+        self.job_scheduler.schedule()
+        (throttled,) = self.job.runs.get_pending()
+        self.job_scheduler.run_job(throttled)
+
+        # the throttled run waits for a slot, and the next run is scheduled
+        assert_equal(throttled.state, ActionRun.WAITING)
+        (scheduled,) = self.job.runs.get_pending()
+        assert scheduled is not throttled
+        assert_equal(scheduled.run_time, throttled.run_time + datetime.timedelta(hours=1))
+
+        self.job_scheduler.schedule_reconfigured()
+        assert throttled in self.job.runs.runs
+        assert_equal(throttled.state, ActionRun.WAITING)
+        assert self.limiter.is_waiting(throttled.get_action_run("act"))
+        assert_equal([run.run_time for run in self.job.runs.get_pending()], [scheduled.run_time])
+
+
 class TestJobSchedulerFactory(TestCase):
     @setup
     def setup_factory(self):
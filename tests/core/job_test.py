@@ -12,6 +12,7 @@ from tests.assertions import assert_length
 from tests.testingutils import autospec_method
 from tron import actioncommand
 from tron import node
+from tron.core import actiongraph
 from tron.core import job
 from tron.core import jobrun
 from tron.core.actionrun import ActionRun
@@ -114,6 +115,31 @@ class TestJob:
         assert_equal(self.job, other_job)
         assert_equal(self.job.runs.run_limit, 10)
 
+    def test_update_from_job_same_action_graph(self):
+        previous_graph = actiongraph.ActionGraph({}, {}, {})
+        self.job.action_graph = previous_graph
+        job_run = mock.create_autospec(jobrun.JobRun)
+        self.job.runs.__iter__.return_value = [job_run]
+        other_job = job.Job("jobname", "scheduler", action_graph=actiongraph.ActionGraph({}, {}, {}))
+
+        self.job.update_from_job(other_job)
+        # the runs' configs came from this graph, so they're left as they are
+        assert self.job.action_graph is previous_graph
+        job_run.update_action_config.assert_called_once_with(previous_graph, previous_graph, None)
+
+    def test_update_from_job_changed_action_graph(self):
+        previous_graph = mock.create_autospec(actiongraph.ActionGraph, instance=True)
+        new_graph = mock.create_autospec(actiongraph.ActionGraph, instance=True)
+        self.job.action_graph = previous_graph
+        job_run = mock.create_autospec(jobrun.JobRun)
+        self.job.runs.__iter__.return_value = [job_run]
+
+        self.job.update_from_job(job.Job("jobname", "scheduler", action_graph=new_graph))
+        new_graph.get_changed_actions.assert_called_once_with(previous_graph)
+        job_run.update_action_config.assert_called_once_with(
+            new_graph, previous_graph, new_graph.get_changed_actions.return_value
+        )
+
     def test_status_disabled(self):
         self.job.enabled = False
         assert_equal(self.job.status, self.job.STATUS_DISABLED)
@@ -306,6 +332,8 @@ class TestJobScheduler:
             )
             calls = [mock.call(mock_runs[i]) for i in range(0, len(mock_runs))]
             self.job.watch.assert_has_calls(calls)
+            for mock_run in mock_runs:
+                mock_run.resume.assert_called_once_with()
 
     def test_create_and_schedule_runs_specific_time(self):
         self.job_scheduler.get_runs_to_schedule = mock.Mock(return_value=[mock.Mock()])
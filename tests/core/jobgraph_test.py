@@ -6,6 +6,7 @@ from tron.config.schema import ConfigAction
 from tron.config.schema import ConfigJob
 from tron.core.jobgraph import AdjListEntry
 from tron.core.jobgraph import JobGraph
+from tron.core.jobgraph import TriggerEdge
 
 
 MISSING_DEPENDENCY_ERR_MSG = """The following actions are dependencies of other actions but missing:
@@ -73,7 +74,13 @@ def _setup_job_graph_config_container():
 
 class TestJobGraph:
     def setup_method(self):
-        self.job_graph = JobGraph(_setup_job_graph_config_container(), should_validate_missing_dependency=True)
+        self.config_container = _setup_job_graph_config_container()
+        self.job_graph = JobGraph(self.config_container, should_validate_missing_dependency=True)
+
+    def copy_config_container(self):
+        config_container = mock.Mock()
+        config_container.get_jobs.return_value = dict(self.config_container.get_jobs())
+        return config_container
 
     def test_job_graph_missing_dependency(self):
         missing_dependency_config_container = _setup_job_graph_config_container()
@@ -155,3 +162,109 @@ class TestJobGraph:
             "action5": {"other.job2.action3"},
             "other.job2.action3": {"MASTER.job1.action2"},
         }
+
+    def test_get_action_graph_for_job_trigger_cycle(self):
+        action_a = ConfigAction(name="a", command="do something", triggered_by=["other.job2.b.shortdate.{shortdate}"])
+        action_b = ConfigAction(name="b", command="do something", triggered_by=["MASTER.job1.a.shortdate.{shortdate}"])
+        config_container = mock.Mock()
+        config_container.get_jobs.return_value = {
+            "MASTER.job1": ConfigJob(
+                name="job1", node="default", schedule=mock.Mock(), actions={"a": action_a}, namespace="MASTER"
+            ),
+            "other.job2": ConfigJob(
+                name="job2", node="default", schedule=mock.Mock(), actions={"b": action_b}, namespace="other"
+            ),
+        }
+        action_graph = JobGraph(config_container).get_action_graph_for_job("MASTER.job1")
+        assert action_graph.required_triggers == {
+            "a": {"other.job2.b"},
+            "MASTER.job1.a": {"other.job2.b"},
+            "other.job2.b": {"a", "MASTER.job1.a"},
+        }
+
+    def test_get_action_graph_for_job_cached(self):
+        action_graph = self.job_graph.get_action_graph_for_job("MASTER.job1")
+        assert self.job_graph.get_action_graph_for_job("MASTER.job1") is action_graph
+
+        self.job_graph.update_namespace(self.copy_config_container(), "MASTER")
+        assert self.job_graph.get_action_graph_for_job("MASTER.job1") is action_graph
+
+    def assert_same_action_graphs(self, config_container):
+        fresh_graph = JobGraph(config_container)
+        for job_name in config_container.get_jobs():
+            assert self.job_graph.get_action_graph_for_job(job_name) == fresh_graph.get_action_graph_for_job(job_name)
+
+    def test_update_namespace_unchanged(self):
+        action_map = dict(self.job_graph.action_map)
+        assert self.job_graph.update_namespace(self.copy_config_container(), "MASTER") == set()
+        assert all(self.job_graph.action_map[name] is action for name, action in action_map.items())
+
+    def test_update_namespace_changed_trigger(self):
+        config_container = self.copy_config_container()
+        jobs = config_container.get_jobs.return_value
+        job2_config = jobs["other.job2"]
+        action3 = job2_config.actions["action3"]._replace(triggered_by=None)
+        jobs["other.job2"] = job2_config._replace(actions={"action3": action3})
+        unchanged_action = self.job_graph.action_map["MASTER.job3.action4"]
+        for job_name in jobs:
+            self.job_graph.get_action_graph_for_job(job_name)
+
+        affected = self.job_graph.update_namespace(config_container, "other")
+        # the trigger from job1 is gone, but job1's graph still changes
+        assert affected == {"MASTER.job1", "other.job2", "MASTER.job3"}
+        assert self.job_graph.action_map["MASTER.job3.action4"] is unchanged_action
+        self.assert_same_action_graphs(config_container)
+
+    def test_update_namespace_added_and_removed_jobs(self):
+        config_container = self.copy_config_container()
+        jobs = config_container.get_jobs.return_value
+        jobs["MASTER.job4"] = jobs.pop("MASTER.job1")._replace(name="job4")
+
+        affected = self.job_graph.update_namespace(config_container, "MASTER")
+        # job2 and job3 didn't change, but the removed job1 triggered them
+        assert affected == {"MASTER.job1", "MASTER.job4", "other.job2", "MASTER.job3"}
+        assert "MASTER.job1.action1" not in self.job_graph.action_map
+        self.assert_same_action_graphs(config_container)
+
+    def test_get_trigger_edges(self):
+        edge_1 = TriggerEdge(
+            "MASTER.job1.action2", "other.job2.action3", "MASTER.job1.action2.shortdate.{shortdate}", False
+        )
+        edge_2 = TriggerEdge(
+            "other.job2.action3", "MASTER.job3.action5", "other.job2.action3.shortdate.{shortdate}", False
+        )
+        assert self.job_graph.get_trigger_edges("MASTER.job3.action5") == [edge_1, edge_2]
+        assert self.job_graph.get_trigger_edges("MASTER.job3.action5", downstream=True) == []
+        assert self.job_graph.get_trigger_edges("MASTER.job1.action2", downstream=True) == [edge_1, edge_2]
+        assert self.job_graph.get_trigger_edges("MASTER.job1.action1", downstream=True) == []
+
+    def test_get_event_waiters(self):
+        config_container = self.copy_config_container()
+        jobs = config_container.get_jobs.return_value
+        job1_config = jobs["MASTER.job1"]
+        action2 = job1_config.actions["action2"]._replace(trigger_downstreams=True)
+        jobs["MASTER.job1"] = job1_config._replace(actions=dict(job1_config.actions, action2=action2))
+        self.job_graph.update_namespace(config_container, "MASTER")
+
+        expected = [
+            TriggerEdge("MASTER.job1.action2", "other.job2.action3", "MASTER.job1.action2.shortdate.{shortdate}", True)
+        ]
+        assert self.job_graph.get_published_triggers("MASTER.job1.action2") == [
+            "MASTER.job1.action2.shortdate.{shortdate}"
+        ]
+        assert self.job_graph.get_event_waiters("MASTER.job1.action2.shortdate.2024-01-01") == expected
+        assert self.job_graph.get_event_waiters("MASTER.job1.action2.shortdate.{shortdate}") == expected
+        assert self.job_graph.get_event_waiters("MASTER.job1.action2.other.2024-01-01") == []
+
+    def test_get_trigger_edges_after_update_namespace(self):
+        self.job_graph.get_trigger_edges("MASTER.job3.action5")
+        config_container = self.copy_config_container()
+        jobs = config_container.get_jobs.return_value
+        del jobs["other.job2"]
+
+        self.job_graph.update_namespace(config_container, "other")
+        # job3 still waits on the removed action
+        assert self.job_graph.get_trigger_edges("MASTER.job3.action5") == [
+            TriggerEdge("other.job2.action3", "MASTER.job3.action5", "other.job2.action3.shortdate.{shortdate}", False)
+        ]
+        assert self.job_graph.get_event_waiters("MASTER.job1.action2.shortdate.2024-01-01") == []
@@ -25,7 +25,7 @@ from tron.serialize import filehandler
 
 
 def build_mock_job():
-    action_graph = mock.create_autospec(actiongraph.ActionGraph)
+    action_graph = mock.create_autospec(actiongraph.ActionGraph, config_version=1)
     action_graph.action_map = {
         "foo": mock.Mock(
             triggered_by=[],
@@ -39,6 +39,7 @@ def build_mock_job():
         output_path=mock.Mock(),
         context=mock.Mock(),
         action_runner=runner,
+        priority=0,
     )
 
 
@@ -104,6 +105,27 @@ class TestJobRun:
         )
         assert_equal(run.action_runs.action_graph, self.action_graph)
         assert run.manual
+        assert run.action_config_version == self.action_graph.config_version
+
+    def test_update_action_config_same_graph(self):
+        self.job_run.action_config_version = self.action_graph.config_version
+        self.job_run.update_action_config(self.action_graph)
+        assert not self.job_run.action_runs.update_action_config.called
+
+    def test_update_action_config_from_previous_graph(self):
+        new_graph = mock.create_autospec(actiongraph.ActionGraph, config_version=2)
+        self.job_run.action_config_version = self.action_graph.config_version
+        self.job_run.update_action_config(new_graph, self.action_graph, {"foo"})
+        self.job_run.action_runs.update_action_config.assert_called_once_with(new_graph, {"foo"})
+        assert self.job_run.action_graph == new_graph
+        assert self.job_run.action_config_version == 2
+
+    def test_update_action_config_restored(self):
+        new_graph = mock.create_autospec(actiongraph.ActionGraph, config_version=2)
+        self.job_run.update_action_config(new_graph, self.action_graph, {"foo"})
+        # the restored configs may differ from any graph, so all are compared
+        self.job_run.action_runs.update_action_config.assert_called_once_with(new_graph)
+        assert self.job_run.action_config_version == 2
 
     def test_state_data(self):
         state_data = self.job_run.state_data
@@ -350,6 +372,7 @@ class TestJobRun:
         self.job_run.handler(self.action_run, mock.Mock())
         self.job_run.notify.assert_called_with(
             self.job_run.NOTIFY_STATE_CHANGED,
+            event_data=self.action_run,
         )
         startable_run.start.assert_called_with()
         assert not self.job_run.finalize.mock_calls
@@ -827,6 +850,17 @@ class TestJobRunStateTransitions:
         )
         return job_run
 
+    def test_resume(self, job_run):
+        # restored with its action runs waiting to start
+        job_run.action_runs.ready()
+        job_run.resume()
+        assert job_run.get_action_run("foo").is_starting
+        assert job_run.get_action_run("after_foo").is_waiting
+
+    def test_resume_not_started(self, job_run):
+        job_run.resume()
+        assert job_run.state == actionrun.ActionRun.SCHEDULED
+
     def test_success_path(self, job_run):
         # Check expected states as actions run normally and succeed.
         foo = job_run.get_action_run("foo")
@@ -0,0 +1,95 @@
+import datetime
+from unittest import mock
+
+import pytest
+import pytz
+
+from tron import scheduler
+from tron.core import schedule_horizon
+from tron.core.action import Action
+from tron.core.action import ActionCommandConfig
+from tron.core.actiongraph import ActionGraph
+
+
+def build_action(name, executor="kubernetes", cpus=1.0, mem=1024.0):
+    return Action(
+        name=name,
+        command_config=ActionCommandConfig(command="do", cpus=cpus, mem=mem),
+        node_pool=None,
+        executor=executor,
+    )
+
+
+@pytest.fixture
+def action_graph():
+    action_map = {
+        "first": build_action("first", cpus=0.5, mem=512),
+        "second": build_action("second"),
+        "ssh": build_action("ssh", executor="ssh", cpus=None, mem=None),
+        "waits": build_action("waits"),
+    }
+    required_actions = {"first": set(), "second": {"first"}, "ssh": set(), "waits": set()}
+    required_triggers = {"first": set(), "second": set(), "ssh": set(), "waits": {"MASTER.other.action"}}
+    return ActionGraph(action_map, required_actions, required_triggers)
+
+
+def build_job(name, sched, action_graph, enabled=True):
+    return mock.Mock(
+        scheduler=sched,
+        action_graph=action_graph,
+        enabled=enabled,
+        all_nodes=False,
+        get_name=mock.Mock(return_value=name),
+    )
+
+
+def test_get_start_resources(action_graph):
+    assert schedule_horizon.get_start_resources(action_graph) == (0.5, 512)
+
+
+def test_build_schedule_horizon(action_graph):
+    hourly = build_job("MASTER.hourly", scheduler.GeneralScheduler(minutes=[0], seconds=[0]), action_graph)
+    daily = build_job("MASTER.daily", scheduler.GeneralScheduler(timestr="12:00"), action_graph)
+    disabled = build_job("MASTER.disabled", scheduler.GeneralScheduler(timestr="12:00"), action_graph, enabled=False)
+    start_time = datetime.datetime(2012, 3, 14, 10, 30, 15)
+
+    horizon = schedule_horizon.build_schedule_horizon([hourly, daily, disabled], start_time, 3)
+
+    assert horizon["start_time"] == datetime.datetime(2012, 3, 14, 10, 30)
+    assert horizon["end_time"] == datetime.datetime(2012, 3, 14, 13, 30)
+    assert [job["name"] for job in horizon["jobs"]] == ["MASTER.hourly", "MASTER.daily"]
+    assert horizon["jobs"][0]["run_times"] == [
+        datetime.datetime(2012, 3, 14, 11),
+        datetime.datetime(2012, 3, 14, 12),
+        datetime.datetime(2012, 3, 14, 13),
+    ]
+    assert horizon["minutes"] == [
+        {"minute": datetime.datetime(2012, 3, 14, 11), "starts": 1, "cpus": 0.5, "mem": 512},
+        {"minute": datetime.datetime(2012, 3, 14, 12), "starts": 2, "cpus": 1.0, "mem": 1024},
+        {"minute": datetime.datetime(2012, 3, 14, 13), "starts": 1, "cpus": 0.5, "mem": 512},
+    ]
+    assert horizon["total_starts"] == 4
+    assert horizon["peak_starts"] == 2
+    assert horizon["peak_cpus"] == 1.0
+    assert horizon["peak_mem"] == 1024
+
+
+def test_build_schedule_horizon_all_nodes(action_graph):
+    job = build_job("MASTER.hourly", scheduler.GeneralScheduler(minutes=[0], seconds=[0]), action_graph)
+    job.all_nodes = True
+    job.node_pool.nodes = [mock.Mock(), mock.Mock()]
+    horizon = schedule_horizon.build_schedule_horizon([job], datetime.datetime(2012, 3, 14, 10, 30), 1)
+    assert horizon["minutes"] == [
+        {"minute": datetime.datetime(2012, 3, 14, 11), "starts": 2, "cpus": 1.0, "mem": 1024},
+    ]
+
+
+def test_get_run_times_with_time_zone(action_graph):
+    tz = pytz.timezone("US/Pacific")
+    job = build_job("MASTER.pacific", scheduler.GeneralScheduler(timestr="12:00", time_zone=tz), action_graph)
+    start_time = datetime.datetime(2012, 3, 14, 0, 0)
+    (run_times,) = schedule_horizon.get_run_times([job], start_time, start_time + datetime.timedelta(days=1))
+    assert len(run_times) == 1
+    assert run_times[0].tzinfo is None
+    expected = tz.localize(datetime.datetime(2012, 3, 14, 12)).astimezone().replace(tzinfo=None)
+    assert run_times[0] == expected
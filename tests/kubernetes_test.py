@@ -4,6 +4,7 @@ from unittest import mock
 import pytest
 from task_processing.interfaces.event import Event
 from task_processing.plugins.kubernetes.task_config import KubernetesTaskConfig
+from twisted.internet import task
 
 from tron.config.schema import ConfigFieldSelectorSource
 from tron.config.schema import ConfigKubernetes
@@ -17,6 +18,8 @@ from tron.kubernetes import KubernetesCluster
 from tron.kubernetes import KubernetesClusterRepository
 from tron.kubernetes import KubernetesTask
 from tron.utils import exitcode
+from tron.utils.admission import AdmissionQueue
+from tron.utils.timerqueue import TimerQueue
 
 
 @pytest.fixture
@@ -795,6 +798,71 @@ def test_submit(mock_kubernetes_cluster, mock_kubernetes_task):
     mock_kubernetes_cluster.runner.run.assert_called_once_with(mock_kubernetes_task.get_config())
 
 
+def test_submit_rate_limited(mock_kubernetes_cluster):
+    clock = task.Clock()
+    mock_kubernetes_cluster.admission = AdmissionQueue("test", rate=1, burst=1, timers=TimerQueue(clock=clock))
+    tasks = [mock.Mock(get_kubernetes_id=mock.Mock(return_value=f"task{i}")) for i in range(3)]
+    for i, k8s_task in enumerate(tasks):
+        mock_kubernetes_cluster.submit(k8s_task, priority=i)
+
+    assert list(mock_kubernetes_cluster.tasks) == ["task0"]
+    clock.advance(1)
+    # the highest priority task jumps the queue
+    assert list(mock_kubernetes_cluster.tasks) == ["task0", "task2"]
+    tasks[2].log.info.assert_called_once_with("Submission was delayed by 1.0s by the submission rate limit")
+    clock.advance(1)
+    assert list(mock_kubernetes_cluster.tasks) == ["task0", "task2", "task1"]
+    assert mock_kubernetes_cluster.runner.run.call_count == 3
+
+
+def test_submit_rate_limited_disabled_while_waiting(mock_kubernetes_cluster, mock_kubernetes_task):
+    clock = task.Clock()
+    mock_kubernetes_cluster.admission = AdmissionQueue("test", rate=1, burst=1, timers=TimerQueue(clock=clock))
+    mock_kubernetes_cluster.submit(mock.Mock())
+    with mock.patch.object(mock_kubernetes_task, "exited", autospec=True) as mock_exited:
+        mock_kubernetes_cluster.submit(mock_kubernetes_task)
+        mock_kubernetes_cluster.enabled = False
+        clock.advance(1)
+
+    assert mock_kubernetes_task.get_kubernetes_id() not in mock_kubernetes_cluster.tasks
+    mock_exited.assert_called_once_with(1)
+
+
+def test_kill_queued_task(mock_kubernetes_cluster, mock_kubernetes_task):
+    clock = task.Clock()
+    mock_kubernetes_cluster.admission = AdmissionQueue("test", rate=1, burst=1, timers=TimerQueue(clock=clock))
+    mock_kubernetes_cluster.submit(mock.Mock())
+    with mock.patch.object(mock_kubernetes_task, "exited", autospec=True) as mock_exited:
+        mock_kubernetes_cluster.submit(mock_kubernetes_task)
+        assert mock_kubernetes_cluster.kill(mock_kubernetes_task.get_kubernetes_id()) is True
+        mock_exited.assert_called_once_with(1)
+        clock.advance(1)
+
+    assert mock_kubernetes_task.get_kubernetes_id() not in mock_kubernetes_cluster.tasks
+    assert mock_kubernetes_cluster.queued_tasks == {}
+    assert mock_kubernetes_cluster.runner.kill.call_count == 0
+    assert mock_kubernetes_cluster.runner.run.call_count == 1
+    assert mock_exited.call_count == 1
+
+
+def test_stop_fail_tasks_with_queued_tasks(mock_kubernetes_cluster):
+    clock = task.Clock()
+    mock_kubernetes_cluster.admission = AdmissionQueue("test", rate=1, burst=1, timers=TimerQueue(clock=clock))
+    tasks = [mock.Mock(get_kubernetes_id=mock.Mock(return_value=f"task{i}")) for i in range(3)]
+    for k8s_task in tasks:
+        mock_kubernetes_cluster.submit(k8s_task)
+
+    mock_kubernetes_cluster.stop(fail_tasks=True)
+    for k8s_task in tasks:
+        k8s_task.exited.assert_called_once()
+    tasks[1].exited.assert_called_once_with(1)
+    assert mock_kubernetes_cluster.queued_tasks == {}
+
+    clock.advance(2)
+    assert mock_kubernetes_cluster.tasks == {}
+    assert mock_kubernetes_cluster.runner.run.call_count == 1
+
+
 def test_recover(mock_kubernetes_cluster, mock_kubernetes_task):
     with mock.patch.object(mock_kubernetes_task, "started", autospec=True) as mock_started:
         mock_kubernetes_cluster.recover(mock_kubernetes_task)
@@ -812,6 +880,8 @@ def test_kuberntes_cluster_repository():
         "kubeconfig_path": "/tmp/kubeconfig.conf",
         "watcher_kubeconfig_paths": ["/tmp/kubeconfig_old.conf"],
         "non_retryable_exit_codes": [13],
+        "submit_rate_limit": 5.0,
+        "submit_burst": 10,
         "default_volumes": [
             ConfigVolume(
                 container_path="/tmp",
@@ -341,6 +341,36 @@ class TestMCPReconfigure(TestCase):
         job_sched = self.mcp.jobs.get_by_name("MASTER.test_action_added")
         assert_length(job_sched.job.action_graph.action_map, 2)
 
+    @suite("integration")
+    def test_namespace_reconfigure(self):
+        def reconfigure_namespace(command):
+            other_config = dict(
+                jobs=[
+                    dict(
+                        name="other_job",
+                        node="node0",
+                        schedule={"type": "cron", "value": "* * * * *"},
+                        actions=[dict(name="other_action", command=command)],
+                    ),
+                ],
+            )
+            config = {
+                schema.MASTER_NAMESPACE: self._get_config(0, self.test_dir),
+                "other": other_config,
+            }
+            container = config_parse.ConfigContainer.create(config)
+            self.mcp.apply_config(container, reconfigure=True, namespace_to_reconfigure="other")
+
+        master_sched = self.mcp.jobs.get_by_name("MASTER.test_unchanged")
+        reconfigure_namespace("command_one")
+        other_sched = self.mcp.jobs.get_by_name("other.other_job")
+        assert_equal(other_sched.job.action_graph.action_map["other_action"].command, "command_one")
+
+        reconfigure_namespace("command_two")
+        assert self.mcp.jobs.get_by_name("other.other_job") is other_sched
+        assert_equal(other_sched.job.action_graph.action_map["other_action"].command, "command_two")
+        assert self.mcp.jobs.get_by_name("MASTER.test_unchanged") is master_sched
+
 
 if __name__ == "__main__":
     run()
@@ -75,13 +75,26 @@ class TestMasterControlProgram:
             (True, "MASTER"),
         ],
     )
+    @mock.patch("tron.mcp.change_log", autospec=True)
+    @mock.patch("tron.mcp.concurrency_limiter", autospec=True)
     @mock.patch("tron.mcp.KubernetesClusterRepository", autospec=True)
     @mock.patch("tron.mcp.MesosClusterRepository", autospec=True)
     @mock.patch("tron.mcp.node.NodePoolRepository", autospec=True)
-    def test_apply_config(self, mock_repo, mock_cluster_repo, mock_k8s_cluster_repo, reconfigure, namespace):
+    def test_apply_config(
+        self,
+        mock_repo,
+        mock_cluster_repo,
+        mock_k8s_cluster_repo,
+        mock_limiter,
+        mock_change_log,
+        reconfigure,
+        namespace,
+    ):
         config_container = mock.create_autospec(config_parse.ConfigContainer)
         master_config = config_container.get_master.return_value
         autospec_method(self.mcp.jobs.update_from_config)
+        updated_job = mock.Mock()
+        self.mcp.jobs.update_from_config.return_value = iter([updated_job])
         autospec_method(self.mcp.build_job_scheduler_factory)
         self.mcp.apply_config(config_container, reconfigure, namespace)
         self.mcp.state_watcher.update_from_config.assert_called_with(
@@ -100,6 +113,7 @@ class TestMasterControlProgram:
         mock_k8s_cluster_repo.configure.assert_called_with(
             master_config.k8s_options,
         )
+        mock_limiter.configure.assert_called_with(master_config.concurrency_limits)
         self.mcp.build_job_scheduler_factory(master_config, mock.Mock())
 
         expected_namespace_to_update = None if namespace == "MASTER" else namespace
@@ -108,12 +122,47 @@ class TestMasterControlProgram:
             self.mcp.build_job_scheduler_factory.return_value,
             reconfigure,
             expected_namespace_to_update,
+            None,
         )
-        self.mcp.state_watcher.watch_all.assert_called_once_with(
-            self.mcp.jobs.update_from_config.return_value,
-            mock.ANY,
+        self.mcp.state_watcher.watch.assert_any_call(updated_job, mock.ANY)
+        mock_change_log.record_job.assert_called_once_with(updated_job)
+
+    @mock.patch("tron.mcp.change_log", autospec=True)
+    @mock.patch("tron.mcp.JobGraph", autospec=True)
+    @mock.patch("tron.mcp.node.NodePoolRepository", autospec=True)
+    def test_apply_config_namespace_incremental(self, _mock_repo, mock_job_graph, _mock_change_log):
+        config_container = mock.create_autospec(config_parse.ConfigContainer)
+        job_graph = self.mcp.job_graph = mock_job_graph.return_value
+        autospec_method(self.mcp.jobs.update_from_config, return_value=iter([]))
+        autospec_method(self.mcp.build_job_scheduler_factory)
+        with mock.patch("tron.mcp.concurrency_limiter", autospec=True):
+            self.mcp.apply_config(config_container, True, "foo")
+
+        # the graph is patched rather than rebuilt
+        job_graph.update_namespace.assert_called_once_with(config_container, "foo")
+        assert not mock_job_graph.called
+        assert self.mcp.job_graph is job_graph
+        self.mcp.jobs.update_from_config.assert_called_once_with(
+            config_container.get_jobs(),
+            self.mcp.build_job_scheduler_factory.return_value,
+            True,
+            "foo",
+            job_graph.update_namespace.return_value,
         )
 
+    @mock.patch("tron.mcp.change_log", autospec=True)
+    @mock.patch("tron.mcp.node.NodePoolRepository", autospec=True)
+    def test_apply_config_removed_jobs(self, _mock_repo, mock_change_log):
+        config_container = mock.create_autospec(config_parse.ConfigContainer)
+        self.mcp.jobs.jobs["MASTER.old"] = mock.Mock()
+        self.mcp.jobs.jobs["MASTER.kept"] = mock.Mock()
+        autospec_method(self.mcp.jobs.update_from_config)
+        self.mcp.jobs.update_from_config.side_effect = lambda *args: self.mcp.jobs.jobs.pop("MASTER.old") and iter([])
+        autospec_method(self.mcp.build_job_scheduler_factory)
+        with mock.patch("tron.mcp.concurrency_limiter", autospec=True):
+            self.mcp.apply_config(config_container, True, None)
+        mock_change_log.record_job_removed.assert_called_once_with("MASTER.old")
+
     def test_update_state_watcher_config_changed(self):
         self.mcp.state_watcher.update_from_config.return_value = True
         self.mcp.jobs = mock.create_autospec(JobCollection)
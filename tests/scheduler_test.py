@@ -48,6 +48,35 @@ class TestSchedulerFromConfig(TestCase):
         assert_equal(str(sched), "daily 17:32 MWF")
 
 
+class TestGetNextRunTimes(TestCase):
+    def test_get_next_run_times(self):
+        hourly = scheduler.GeneralScheduler(minutes=[0], seconds=[0])
+        daily = scheduler.GeneralScheduler(timestr="14:30")
+        start_time = datetime.datetime(2012, 3, 14, 15, 9, 26)
+        run_times = scheduler.get_next_run_times([hourly, daily, hourly], start_time, 2)
+        assert_equal(
+            run_times,
+            [
+                [datetime.datetime(2012, 3, 14, 16), datetime.datetime(2012, 3, 14, 17)],
+                [datetime.datetime(2012, 3, 15, 14, 30), datetime.datetime(2012, 3, 16, 14, 30)],
+                [datetime.datetime(2012, 3, 14, 16), datetime.datetime(2012, 3, 14, 17)],
+            ],
+        )
+
+    def test_get_next_run_times_shares_equal_specs(self):
+        schedulers = [scheduler.GeneralScheduler(timestr="14:30") for _ in range(3)]
+        start_time = datetime.datetime(2012, 3, 14)
+        with mock.patch.object(
+            schedulers[0].time_spec,
+            "get_matches",
+            autospec=True,
+            return_value=["a"],
+        ) as mock_get_matches:
+            run_times = scheduler.get_next_run_times(schedulers, start_time, 1)
+        assert_equal(run_times, [["a"]] * 3)
+        assert_equal(mock_get_matches.call_count, 1)
+
+
 class GeneralSchedulerTestCase(testingutils.MockTimeTestCase):
 
     now = datetime.datetime.now().replace(hour=15, minute=0)
@@ -276,7 +276,8 @@ class TestStateChangeWatcher(TestCase):
             MesosClusterRepository.state_data,
         )
 
-    def test_handler_job_state_change(self):
+    @mock.patch("tron.serialize.runstate.statemanager.change_log", autospec=True)
+    def test_handler_job_state_change(self, mock_change_log):
         mock_job = mock.Mock(spec_set=Job)
         with mock.patch.object(self.watcher, "save_job") as mock_save_job:
             self.watcher.handler(
@@ -284,8 +285,10 @@ class TestStateChangeWatcher(TestCase):
                 event=Job.NOTIFY_STATE_CHANGE,
             )
             mock_save_job.assert_called_with(mock_job)
+            mock_change_log.record_job.assert_called_with(mock_job)
 
-    def test_handler_job_new_run(self):
+    @mock.patch("tron.serialize.runstate.statemanager.change_log", autospec=True)
+    def test_handler_job_new_run(self, mock_change_log):
         mock_job = mock.Mock(spec_set=Job)
         mock_job_run = mock.Mock(spec_set=JobRun)
         with mock.patch.object(self.watcher, "save_job",) as mock_save_job, mock.patch.object(
@@ -308,20 +311,27 @@ class TestStateChangeWatcher(TestCase):
             )
             mock_watch.assert_called_with(mock_job_run)
             assert mock_save_job.call_count == 0
+            mock_change_log.record_job_run.assert_called_once_with(mock_job_run)
 
-    def test_handler_job_run_state_change(self):
+    @mock.patch("tron.serialize.runstate.statemanager.change_log", autospec=True)
+    def test_handler_job_run_state_change(self, mock_change_log):
         mock_job_run = mock.MagicMock(spec_set=JobRun)
+        mock_action_run = mock.Mock()
         self.watcher.handler(
             observable=mock_job_run,
             event=JobRun.NOTIFY_STATE_CHANGED,
+            event_data=mock_action_run,
         )
         self.watcher.state_manager.save.assert_called_with(
             runstate.JOB_RUN_STATE,
             mock_job_run.name,
             mock_job_run.state_data,
         )
+        mock_change_log.record_job_run.assert_called_with(mock_job_run)
+        mock_change_log.record_action_run.assert_called_with(mock_job_run, mock_action_run)
 
-    def test_handler_job_run_removed(self):
+    @mock.patch("tron.serialize.runstate.statemanager.change_log", autospec=True)
+    def test_handler_job_run_removed(self, mock_change_log):
         mock_job_run = mock.MagicMock(spec_set=JobRun)
         self.watcher.handler(
             observable=mock_job_run,
@@ -331,6 +341,7 @@ class TestStateChangeWatcher(TestCase):
             runstate.JOB_RUN_STATE,
             mock_job_run.name,
         )
+        mock_change_log.record_job_run_removed.assert_called_with(mock_job_run)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+from twisted.internet import task
+
+from tron.utils import admission
+from tron.utils.timerqueue import TimerQueue
+
+
+@pytest.fixture
+def clock():
+    return task.Clock()
+
+
+@pytest.fixture
+def timers(clock):
+    return TimerQueue(clock=clock)
+
+
+def test_token_bucket(clock):
+    bucket = admission.TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.seconds_until_available() == 0.5
+
+    clock.advance(0.5)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # tokens never accumulate beyond the burst size
+    clock.advance(60)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_admit_unlimited(timers):
+    queue = admission.AdmissionQueue("test", timers=timers)
+    func = mock.Mock()
+    for i in range(100):
+        queue.admit(func, i)
+    assert func.call_count == 100
+    func.assert_called_with(99, 0.0)
+    assert len(queue) == 0
+
+
+def test_admit_rate_limited(timers, clock):
+    queue = admission.AdmissionQueue("test", rate=2, burst=1, timers=timers)
+    admitted = []
+    for i in range(5):
+        queue.admit(lambda i, delay: admitted.append((i, delay)), i)
+
+    assert admitted == [(0, 0.0)]
+    assert len(queue) == 4
+    clock.advance(0.5)
+    assert admitted == [(0, 0.0), (1, 0.5)]
+    clock.pump([0.5, 0.5, 0.5])
+    assert admitted == [(0, 0.0), (1, 0.5), (2, 1.0), (3, 1.5), (4, 2.0)]
+    assert queue.get_stats() == {
+        "rate": 2,
+        "queued": 0,
+        "admitted": 5,
+        "delayed": 4,
+        "total_delay": 5.0,
+        "max_delay": 2.0,
+    }
+
+
+def test_admit_by_priority(timers, clock):
+    queue = admission.AdmissionQueue("test", rate=1, burst=1, timers=timers)
+    admitted = []
+    for name, priority in [("first", 0), ("low", 0), ("high", 10), ("low2", 0), ("mid", 5)]:
+        queue.admit(lambda name, _: admitted.append(name), name, priority=priority)
+
+    clock.pump([1] * 4)
+    assert admitted == ["first", "high", "mid", "low", "low2"]
+
+
+def test_admit_exception_does_not_stop_draining(timers, clock):
+    queue = admission.AdmissionQueue("test", rate=1, burst=1, timers=timers)
+    after = mock.Mock()
+    queue.admit(mock.Mock())
+    queue.admit(mock.Mock(side_effect=ValueError))
+    queue.admit(after)
+    clock.pump([1, 1])
+    after.assert_called_once_with(2.0)
+
+
+def test_configure_removes_limit(timers, clock):
+    queue = admission.AdmissionQueue("test", rate=0.1, burst=1, timers=timers)
+    func = mock.Mock()
+    for _ in range(3):
+        queue.admit(func)
+    assert func.call_count == 1
+
+    queue.configure(None)
+    clock.advance(0)
+    assert func.call_count == 3
+    assert len(queue) == 0
+
+
+def test_configure_keeps_tokens(timers, clock):
+    queue = admission.AdmissionQueue("test", rate=1, burst=5, timers=timers)
+    func = mock.Mock()
+    for _ in range(6):
+        queue.admit(func)
+    assert func.call_count == 5
+
+    # reconfiguring with the same limit doesn't refill the burst
+    queue.configure(1, 5)
+    clock.advance(0)
+    assert func.call_count == 5
+
+    # and neither does changing it
+    queue.configure(2, 10)
+    clock.advance(0)
+    assert func.call_count == 5
+    clock.advance(0.5)
+    assert func.call_count == 6
@@ -0,0 +1,140 @@
+from unittest import mock
+
+import pytest
+
+from tron.utils import filetail
+
+
+@pytest.fixture
+def tailer():
+    return filetail.FileTailer(max_files=2)
+
+
+@pytest.fixture
+def write_file(tmp_path):
+    path = tmp_path / "stdout"
+
+    def write(content, mode="wb"):
+        with open(path, mode) as fh:
+            fh.write(content)
+        return str(path)
+
+    return write
+
+
+@pytest.mark.parametrize(
+    "content,num_lines,expected",
+    [
+        (b"a\nb\nc\n", 2, ["b", "c"]),
+        (b"a\nb\nc", 2, ["b", "c"]),
+        (b"a\nb\nc\n", 10, ["a", "b", "c"]),
+        (b"a\n\nc  \n", 2, ["", "c"]),
+        (b"a\nb\nc\n", None, ["a", "b", "c"]),
+        (b"", 5, []),
+        (b"\xff\n", 1, ["�"]),
+    ],
+)
+def test_tail(tailer, write_file, content, num_lines, expected):
+    assert tailer.tail(write_file(content), num_lines) == expected
+
+
+def test_tail_across_blocks(tailer, write_file):
+    lines = [f"line {i}" for i in range(1000)]
+    path = write_file("\n".join(lines).encode())
+    with mock.patch("tron.utils.filetail.BLOCK_SIZE", 16):
+        assert tailer.tail(path, 300) == lines[-300:]
+
+
+def test_tail_mmap(tailer, write_file):
+    lines = [f"line {i}" for i in range(1000)]
+    path = write_file(("\n".join(lines) + "\n").encode())
+    with mock.patch("tron.utils.filetail.MMAP_THRESHOLD", 0):
+        assert tailer.tail(path, 3) == lines[-3:]
+        assert tailer.tail(path) == lines
+
+
+def test_tail_max_bytes(tailer, write_file):
+    path = write_file(b"first\nsecond\nthird\n")
+    # the partly read "second" is dropped
+    assert tailer.tail(path, max_bytes=9) == ["third"]
+    assert tailer.tail(path, 5, max_bytes=9) == ["third"]
+
+
+def test_tail_missing_file(tailer, tmp_path):
+    assert tailer.tail(str(tmp_path / "missing"), 5) == []
+
+
+def test_tail_follow_reads_appended(tailer, write_file):
+    path = write_file(b"a\nb\npart")
+    assert tailer.tail(path, 2) == ["b", "part"]
+
+    write_file(b"ial\nc\n", mode="ab")
+    with mock.patch("tron.utils.filetail._read_tail", autospec=True) as mock_read_tail:
+        assert tailer.tail(path, 2) == ["partial", "c"]
+        assert tailer.tail(path, 2) == ["partial", "c"]
+    assert not mock_read_tail.called
+
+
+def test_tail_follow_truncated(tailer, write_file):
+    path = write_file(b"a\nb\nc\n")
+    assert tailer.tail(path, 2) == ["b", "c"]
+    write_file(b"d\n")
+    assert tailer.tail(path, 2) == ["d"]
+
+
+def test_tail_follow_lru(tailer, write_file, tmp_path):
+    path = write_file(b"a\n")
+    for num_lines in (1, 2, 3):
+        tailer.tail(path, num_lines)
+    assert [key[1] for key in tailer.followed] == [2, 3]
+
+
+def test_read_lines(write_file):
+    path = write_file(b"a\nb\npart")
+    lines, file_id, offset = filetail.read_lines(path, num_lines=1)
+    # the partial line is held back until its newline is written
+    assert (lines, offset) == (["b"], 4)
+
+    write_file(b"ial\nc\n", mode="ab")
+    lines, file_id, offset = filetail.read_lines(path, file_id, offset)
+    assert (lines, offset) == (["partial", "c"], 14)
+    assert filetail.read_lines(path, file_id, offset) == ([], file_id, offset)
+
+
+def test_read_lines_final(write_file):
+    path = write_file(b"a\npart")
+    assert filetail.read_lines(path, num_lines=5, final=True)[::2] == (["a", "part"], 6)
+
+
+def test_read_lines_replaced(write_file):
+    path = write_file(b"a\nb\n")
+    lines, file_id, offset = filetail.read_lines(path)
+    assert lines == ["a", "b"]
+    assert filetail.read_lines(path, (0, 0), offset, num_lines=1)[::2] == (["b"], 4)
+    write_file(b"c\n")
+    assert filetail.read_lines(path, file_id, offset)[::2] == (["c"], 2)
+
+
+def test_read_lines_max_bytes(write_file):
+    path = write_file(b"first\nsecond\nthird\n")
+    assert filetail.read_lines(path, max_bytes=9)[::2] == (["third"], 19)
+    file_id = filetail.read_lines(path)[1]
+    assert filetail.read_lines(path, file_id, offset=0, max_bytes=9)[::2] == (["first"], 6)
+    # lines longer than max_bytes are returned in parts
+    lines, file_id, offset = filetail.read_lines(path, file_id, offset=0, max_bytes=3)
+    assert (lines, offset) == (["fir"], 3)
+
+
+def test_read_lines_max_bytes_at_line_start(write_file):
+    path = write_file(b"one\ntwo\n")
+    # the budget ends right after a newline, so no line is cut
+    assert filetail.read_lines(path, max_bytes=4)[::2] == (["two"], 8)
+    assert filetail.file_tailer.tail(path, max_bytes=4) == ["two"]
+
+
+def test_tail_follow_rewritten(tailer, write_file):
+    path = write_file(b"a\nb\nc\n")
+    assert tailer.tail(path, 2) == ["b", "c"]
+    # truncated in place and regrown past the cached offset between reads
+    write_file(b"x\ny\nz\nw\n", mode="r+b")
+    assert tailer.tail(path, 2) == ["z", "w"]
@@ -1,4 +1,6 @@
 import datetime
+import json
+import os
 from unittest import mock
 
 import pytest
@@ -10,8 +12,17 @@ from tron.utils.logreader import read_log_stream_for_action_run
 
 try:
     from logreader.readers import S3LogsReader  # noqa: F401
+
+    s3reader_available = True
 except ImportError:
-    pytest.skip("yelp logs readers not available, skipping tests", allow_module_level=True)
+    s3reader_available = False
+
+requires_s3reader = pytest.mark.skipif(not s3reader_available, reason="yelp logs readers not available")
+
+
+@pytest.fixture(autouse=True)
+def clear_log_stream_cache():
+    tron.utils.logreader.log_stream_cache.clear()
 
 
 # used for an explicit patch of staticconf.read return value for an arbitrary namespace
@@ -19,6 +30,7 @@ def static_conf_patch(args):
     return lambda arg, namespace, default=None: args.get(arg)
 
 
+@requires_s3reader
 def test_read_log_stream_for_action_run_not_available():
     with mock.patch("tron.utils.logreader.s3reader_available", False):
         output = tron.utils.logreader.read_log_stream_for_action_run(
@@ -31,6 +43,7 @@ def test_read_log_stream_for_action_run_not_available():
     assert "unable to display logs" in output[0]
 
 
+@requires_s3reader
 def test_read_log_stream_for_action_run():
     with mock.patch(
         "staticconf.read",
@@ -85,16 +98,17 @@ def test_read_log_stream_for_action_run():
     assert output == ["line 1", "line 2"]
 
 
+@requires_s3reader
 @pytest.mark.parametrize(
     "local_datetime, expected_datetime",
     [
         (
             datetime.datetime(2024, 2, 29, 23, 59, 59, tzinfo=datetime.timezone(datetime.timedelta(hours=+3))),
-            datetime.datetime(2024, 2, 29, 20, 59, 59, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 2, 29, tzinfo=datetime.timezone.utc),
         ),
         (
             datetime.datetime(2024, 2, 29, 23, 59, 59, tzinfo=datetime.timezone(datetime.timedelta(hours=-3))),
-            datetime.datetime(2024, 3, 1, 2, 59, 59, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc),
         ),
     ],
 )
@@ -120,10 +134,13 @@ def test_read_log_stream_for_action_run_tz(local_datetime, expected_datetime):
             paasta_cluster="fake",
         )
     mock_s3_log_reader.return_value.get_log_reader.assert_called_once_with(
-        log_name=mock.ANY, start_datetime=expected_datetime, end_datetime=expected_datetime
+        log_name=mock.ANY,
+        start_datetime=expected_datetime,
+        end_datetime=expected_datetime + datetime.timedelta(days=1, microseconds=-1),
     )
 
 
+@requires_s3reader
 def test_read_log_stream_for_action_run_for_long_output():
     # 1000 represents the number of lines that are expected to be
     # outputted by the test, which is similar to the logging.max_lines_to_display
@@ -214,3 +231,150 @@ def test_decompose_action_id_service_not_found():
         assert job_name == "job"
         assert run_num == "1234"
         assert action == "action"
+
+
+def build_log_line(run_num, message, timestamp, component="stdout", cluster="fake"):
+    return json.dumps(
+        {
+            "tron_run_number": run_num,
+            "component": component,
+            "message": message,
+            "timestamp": timestamp,
+            "cluster": cluster,
+            "pod_name": "namespace.job.1234.action",
+        }
+    )
+
+
+class TestReadLogStreamFromFiles:
+    stream_name = "stream_paasta_app_output_namespace_job__action"
+
+    @pytest.fixture(autouse=True)
+    def setup_reader(self, tmp_path):
+        self.log_dir = tmp_path
+        self.reader = tron.utils.logreader.FileLogsReader(str(tmp_path))
+        self.get_log_reader = mock.Mock(wraps=self.reader.get_log_reader)
+        mock_reader = mock.Mock(get_log_reader=self.get_log_reader)
+        with mock.patch("tron.utils.logreader.s3reader_available", True), mock.patch(
+            "tron.utils.logreader.S3LogsReader", return_value=mock_reader
+        ), mock.patch("tron.utils.logreader.get_superregion", autospec=True, return_value="fake"):
+            yield
+
+    def write_day(self, day, lines):
+        path = self.log_dir / self.stream_name / f"{day}.log"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("\n".join(lines) + "\n")
+
+    def read(self, run_id="namespace.job.1234.action", min_date=None, max_date=None, max_lines=1000):
+        return read_log_stream_for_action_run(
+            run_id,
+            component="stdout",
+            min_date=min_date or datetime.datetime(2024, 3, 1, 23, tzinfo=datetime.timezone.utc),
+            max_date=max_date or datetime.datetime(2024, 3, 2, 1, tzinfo=datetime.timezone.utc),
+            paasta_cluster="fake",
+            max_lines=max_lines,
+        )
+
+    def test_read_across_days(self):
+        self.write_day(
+            "2024-03-01",
+            [
+                build_log_line(1234, "line 2", "2024-03-01T23:30:00Z"),
+                build_log_line(123, "other run", "2024-03-01T23:00:00Z"),
+                build_log_line(1234, "line 1", "2024-03-01T23:00:00Z"),
+                build_log_line(1234, "stderr", "2024-03-01T23:00:00Z", component="stderr"),
+                build_log_line(1234, "other cluster", "2024-03-01T23:00:00Z", cluster="other"),
+                "not json",
+            ],
+        )
+        self.write_day("2024-03-02", [build_log_line(1234, "line 3", "2024-03-02T00:30:00Z")])
+        assert self.read() == ["line 1", "line 2", "line 3", "1 encountered while retrieving logs"]
+        assert self.get_log_reader.call_count == 2
+
+    def test_read_cached(self):
+        self.write_day("2024-03-01", [build_log_line(1234, "line 1", "2024-03-01T23:00:00Z")])
+        self.write_day("2024-03-02", [build_log_line(1235, "line 2", "2024-03-02T00:30:00Z")])
+        assert self.read() == ["line 1"]
+        # other runs of the job on the same days use the same index
+        assert self.read(run_id="namespace.job.1235.action") == ["line 2"]
+        assert self.get_log_reader.call_count == 2
+
+    def test_read_current_day_expires(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.write_day(now.date(), [build_log_line(1234, "line 1", now.isoformat())])
+        assert self.read(min_date=now, max_date=now) == ["line 1"]
+        assert self.read(min_date=now, max_date=now) == ["line 1"]
+        assert self.get_log_reader.call_count == 1
+
+        with mock.patch(
+            "tron.utils.logreader.time.time",
+            return_value=now.timestamp() + tron.utils.logreader.CURRENT_DAY_TTL_SECONDS + 1,
+        ):
+            self.read(min_date=now, max_date=now)
+        assert self.get_log_reader.call_count == 2
+
+    def test_read_truncated(self):
+        self.write_day(
+            "2024-03-01",
+            [build_log_line(1234, f"line {i}", f"2024-03-01T23:00:0{i}Z") for i in range(5)],
+        )
+        output = self.read(max_lines=3)
+        assert output[:3] == ["line 0", "line 1", "line 2"]
+        assert output[3].startswith("This output is truncated.")
+
+        # reading more lines than were indexed reads the day again
+        assert self.read(max_lines=10) == [f"line {i}" for i in range(5)]
+        assert self.get_log_reader.call_count == 3
+
+
+def test_log_stream_cache_lru():
+    cache = tron.utils.logreader.LogStreamCache(max_days=2)
+    with mock.patch("tron.utils.logreader.S3LogsReader", autospec=True) as mock_s3_reader:
+        mock_s3_reader.return_value.get_log_reader.side_effect = lambda **kwargs: iter([])
+        days = [datetime.date(2024, 3, 1), datetime.date(2024, 3, 2), datetime.date(2024, 3, 3)]
+        cache.get_indexes("fake", "stream", days, None)
+    assert [key[2] for key in cache.indexes] == days[1:]
+
+
+class TestSoaConfigCache:
+    @pytest.fixture(autouse=True)
+    def setup_soaconfig(self, tmp_path):
+        self.path = tmp_path / "namespace" / "tron-fake_cluster.yaml"
+        self.path.parent.mkdir()
+        with mock.patch("tron.utils.logreader.SOACONFIG_DIR", str(tmp_path)):
+            tron.utils.logreader.soaconfig_cache.clear()
+            yield
+
+    def write_config(self, service):
+        self.path.write_text(yaml.safe_dump({"job": {"actions": {"action": {"service": service}, "other": None}}}))
+
+    def test_decompose_action_id_service(self):
+        self.write_config("other_service")
+        assert decompose_action_id("namespace.job.1234.action", "fake_cluster") == (
+            "other_service",
+            "job",
+            "1234",
+            "action",
+        )
+        assert decompose_action_id("namespace.job.1234.other", "fake_cluster")[0] == "namespace"
+
+    def test_decompose_action_id_cached(self):
+        self.write_config("other_service")
+        with mock.patch("tron.utils.logreader.yaml.load", autospec=True, wraps=yaml.load) as mock_load:
+            decompose_action_id("namespace.job.1234.action", "fake_cluster")
+            decompose_action_id("namespace.job.1235.action", "fake_cluster")
+        assert mock_load.call_count == 1
+
+    def test_decompose_action_id_file_changed(self):
+        self.write_config("other_service")
+        decompose_action_id("namespace.job.1234.action", "fake_cluster")
+        self.write_config("another_service")
+        os.utime(self.path, ns=(0, 0))
+        assert decompose_action_id("namespace.job.1234.action", "fake_cluster")[0] == "another_service"
+
+    def test_decompose_action_id_invalid_config_cached(self):
+        self.path.write_text("invalid_yaml")
+        with mock.patch("tron.utils.logreader.yaml.load", autospec=True, wraps=yaml.load) as mock_load:
+            assert decompose_action_id("namespace.job.1234.action", "fake_cluster")[0] == "namespace"
+            assert decompose_action_id("namespace.job.1234.action", "fake_cluster")[0] == "namespace"
+        assert mock_load.call_count == 1
@@ -0,0 +1,64 @@
+from tron.utils.rwlock import ReadWriteLock
+
+
+def test_readers_share():
+    lock = ReadWriteLock()
+    first, second = lock.acquire_read(), lock.acquire_read()
+    assert first.called and second.called
+    assert lock.readers == 2
+
+
+def test_writer_waits_for_readers():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    writer = lock.acquire_write()
+    assert not writer.called
+    lock.release_read()
+    assert writer.called
+    assert lock.writer
+
+
+def test_readers_wait_for_writer():
+    lock = ReadWriteLock()
+    lock.acquire_write()
+    readers = [lock.acquire_read(), lock.acquire_read()]
+    assert not any(d.called for d in readers)
+    lock.release_write()
+    assert all(d.called for d in readers)
+
+
+def test_fair_order():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    writer = lock.acquire_write()
+    # A reader arriving after a waiting writer doesn't jump ahead of it
+    reader = lock.acquire_read()
+    assert not reader.called
+    assert lock.get_queue_depth() == 2
+
+    lock.release_read()
+    assert writer.called and not reader.called
+    lock.release_write()
+    assert reader.called
+
+
+def test_cancel_waiting_writer():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    writer = lock.acquire_write()
+    writer.addErrback(lambda _: None)
+    reader = lock.acquire_read()
+    writer.cancel()
+    assert reader.called
+    assert lock.get_queue_depth() == 0
+
+
+def test_release_in_callback():
+    lock = ReadWriteLock()
+    lock.acquire_write()
+    reader = lock.acquire_read()
+    reader.addCallback(lambda _: lock.release_read())
+    writer = lock.acquire_write()
+    lock.release_write()
+    assert reader.called and writer.called
+    assert lock.readers == 0 and lock.writer
@@ -0,0 +1,125 @@
+from unittest import mock
+
+import pytest
+from twisted.internet import task
+
+from tron.utils import timerqueue
+
+
+@pytest.fixture
+def clock():
+    return task.Clock()
+
+
+@pytest.fixture
+def queue(clock):
+    return timerqueue.TimerQueue(clock=clock)
+
+
+def test_call_later_uses_single_reactor_timer(queue, clock):
+    for delay in (30, 10, 20):
+        queue.call_later(delay, mock.Mock())
+
+    assert len(queue) == 3
+    assert len(clock.getDelayedCalls()) == 1
+    assert clock.getDelayedCalls()[0].getTime() == 10
+
+
+def test_calls_fire_in_order(queue, clock):
+    fired = []
+    queue.call_later(20, fired.append, "b")
+    queue.call_later(10, fired.append, "a")
+    queue.call_later(20, fired.append, "c")
+
+    clock.advance(10)
+    assert fired == ["a"]
+    clock.advance(10)
+    assert fired == ["a", "b", "c"]
+    assert len(queue) == 0
+    assert clock.getDelayedCalls() == []
+
+
+def test_call_later_passes_kwargs(queue, clock):
+    func = mock.Mock()
+    queue.call_later(1, func, 1, key="value")
+    clock.advance(1)
+    func.assert_called_once_with(1, key="value")
+
+
+def test_cancel(queue, clock):
+    func = mock.Mock()
+    call = queue.call_later(10, func)
+    other = queue.call_later(20, mock.Mock())
+
+    call.cancel()
+    assert not call.active()
+    assert len(queue) == 1
+    assert queue.next_fire_time() == 20
+    assert queue.upcoming() == [other]
+
+    clock.advance(20)
+    assert not func.called
+    assert not other.active()
+
+
+def test_cancel_twice_is_noop(queue):
+    call = queue.call_later(10, mock.Mock())
+    call.cancel()
+    call.cancel()
+    assert len(queue) == 0
+
+
+def test_cancel_last_call_clears_reactor_timer(queue, clock):
+    call = queue.call_later(10, mock.Mock())
+    call.cancel()
+    assert clock.getDelayedCalls() == []
+
+
+def test_earlier_call_rearms_timer(queue, clock):
+    queue.call_later(60, mock.Mock())
+    queue.call_later(5, mock.Mock())
+    assert [c.getTime() for c in clock.getDelayedCalls()] == [5]
+
+
+def test_callback_can_schedule_new_call(queue, clock):
+    fired = []
+
+    def reschedule():
+        fired.append("first")
+        queue.call_later(5, fired.append, "next")
+
+    queue.call_later(1, reschedule)
+    clock.advance(1)
+    assert fired == ["first"]
+    assert [c.getTime() for c in clock.getDelayedCalls()] == [6]
+    clock.advance(5)
+    assert fired == ["first", "next"]
+
+
+def test_callback_exception_does_not_stop_other_calls(queue, clock):
+    after = mock.Mock()
+    queue.call_later(1, mock.Mock(side_effect=ValueError))
+    queue.call_later(1, after)
+    clock.advance(1)
+    assert after.called
+
+
+def test_cancelled_calls_are_compacted(queue):
+    calls = [queue.call_later(i, mock.Mock()) for i in range(timerqueue.COMPACT_THRESHOLD)]
+    for call in calls[1:]:
+        call.cancel()
+    assert len(queue._heap) < timerqueue.COMPACT_THRESHOLD
+    assert queue.upcoming() == calls[:1]
+
+
+def test_upcoming_limit(queue):
+    calls = [queue.call_later(i, mock.Mock()) for i in (3, 1, 2)]
+    assert queue.upcoming(limit=2) == [calls[1], calls[2]]
+
+
+def test_clear(queue, clock):
+    call = queue.call_later(1, mock.Mock())
+    queue.clear()
+    assert not call.active()
+    assert len(queue) == 0
+    assert clock.getDelayedCalls() == []
@@ -18,6 +18,20 @@ class TestGetTime(TestCase):
         assert not trontimespec.get_time("22:61")
 
 
+class TestBitsets(TestCase):
+    def test_to_bitset(self):
+        assert_equal(trontimespec.to_bitset([0, 3, 5]), 0b101001)
+        assert_equal(trontimespec.to_bitset([]), 0)
+
+    def test_next_bit(self):
+        bits = trontimespec.to_bitset([3, 10, 59])
+        assert_equal(trontimespec.next_bit(bits, 0), 3)
+        assert_equal(trontimespec.next_bit(bits, 3), 3)
+        assert_equal(trontimespec.next_bit(bits, 4), 10)
+        assert_equal(trontimespec.next_bit(bits, 11), 59)
+        assert trontimespec.next_bit(bits, 60) is None
+
+
 class TestTimeSpecification(TestCase):
     def _cmp(self, start_time, expected):
         start_time = datetime.datetime(*start_time)
@@ -131,6 +145,38 @@ class TestTimeSpecification(TestCase):
         time = time_spec.next_time(start_date, False)
         assert_equal(time, datetime.time(1, 20, 4))
 
+    def test_next_time_wraps_minute_and_hour(self):
+        time_spec = trontimespec.TimeSpecification(
+            minutes=[10, 50],
+            hours=[1, 5],
+            seconds=[30],
+        )
+        start_date = datetime.datetime(2012, 3, 14, 1, 10, 30)
+        assert_equal(time_spec.next_time(start_date, True), datetime.time(1, 50, 30))
+        start_date = datetime.datetime(2012, 3, 14, 1, 50, 30, 5)
+        assert_equal(time_spec.next_time(start_date, True), datetime.time(5, 10, 30))
+
+    def test_next_day_is_memoized(self):
+        time_spec = trontimespec.TimeSpecification(weekdays=[1, 5])
+        assert_equal(time_spec.next_day(1, 2012, 3), time_spec.next_day(1, 2012, 3))
+        assert_equal(list(time_spec._days_by_month), [(2012, 3)])
+
+    def test_get_matches(self):
+        time_spec = trontimespec.TimeSpecification(monthdays=[5, "LAST"])
+        matches = time_spec.get_matches(datetime.datetime(2012, 2, 10), 3)
+        expected = [
+            datetime.datetime(2012, 2, 29),
+            datetime.datetime(2012, 3, 5),
+            datetime.datetime(2012, 3, 31),
+        ]
+        assert_equal(matches, expected)
+
+    def test_hash_matches_equality(self):
+        time_spec = trontimespec.TimeSpecification(hours=[4, 10], timezone="US/Pacific")
+        other = trontimespec.TimeSpecification(hours=[10, 4], timezone="US/Pacific")
+        assert_equal(time_spec, other)
+        assert_equal(hash(time_spec), hash(other))
+
     def test_get_match_dst_spring_forward(self):
         tz = pytz.timezone("US/Pacific")
         time_spec = trontimespec.TimeSpecification(
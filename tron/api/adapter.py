@@ -5,6 +5,7 @@
  data of an object.
 """
 import functools
+import itertools
 import os.path
 import time
 from collections.abc import Callable
@@ -17,7 +18,8 @@ from tron import scheduler
 from tron.core.actionrun import KubernetesActionRun
 from tron.serialize import filehandler
 from tron.utils import timeutils
-from tron.utils.logreader import read_log_stream_for_action_run
+from tron.utils.logreader import read_log_stream_parts_for_action_run
+from tron.utils.logreader import USE_SRV_CONFIGS
 from tron.utils.timeutils import delta_total_seconds
 
 R = TypeVar("R")
@@ -40,6 +42,15 @@ class ReprAdapter:
     def _get_translation_mapping(self):
         return {field_name: getattr(self, "get_%s" % field_name) for field_name in self.translated_field_names}
 
+    def select(self, field_names):
+        """Only include field_names in the repr, if not None. Fields which
+        aren't included are never computed.
+        """
+        if field_names is not None:
+            self.fields = [field for field in self.fields if field in field_names]
+            self.translators = {field: func for field, func in self.translators.items() if field in field_names}
+        return self
+
     def get_repr(self):
         repr_data = {field: getattr(self._obj, field) for field in self.fields}
         translated = {field: func() for field, func in self.translators.items()}
@@ -194,38 +205,63 @@ class ActionRunAdapter(RunAdapter):
                     return output
         return output
 
+    def read_log_stream(self, component: str, max_lines: int | None) -> list[str]:
+        """Read the output of a Kubernetes action run from its PaaSTA log stream."""
+        lines, notices = self.read_log_stream_parts(component, max_lines)
+        return lines + notices
+
+    def read_log_stream_parts(
+        self, component: str, max_lines: int | None = USE_SRV_CONFIGS
+    ) -> tuple[list[str], list[str]]:
+        """Return (lines, notices) for the output of a Kubernetes action run
+        in its PaaSTA log stream, as read_log_stream_parts_for_action_run()
+        does. By default, no more lines of the stream are read than
+        logging.max_lines_to_display.
+        """
+        # it's possible that we have a job that logs to the samestream as another job on a
+        # different master (e.g., 1 job in pnw-devc and another in norcal-devc), so we
+        # additionally filter by the cluster in each log message.
+        # we get this information from the last attempt for this ActionRun, but
+        # all of the attempts should always have the same value. This value is guaranteed
+        # to be here as it's part of the PaaSTA Contract, but there's also a fallback in
+        # read_log_stream_for_action_run() to use the current superregion for the tron
+        # master should something go horribly wrong
+        paasta_cluster = None
+        if self._obj.attempts:
+            paasta_cluster = self._obj.attempts[-1].command_config.env.get("PAASTA_CLUSTER")
+
+        return read_log_stream_parts_for_action_run(
+            action_run_id=self._obj.id,
+            component=component,
+            # we update the start time of an ActionRun on a retry so we can't just use
+            # that start time to figure out when we should start displaying logs for.
+            # instead, we use the first attempt's start time as the date from which to
+            # start getting logs from and the last attempt's end time as the date at
+            # which we stop getting logs from.
+            # in the case of an action that completed on its initial run, there will
+            # only be one attempt, but that's fine as these single attempts will still
+            # have the correct information.
+            # XXX: this is suboptimal if there's many days between retries
+            min_date=self._obj.attempts[0].start_time if self._obj.attempts else None,
+            max_date=self._obj.attempts[-1].end_time if self._obj.attempts else None,
+            paasta_cluster=paasta_cluster,
+            max_lines=max_lines,
+        )
+
+    def get_output_path(self, filename: str) -> str | None:
+        """Return the path of an output file of the action run, if it exists
+        in the output directory or any of the alternate ones.
+        """
+        paths = itertools.chain(
+            [self._get_serializer().full_path(filename)],
+            (self._get_serializer(alt_path).full_path(filename) for alt_path in self._get_alternate_output_paths()),
+        )
+        return next((str(path) for path in paths if os.path.exists(path)), None)
+
     @toggle_flag("include_stdout")
     def get_stdout(self) -> list[str]:
         if isinstance(self._obj, KubernetesActionRun):
-            # it's possible that we have a job that logs to the samestream as another job on a
-            # different master (e.g., 1 job in pnw-devc and another in norcal-devc), so we
-            # additionally filter by the cluster in each log message.
-            # we get this information from the last attempt for this ActionRun, but
-            # all of the attempts should always have the same value. This value is guaranteed
-            # to be here as it's part of the PaaSTA Contract, but there's also a fallback in
-            # read_log_stream_for_action_run() to use the current superregion for the tron
-            # master should something go horribly wrong
-            paasta_cluster = None
-            if self._obj.attempts:
-                paasta_cluster = self._obj.attempts[-1].command_config.env.get("PAASTA_CLUSTER")
-
-            return read_log_stream_for_action_run(
-                action_run_id=self._obj.id,
-                component="stdout",
-                # we update the start time of an ActionRun on a retry so we can't just use
-                # that start time to figure out when we should start displaying logs for.
-                # instead, we use the first attempt's start time as the date from which to
-                # start getting logs from and the last attempt's end time as the date at
-                # which we stop getting logs from.
-                # in the case of an action that completed on its initial run, there will
-                # only be one attempt, but that's fine as these single attempts will still
-                # have the correct information.
-                # XXX: this is suboptimal if there's many days between retries
-                min_date=self._obj.attempts[0].start_time if self._obj.attempts else None,
-                max_date=self._obj.attempts[-1].end_time if self._obj.attempts else None,
-                paasta_cluster=paasta_cluster,
-                max_lines=self.max_lines,
-            )
+            return self.read_log_stream("stdout", self.max_lines)
 
         filename = actioncommand.ActionCommand.STDOUT
         output = self._get_serializer().tail(filename, self.max_lines)
@@ -239,35 +275,7 @@ class ActionRunAdapter(RunAdapter):
     @toggle_flag("include_stderr")
     def get_stderr(self) -> list[str]:
         if isinstance(self._obj, KubernetesActionRun):
-            # it's possible that we have a job that logs to the samestream as another job on a
-            # different master (e.g., 1 job in pnw-devc and another in norcal-devc), so we
-            # additionally filter by the cluster in each log message.
-            # we get this information from the last attempt for this ActionRun, but
-            # all of the attempts should always have the same value. This value is guaranteed
-            # to be here as it's part of the PaaSTA Contract, but there's also a fallback in
-            # read_log_stream_for_action_run() to use the current superregion for the tron
-            # master should something go horribly wrong
-            paasta_cluster = None
-            if self._obj.attempts:
-                paasta_cluster = self._obj.attempts[-1].command_config.env.get("PAASTA_CLUSTER")
-
-            return read_log_stream_for_action_run(
-                action_run_id=self._obj.id,
-                component="stderr",
-                # we update the start time of an ActionRun on a retry so we can't just use
-                # that start time to figure out when we should start displaying logs for.
-                # instead, we use the first attempt's start time as the date from which to
-                # start getting logs from and the last attempt's end time as the date at
-                # which we stop getting logs from.
-                # in the case of an action that completed on its initial run, there will
-                # only be one attempt, but that's fine as these single attempts will still
-                # have the correct information.
-                # XXX: this is suboptimal if there's many days between retries
-                min_date=self._obj.attempts[0].start_time if self._obj.attempts else None,
-                max_date=self._obj.attempts[-1].end_time if self._obj.attempts else None,
-                paasta_cluster=paasta_cluster,
-                max_lines=self.max_lines,
-            )
+            return self.read_log_stream("stderr", self.max_lines)
 
         filename = actioncommand.ActionCommand.STDERR
         output = self._get_serializer().tail(filename, self.max_lines)
@@ -423,6 +431,8 @@ class JobAdapter(ReprAdapter):
         include_action_graph=True,
         include_node_pool=True,
         num_runs=None,
+        runs_before=None,
+        run_states=None,
     ):
         super().__init__(job)
         self.include_job_runs = include_job_runs
@@ -430,6 +440,8 @@ class JobAdapter(ReprAdapter):
         self.include_action_graph = include_action_graph
         self.include_node_pool = include_node_pool
         self.num_runs = num_runs
+        self.runs_before = runs_before
+        self.run_states = run_states
 
     def get_name(self):
         return self._obj.get_name()
@@ -460,12 +472,17 @@ class JobAdapter(ReprAdapter):
 
     @toggle_flag("include_job_runs")
     def get_runs(self):
-        runs = adapt_many(
+        # Runs are newest first, filtered before they're adapted
+        runs = iter(list(self._obj.runs))
+        if self.runs_before is not None:
+            runs = (run for run in runs if run.run_num < self.runs_before)
+        if self.run_states is not None:
+            runs = (run for run in runs if run.state in self.run_states)
+        return adapt_many(
             JobRunAdapter,
-            list(self._obj.runs)[: self.num_runs or None],
+            itertools.islice(runs, self.num_runs or None),
             self.include_action_runs,
         )
-        return runs
 
     def get_max_runtime(self):
         return str(self._obj.max_runtime)
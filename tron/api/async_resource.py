@@ -1,10 +1,40 @@
-import threading
+"""
+Run API requests without blocking the reactor.
+
+Requests which only read tron's state (`bounded`) run in a thread pool while
+holding a read lock, so any number of them can run at once. Requests which
+change it (`exclusive`) run on the reactor thread while holding the write
+lock. The lock is fair, so commands don't wait behind a stream of reads, and
+waiting for it never blocks the reactor.
+
+Requests which only read snapshots published by the reactor (`snapshot`) run
+in the same thread pools, without the lock.
+
+Reads of each kind of endpoint get their own pool of threads (resources pick
+one with an `api_pool` attribute), so slow requests for logs can't take every
+thread needed to list jobs. Requests from clients which disconnect before
+they are processed are dropped.
+"""
+import functools
 import time
 
+from twisted.internet import defer
+from twisted.internet import reactor
 from twisted.internet import threads
+from twisted.python import failure
+from twisted.python.threadpool import ThreadPool
 from twisted.web import server
 
+import tron.prom_metrics as prom_metrics
+from tron.api.streaming import StreamingResponse
 from tron.metrics import timer
+from tron.utils.rwlock import ReadWriteLock
+
+LISTING_POOL = "listing"
+LOGS_POOL = "logs"
+# Requests which change state run on the reactor thread, this only labels
+# their metrics
+COMMANDS_POOL = "commands"
 
 
 def report_resource_request(resource, request, duration_ms):
@@ -15,56 +45,189 @@ def report_resource_request(resource, request, duration_ms):
     )
 
 
+class ApiPool:
+    """Threads for one kind of read request, and a semaphore so requests
+    queue on the reactor (where they can be cancelled) rather than in the
+    thread pool.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.semaphore = defer.DeferredSemaphore(size)
+        self.thread_pool = None
+
+    def get_thread_pool(self):
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPool(minthreads=0, maxthreads=self.size, name=f"tron-api-{self.name}")
+            self.thread_pool.start()
+            reactor.addSystemEventTrigger("during", "shutdown", self.thread_pool.stop)
+        return self.thread_pool
+
+
+class ReadCall:
+    """A call to run in a thread from an ApiPool, while holding the read lock
+    if `locked`. The Deferred from start() can be cancelled until the call is
+    running.
+    """
+
+    def __init__(self, pool, fn, args, locked=True):
+        self.pool = pool
+        self.fn = fn
+        self.args = args
+        self.locked = locked
+        self.queued_at = time.time()
+        self.waiting_on = None
+        self.has_slot = False
+        self.running = False
+        self.cancelled = False
+        self.result = defer.Deferred(canceller=self._cancel)
+
+    def start(self):
+        prom_metrics.tron_api_queue_depth_gauge.labels(self.pool.name).inc()
+        self._wait(self.pool.semaphore.acquire(), self._got_slot)
+        return self.result
+
+    def _wait(self, d, callback):
+        self.waiting_on = d
+        d.addCallbacks(callback, lambda f: f.trap(defer.CancelledError))
+
+    def _got_slot(self, _):
+        self.has_slot = True
+        if self.locked:
+            self._wait(AsyncResource.lock.acquire_read(), self._got_lock)
+        else:
+            self._got_lock(None)
+
+    def _got_lock(self, _):
+        self.waiting_on = None
+        self.running = True
+        prom_metrics.tron_api_queue_depth_gauge.labels(self.pool.name).dec()
+        prom_metrics.tron_api_wait_seconds_histogram.labels(self.pool.name).observe(time.time() - self.queued_at)
+        try:
+            d = threads.deferToThreadPool(reactor, self.pool.get_thread_pool(), self.fn, *self.args)
+        except Exception:
+            d = defer.fail()
+        d.addBoth(self._done)
+
+    def _done(self, result):
+        if self.locked:
+            AsyncResource.lock.release_read()
+        self.pool.semaphore.release()
+        if self.cancelled:
+            return
+        if isinstance(result, failure.Failure):
+            self.result.errback(result)
+        else:
+            self.result.callback(result)
+
+    def _cancel(self, _):
+        self.cancelled = True
+        if self.running:
+            # Can't interrupt the thread, its result is dropped
+            return
+        prom_metrics.tron_api_queue_depth_gauge.labels(self.pool.name).dec()
+        if self.waiting_on is not None:
+            self.waiting_on.cancel()
+        if self.has_slot:
+            self.pool.semaphore.release()
+
+
 class AsyncResource:
-    capacity = 10
-    semaphore = threading.Semaphore(value=capacity)
-    lock = threading.Lock()
+    pools = {
+        LISTING_POOL: ApiPool(LISTING_POOL, 10),
+        LOGS_POOL: ApiPool(LOGS_POOL, 4),
+    }
+    lock = ReadWriteLock()
+
+    @staticmethod
+    def get_pool(resource):
+        return AsyncResource.pools[getattr(resource, "api_pool", LISTING_POOL)]
 
     @staticmethod
-    def finish(result, request, resource):
-        result, duration_ms = result
-        request.write(result)
-        request.finish()
-        report_resource_request(resource, request, duration_ms)
+    def read(pool, fn, *args, locked=True):
+        """Return a Deferred of fn(*args), run in a thread from `pool`
+        while holding the read lock, unless not `locked`.
+        """
+        return ReadCall(pool, fn, args, locked=locked).start()
 
     @staticmethod
-    def process(fn, resource, request):
-        start = time.time()
-        with AsyncResource.semaphore:
-            result = fn(resource, request)
-        duration_ms = 1000 * (time.time() - start)
-        return result, duration_ms
+    def write(fn, *args):
+        """Return a Deferred of fn(*args), run on the reactor thread while
+        holding the write lock.
+        """
+        queued_at = time.time()
+        prom_metrics.tron_api_queue_depth_gauge.labels(COMMANDS_POOL).inc()
+
+        def run(_):
+            prom_metrics.tron_api_queue_depth_gauge.labels(COMMANDS_POOL).dec()
+            prom_metrics.tron_api_wait_seconds_histogram.labels(COMMANDS_POOL).observe(time.time() - queued_at)
+            try:
+                return fn(*args)
+            finally:
+                AsyncResource.lock.release_write()
+
+        def cancelled(f):
+            f.trap(defer.CancelledError)
+            prom_metrics.tron_api_queue_depth_gauge.labels(COMMANDS_POOL).dec()
+            return f
+
+        d = AsyncResource.lock.acquire_write()
+        d.addCallbacks(run, cancelled)
+        return d
+
+    @staticmethod
+    def finish(result, request, resource, start, locked=True):
+        if isinstance(result, StreamingResponse):
+            run_in_thread = functools.partial(AsyncResource.read, AsyncResource.get_pool(resource), locked=locked)
+            result.start(request, run_in_thread=run_in_thread)
+        else:
+            request.write(result)
+            request.finish()
+        report_resource_request(resource, request, 1000 * (time.time() - start))
+
+    @staticmethod
+    def respond(d, request, resource, start, locked=True):
+        """Finish the request with the result of d, and cancel d if the
+        client disconnects first.
+        """
+        request.notifyFinish().addErrback(lambda _: d.cancel())
+        d.addCallback(AsyncResource.finish, request, resource, start, locked=locked)
+
+        def handle_error(f):
+            if not f.check(defer.CancelledError):
+                request.processingFailed(f)
+
+        d.addErrback(handle_error)
+        return server.NOT_DONE_YET
 
     @staticmethod
     def bounded(fn):
         def wrapper(resource, request):
-            d = threads.deferToThread(
-                AsyncResource.process,
-                fn,
-                resource,
-                request,
-            )
-            d.addCallback(AsyncResource.finish, request, resource)
-            d.addErrback(request.processingFailed)
-            return server.NOT_DONE_YET
+            start = time.time()
+            d = AsyncResource.read(AsyncResource.get_pool(resource), fn, resource, request)
+            return AsyncResource.respond(d, request, resource, start)
+
+        return wrapper
+
+    @staticmethod
+    def snapshot(fn):
+        """Like bounded, for requests which only read snapshots and so don't
+        need the read lock.
+        """
+
+        def wrapper(resource, request):
+            start = time.time()
+            d = AsyncResource.read(AsyncResource.get_pool(resource), fn, resource, request, locked=False)
+            return AsyncResource.respond(d, request, resource, start, locked=False)
 
         return wrapper
 
     @staticmethod
     def exclusive(fn):
         def wrapper(resource, request):
-            # ensures only one exclusive request starts consuming the semaphore
             start = time.time()
-            with AsyncResource.lock:
-                # this will wait until all bounded requests finished processing
-                for _ in range(AsyncResource.capacity):
-                    AsyncResource.semaphore.acquire()
-                try:
-                    return fn(resource, request)
-                finally:
-                    for _ in range(AsyncResource.capacity):
-                        AsyncResource.semaphore.release()
-                    duration_ms = 1000 * (time.time() - start)
-                    report_resource_request(resource, request, duration_ms)
+            d = AsyncResource.write(fn, resource, request)
+            return AsyncResource.respond(d, request, resource, start)
 
         return wrapper
@@ -0,0 +1,172 @@
+"""
+Read the output of an action run incrementally.
+
+Each read returns the lines written since the previous one and a resume token
+(`offset`) for the next. Tokens of output files hold the byte offset read up
+to, so a read only costs the bytes written since. Kubernetes action runs log
+to a PaaSTA log stream, which can only be read from its start, so their tokens
+hold the number of lines already returned, and reads are limited to the
+logging.max_lines_to_display lines of the stream like other reads of it.
+
+An OutputFollower keeps reading as the action runs and streams what it finds
+to the client, as server-sent events (the token is each event's id, so
+browsers resume from it when they reconnect) or as JSON lines.
+"""
+import json
+import os
+import time
+
+from tron import actioncommand
+from tron.api import adapter
+from tron.api.streaming import StreamingResponse
+from tron.core.actionrun import KubernetesActionRun
+from tron.utils import filetail
+from tron.utils.timerqueue import timer_queue
+
+STREAMS = {
+    "stdout": actioncommand.ActionCommand.STDOUT,
+    "stderr": actioncommand.ActionCommand.STDERR,
+}
+# Most bytes of a file to read at once when following it
+FOLLOW_MAX_BYTES = 1024 * 1024
+FOLLOW_INTERVAL_SECONDS = 1
+# Reading a PaaSTA log stream reads all of it, so it's read less often
+PAASTA_FOLLOW_INTERVAL_SECONDS = 30
+# Followers end after this long, and clients resume from the last token
+MAX_FOLLOW_SECONDS = 10 * 60
+# Idle server-sent event streams get a comment this often, so proxies don't
+# close them
+KEEPALIVE_SECONDS = 15
+
+
+class ActionRunOutput:
+    def __init__(self, action_run, job_run, stream, num_lines):
+        self.action_run = action_run
+        self.job_run = job_run
+        self.stream = stream
+        self.num_lines = num_lines
+
+    @property
+    def follow_interval(self):
+        if isinstance(self.action_run, KubernetesActionRun):
+            return PAASTA_FOLLOW_INTERVAL_SECONDS
+        return FOLLOW_INTERVAL_SECONDS
+
+    def read(self, token=None, max_bytes=filetail.MAX_TAIL_BYTES):
+        """Return the lines written after a token, the token to read from
+        next, and whether the action run is done (so it won't write more).
+        Without a token, the last num_lines lines are returned.
+        """
+        done = self.action_run.is_done
+        run_adapter = adapter.ActionRunAdapter(self.action_run, self.job_run)
+        if isinstance(self.action_run, KubernetesActionRun):
+            lines, token = self._read_log_stream(run_adapter, token)
+            at_end = True
+        else:
+            lines, token, at_end = self._read_file(run_adapter, token, max_bytes, done)
+        return {"lines": lines, "offset": token, "complete": done and at_end}
+
+    def _read_file(self, run_adapter, token, max_bytes, done):
+        path = run_adapter.get_output_path(STREAMS[self.stream])
+        if path is None:
+            return [], token, True
+
+        file_id, offset = None, None
+        try:
+            dev, ino, offset = (int(part) for part in token.split("-"))
+            file_id = (dev, ino)
+        except (AttributeError, ValueError):
+            # No token, or not one of a file
+            pass
+        lines, file_id, offset = filetail.read_lines(
+            path,
+            file_id=file_id,
+            offset=offset,
+            num_lines=self.num_lines,
+            max_bytes=max_bytes,
+            final=done,
+        )
+        # Reads are limited to max_bytes, so there may be more to read
+        at_end = offset >= os.path.getsize(path)
+        return lines, f"{file_id[0]}-{file_id[1]}-{offset}", at_end
+
+    def _read_log_stream(self, run_adapter, token):
+        # Every line is needed to know which ones are new. No more of the
+        # stream is read than logging.max_lines_to_display, so once a run's
+        # output is truncated there are no new lines.
+        lines, notices = run_adapter.read_log_stream_parts(self.stream)
+        if token is not None and token.isdigit() and int(token) <= len(lines):
+            new_lines = lines[int(token) :]
+        else:
+            # No token, or the output is shorter than when the token was
+            # given (e.g., the limit was lowered), so start again
+            new_lines = lines[-self.num_lines :] if self.num_lines else lines
+            token = None
+        # Notices (e.g., that the output is truncated) aren't output lines,
+        # so they aren't counted in tokens. They're sent with new lines, so
+        # followers with nothing new stay idle.
+        if new_lines or token is None:
+            new_lines = new_lines + notices
+        return new_lines, str(len(lines))
+
+
+class OutputFollower(StreamingResponse):
+    """Streams the output of an action run as it's written, until the run is
+    done or MAX_FOLLOW_SECONDS pass. Reads happen in worker threads, every
+    `interval` seconds while there's nothing new.
+    """
+
+    def __init__(self, output, token=None, sse=False):
+        super().__init__(())
+        self.output = output
+        self.token = token
+        self.sse = sse
+        self.interval = output.follow_interval
+        self.started_at = time.time()
+        self.last_write = None
+        self.idle = False
+        self.delayed_call = None
+
+    def read(self):
+        if self.stopped:
+            return None
+
+        now = time.time()
+        result = self.output.read(self.token, max_bytes=FOLLOW_MAX_BYTES)
+        self.token = result["offset"]
+        done = result["complete"] or now - self.started_at >= MAX_FOLLOW_SECONDS
+        # The first read is always sent, so the client gets a token
+        self.idle = not result["lines"] and self.last_write is not None
+        if self.idle and not done:
+            if self.sse and now - self.last_write >= KEEPALIVE_SECONDS:
+                self.last_write = now
+                return b": keepalive\n\n", False
+            return b"", False
+
+        self.last_write = now
+        return self.encode_event(result), done
+
+    def encode_event(self, result):
+        data = json.dumps(result).encode("utf8")
+        if self.sse:
+            event_id = b"id: " + self.token.encode() + b"\n" if self.token is not None else b""
+            return event_id + b"data: " + data + b"\n\n"
+        return data + b"\n"
+
+    def _produce(self):
+        if self.delayed_call is not None:
+            self.delayed_call.cancel()
+            self.delayed_call = None
+        super()._produce()
+
+    def _next(self):
+        if self.idle:
+            self.delayed_call = timer_queue.call_later(self.interval, self._produce)
+        else:
+            self._produce()
+
+    def stopProducing(self):
+        super().stopProducing()
+        if self.delayed_call is not None:
+            self.delayed_call.cancel()
+            self.delayed_call = None
@@ -34,6 +34,17 @@ def get_string(request, key):
     return val
 
 
+def get_list(request, key):
+    """Returns the comma separated values of the first value in the request
+    args for a given key, or None if the key isn't given.
+    """
+    val = get_string(request, key)
+    if val is None:
+        return None
+
+    return [item.strip() for item in val.split(",") if item.strip()]
+
+
 def get_bool(request, key, default=None):
     """Returns True if the key exists and is truthy in the request args."""
     int_value = get_integer(request, key)
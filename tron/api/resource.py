@@ -10,6 +10,8 @@ import traceback
 
 import staticconf
 from prometheus_client.twisted import MetricsResource as MetricsResourceProm
+from twisted.internet import defer
+from twisted.internet import reactor
 from twisted.web import http
 from twisted.web import resource
 from twisted.web import server
@@ -18,17 +20,32 @@ from twisted.web import static
 from tron import __version__
 from tron.api import adapter
 from tron.api import controller
+from tron.api import output
 from tron.api import requestargs
 from tron.api.async_resource import AsyncResource
+from tron.api.async_resource import LOGS_POOL
 from tron.api.auth import AuthorizationFilter
+from tron.api.snapshot import build_etag
+from tron.api.snapshot import JobView
+from tron.api.snapshot import NUM_RUNS
+from tron.api.snapshot import SnapshotPublisher
+from tron.api.streaming import accepts_gzip
+from tron.api.streaming import iter_json_array
+from tron.api.streaming import StreamingResponse
 from tron.config.static_config import get_config_watcher
 from tron.config.static_config import NAMESPACE
+from tron.core import schedule_horizon
+from tron.core.change_log import change_log
 from tron.metrics import meter
 from tron.metrics import view_all_metrics
 from tron.utils import maybe_decode
+from tron.utils import timeutils
 
 log = logging.getLogger(__name__)
 
+# Longest a request for changes may wait for something to change
+MAX_CHANGES_WAIT_SECONDS = 60
+
 
 class JSONEncoder(json.JSONEncoder):
     """Custom JSON for certain objects"""
@@ -59,19 +76,19 @@ def respond(request, response, code=None, headers=None):
     for key, val in (headers or {}).items():
         request.setHeader(str(key), str(val))
 
-    result = (
-        json.dumps(
-            response,
-            cls=JSONEncoder,
-        )
-        if response
-        else ""
-    )
+    return encode_json(response) if response else b""
+
 
-    if type(result) is not bytes:
-        result = result.encode("utf8")
+def encode_json(response):
+    return json.dumps(response, cls=JSONEncoder).encode("utf8")
 
-    return result
+
+def respond_stream(request, chunks):
+    """Helper to generate a streamed json response from encoded chunks"""
+    request.setResponseCode(http.OK)
+    request.setHeader(b"content-type", b"application/json; charset=utf-8")
+    request.setHeader(b"Access-Control-Allow-Origin", b"*")
+    return StreamingResponse(chunks, compress=accepts_gzip(request))
 
 
 def handle_command(request, api_controller, obj, **kwargs):
@@ -151,6 +168,8 @@ def resource_from_collection(collection, name, child_resource):
 class ActionRunResource(AuthenticatedResource):
 
     isLeaf = True
+    # Reading stdout/stderr can be slow
+    api_pool = LOGS_POOL
 
     def __init__(self, action_run, job_run):
         resource.Resource.__init__(self)
@@ -161,17 +180,48 @@ class ActionRunResource(AuthenticatedResource):
 
     @AsyncResource.bounded
     def render_GET(self, request):
+        num_lines = requestargs.get_integer(request, "num_lines") or staticconf.read(
+            "logging.max_lines_to_display", namespace=NAMESPACE
+        )
+        stream = requestargs.get_string(request, "output")
+        if stream is not None:
+            return self.render_output(request, stream, num_lines)
+
         run_adapter = adapter.ActionRunAdapter(
             self.action_run,
             self.job_run,
-            requestargs.get_integer(request, "num_lines")
-            or staticconf.read("logging.max_lines_to_display", namespace=NAMESPACE),
+            num_lines,
             include_stdout=requestargs.get_bool(request, "include_stdout"),
             include_stderr=requestargs.get_bool(request, "include_stderr"),
             include_meta=requestargs.get_bool(request, "include_meta"),
         )
         return respond(request=request, response=run_adapter.get_repr())
 
+    def render_output(self, request, stream, num_lines):
+        """Respond with the output written after the `offset` token, or with
+        `follow`, stream it as it's written.
+        """
+        if stream not in output.STREAMS:
+            return respond(
+                request=request,
+                response={"error": f"Unknown output {stream}, expected one of {sorted(output.STREAMS)}"},
+                code=http.BAD_REQUEST,
+            )
+
+        run_output = output.ActionRunOutput(self.action_run, self.job_run, stream, num_lines)
+        # Browsers resuming a stream of server-sent events send the last id
+        last_event_id = request.getHeader(b"last-event-id")
+        token = requestargs.get_string(request, "offset") or (last_event_id.decode() if last_event_id else None)
+        if not requestargs.get_bool(request, "follow"):
+            return respond(request=request, response=run_output.read(token))
+
+        sse = b"text/event-stream" in (request.getHeader(b"accept") or b"")
+        request.setResponseCode(http.OK)
+        request.setHeader(b"content-type", b"text/event-stream" if sse else b"application/x-ndjson")
+        request.setHeader(b"cache-control", b"no-cache")
+        request.setHeader(b"Access-Control-Allow-Origin", b"*")
+        return output.OutputFollower(run_output, token, sse=sse)
+
     @AsyncResource.exclusive
     def render_POST(self, request):
         use_latest_command = requestargs.get_bool(request, "use_latest_command", False)
@@ -266,13 +316,17 @@ class JobResource(AuthenticatedResource):
         )
         include_graph = requestargs.get_bool(request, "include_action_graph")
         num_runs = requestargs.get_integer(request, "num_runs")
+        run_states = requestargs.get_list(request, "run_state")
         job_adapter = adapter.JobAdapter(
             self.job_scheduler.get_job(),
             include_job_runs=True,
             include_action_runs=include_action_runs,
             include_action_graph=include_graph,
             num_runs=num_runs,
+            runs_before=requestargs.get_integer(request, "before"),
+            run_states=set(run_states) if run_states is not None else None,
         )
+        job_adapter.select(requestargs.get_list(request, "fields"))
         return respond(request=request, response=job_adapter.get_repr())
 
     @AsyncResource.exclusive
@@ -296,16 +350,16 @@ class ActionRunHistoryResource(AuthenticatedResource):
 
     @AsyncResource.bounded
     def render_GET(self, request):
-        return respond(
-            request=request,
-            response=adapter.adapt_many(adapter.ActionRunAdapter, self.action_runs),
-        )
+        fragments = (encode_json(adapter.ActionRunAdapter(action_run).get_repr()) for action_run in self.action_runs)
+        return respond_stream(request, iter_json_array(fragments))
 
 
 class JobCollectionResource(AuthenticatedResource):
     def __init__(self, job_collection):
         self.job_collection = job_collection
         self.controller = controller.JobCollectionController(job_collection)
+        self.snapshots = SnapshotPublisher(job_collection)
+        reactor.callWhenRunning(self.snapshots.start)
         resource.Resource.__init__(self)
 
     def getChild(self, name, request):
@@ -315,23 +369,6 @@ class JobCollectionResource(AuthenticatedResource):
         name = maybe_decode(name)  # TODO: TRON-2293 maybe_decode is a relic of Python2->Python3 migration. Remove it.
         return resource_from_collection(self.job_collection, name, JobResource)
 
-    def get_data(
-        self,
-        include_job_run=False,
-        include_action_runs=False,
-        include_action_graph=True,
-        include_node_pool=True,
-    ):
-        return adapter.adapt_many(
-            adapter.JobAdapter,
-            self.job_collection.get_jobs(),
-            include_job_run,
-            include_action_runs,
-            include_action_graph,
-            include_node_pool,
-            num_runs=5,
-        )
-
     def get_job_index(self):
         jobs = adapter.adapt_many(
             adapter.JobIndexAdapter,
@@ -339,7 +376,7 @@ class JobCollectionResource(AuthenticatedResource):
         )
         return {job["name"]: job["actions"] for job in jobs}
 
-    @AsyncResource.bounded
+    @AsyncResource.snapshot
     def render_GET(self, request):
         include_job_runs = requestargs.get_bool(
             request,
@@ -361,15 +398,58 @@ class JobCollectionResource(AuthenticatedResource):
             "include_node_pool",
             default=True,
         )
-        response = dict(
-            jobs=self.get_data(
-                include_job_runs,
-                include_action_runs,
-                include_action_graph,
-                include_node_pool,
-            ),
+        num_runs = requestargs.get_integer(request, "num_runs")
+        fields = requestargs.get_list(request, "fields")
+        view = JobView(
+            include_job_runs,
+            include_action_runs,
+            include_action_graph,
+            include_node_pool,
+            num_runs=min(num_runs, NUM_RUNS) if num_runs is not None else NUM_RUNS,
+            fields=tuple(fields) if fields is not None else None,
         )
-        return respond(request=request, response=response)
+
+        limit = requestargs.get_integer(request, "limit")
+        states = requestargs.get_list(request, "state")
+        entries, next_cursor = self.snapshots.snapshot.select(
+            namespace=requestargs.get_string(request, "namespace"),
+            name_prefix=requestargs.get_string(request, "name_prefix"),
+            states=set(states) if states is not None else None,
+            names=self.get_updated_since(requestargs.get_integer(request, "updated_since")),
+            cursor=requestargs.get_string(request, "cursor"),
+            limit=limit or None,
+        )
+        page = {"next_cursor": next_cursor} if limit else None
+
+        if include_job_runs:
+            # Too large to build up front, and rarely unchanged between
+            # requests, so jobs are encoded one at a time as they are sent
+            fragments = (entry.get_fragment(view, encode_json) for entry in entries)
+            return respond_stream(request, self._iter_response(fragments, page))
+
+        fragments = [entry.get_fragment(view, encode_json) for entry in entries]
+        versions = [entry.version for entry in entries]
+        if request.setETag(build_etag((view, page), versions).encode()) == http.CACHED:
+            return b""
+        return respond_stream(request, self._iter_response(fragments, page))
+
+    @staticmethod
+    def get_updated_since(since):
+        """Return the names of jobs changed since a version of the change log,
+        or None for all jobs if the changes since it aren't known.
+        """
+        if since is None or not change_log.is_valid(since):
+            return None
+        _, changes = change_log.get_changes(since)
+        return {key[1] for key, _ in changes}
+
+    @staticmethod
+    def _iter_response(fragments, page=None):
+        yield b'{"jobs": '
+        yield from iter_json_array(fragments)
+        if page:
+            yield b", " + encode_json(page)[1:-1]
+        yield b"}"
 
     @AsyncResource.exclusive
     def render_POST(self, request):
@@ -384,6 +464,154 @@ class JobCollectionResource(AuthenticatedResource):
         )
 
 
+class ScheduleHorizonResource(AuthenticatedResource):
+    """Resource for the scheduled starts of all jobs over the next hours."""
+
+    isLeaf = True
+
+    def __init__(self, job_collection):
+        self.job_collection = job_collection
+        resource.Resource.__init__(self)
+
+    @AsyncResource.bounded
+    def render_GET(self, request):
+        hours = requestargs.get_integer(request, "hours")
+        if hours is None:
+            hours = 24
+        if not 0 < hours <= schedule_horizon.MAX_HORIZON_HOURS:
+            return respond(
+                request=request,
+                response={"error": f"'hours' must be between 1 and {schedule_horizon.MAX_HORIZON_HOURS}"},
+                code=http.BAD_REQUEST,
+            )
+
+        response = schedule_horizon.build_schedule_horizon(
+            self.job_collection.get_jobs(),
+            timeutils.current_time(),
+            hours,
+        )
+        return respond(request=request, response=response)
+
+
+class TriggersResource(AuthenticatedResource):
+    """Resource for the trigger edges around an action (the triggers it waits
+    on upstream, and the actions waiting on it downstream), or for the
+    actions waiting on an event.
+    """
+
+    isLeaf = True
+
+    def __init__(self, master_control):
+        self.master_control = master_control
+        resource.Resource.__init__(self)
+
+    @AsyncResource.bounded
+    def render_GET(self, request):
+        action_name = requestargs.get_string(request, "action")
+        event = requestargs.get_string(request, "event")
+        job_graph = self.master_control.job_graph
+        if not action_name and not event:
+            return respond(
+                request=request,
+                response={"error": "'action' or 'event' is required."},
+                code=http.BAD_REQUEST,
+            )
+        if job_graph is None:
+            return respond(
+                request=request,
+                response={"error": "Configuration is not loaded yet."},
+                code=http.SERVICE_UNAVAILABLE,
+            )
+
+        if event:
+            response = {
+                "event": event,
+                "waiting": [edge._asdict() for edge in job_graph.get_event_waiters(event)],
+            }
+        else:
+            response = {
+                "action": action_name,
+                "publishes": job_graph.get_published_triggers(action_name),
+                "upstream": [edge._asdict() for edge in job_graph.get_trigger_edges(action_name)],
+                "downstream": [edge._asdict() for edge in job_graph.get_trigger_edges(action_name, downstream=True)],
+            }
+        return respond(request=request, response=response)
+
+
+class ChangesResource(AuthenticatedResource):
+    """Resource for the jobs, job runs and action runs which changed since a
+    version of tron's state, so polling clients don't need to fetch all of it.
+    With `wait`, the request is held until something changes or that many
+    seconds pass.
+    """
+
+    isLeaf = True
+
+    def __init__(self, job_collection):
+        self.job_collection = job_collection
+        resource.Resource.__init__(self)
+
+    def render_GET(self, request):
+        since = requestargs.get_integer(request, "since")
+        wait = requestargs.get_integer(request, "wait") or 0
+        if since is None or wait <= 0 or not change_log.is_valid(since) or change_log.has_changes(since):
+            return self.render_changes(request)
+
+        d = change_log.wait(min(wait, MAX_CHANGES_WAIT_SECONDS))
+        request.notifyFinish().addErrback(lambda _: d.cancel())
+        d.addCallback(lambda _: self.render_changes(request))
+
+        def handle_error(failure):
+            if not failure.check(defer.CancelledError):
+                request.processingFailed(failure)
+
+        d.addErrback(handle_error)
+        return server.NOT_DONE_YET
+
+    @AsyncResource.bounded
+    def render_changes(self, request):
+        since = requestargs.get_integer(request, "since")
+        if since is None or not change_log.is_valid(since):
+            # The client has to fetch the full state, then ask for changes
+            # since this version
+            return respond(request=request, response={"version": change_log.version, "reset": True})
+
+        version, changes = change_log.get_changes(since)
+        response = {"version": version, "reset": False}
+        response.update(self.adapt_changes(changes))
+        return respond(request=request, response=response)
+
+    def adapt_changes(self, changes):
+        response = {
+            "jobs": [],
+            "job_runs": [],
+            "action_runs": [],
+            "removed_jobs": [],
+            "removed_job_runs": [],
+        }
+        for key, removed in changes:
+            kind, job_name = key[0], key[1]
+            job_scheduler = self.job_collection.get_by_name(job_name)
+            job = job_scheduler.get_job() if job_scheduler else None
+            if kind == change_log.JOB:
+                if removed or job is None:
+                    response["removed_jobs"].append(job_name)
+                else:
+                    response["jobs"].append(adapter.JobAdapter(job).get_repr())
+                continue
+
+            job_run = job.runs.get_run_by_num(key[2]) if job else None
+            if kind == change_log.JOB_RUN:
+                if removed or job_run is None:
+                    response["removed_job_runs"].append(f"{job_name}.{key[2]}")
+                else:
+                    response["job_runs"].append(adapter.JobRunAdapter(job_run).get_repr())
+            elif job_run is not None and key[3] in job_run.action_runs:
+                action_run = job_run.action_runs[key[3]]
+                response["action_runs"].append(adapter.ActionRunAdapter(action_run, job_run).get_repr())
+        return response
+
+
 class ConfigResource(AuthenticatedResource):
     """Resource for configuration changes"""
 
@@ -509,6 +737,12 @@ class ApiRootResource(AuthenticatedResource):
             JobCollectionResource(mcp.get_job_collection()),
         )
 
+        self.putChild(
+            b"schedule_horizon",
+            ScheduleHorizonResource(mcp.get_job_collection()),
+        )
+        self.putChild(b"changes", ChangesResource(mcp.get_job_collection()))
+        self.putChild(b"triggers", TriggersResource(mcp))
         self.putChild(b"config", ConfigResource(mcp))
         self.putChild(b"status", StatusResource(mcp))
         self.putChild(b"events", EventsResource())
@@ -0,0 +1,290 @@
+"""
+Immutable snapshots of every job, for API requests to read without locks.
+
+The adapters read live jobs and runs, which the reactor changes, so requests
+which use them run under the read lock of AsyncResource and wait for every
+command. Listing all jobs is the most common request, so it reads a snapshot
+instead. After each batch of changes the reactor rebuilds the representation
+of the jobs which changed (with their runs and action runs) and publishes a
+new JobSnapshot by replacing a single reference. A request takes that
+reference once, so it never sees part of a change.
+
+Snapshots index their entries by name and namespace, so a page of the jobs
+which match a request's filters is found without looking at the others.
+Entries never change, so each caches its encoded JSON for the views (request
+options) most recently asked for. The durations of runs which are still going
+and the delays of retries change with time rather than with state, so they
+are brought up to date as entries are read.
+"""
+import bisect
+import collections
+import copy
+import hashlib
+import itertools
+import logging
+import time
+
+from twisted.internet import defer
+
+from tron.api import adapter
+from tron.core.change_log import change_log
+from tron.utils import timeutils
+from tron.utils.timerqueue import timer_queue
+
+log = logging.getLogger(__name__)
+
+# Runs of each job to include, as for requests to list jobs
+NUM_RUNS = 5
+# Longest time to spend building entries in one reactor tick. Jobs left over
+# are built in the next one, and keep their previous entry until then.
+PUBLISH_BUDGET_SECONDS = 0.05
+# Publish at least this often, to catch changes which aren't in the change log
+REFRESH_SECONDS = 60
+# Jobs whose entry failed to build are retried after this long, or with the
+# next change, whichever is first
+RETRY_SECONDS = 5
+# Encoded views to cache for each job
+MAX_CACHED_VIEWS = 16
+
+JobView = collections.namedtuple(
+    "JobView",
+    [
+        "include_job_runs",
+        "include_action_runs",
+        "include_action_graph",
+        "include_node_pool",
+        "num_runs",
+        "fields",
+    ],
+    defaults=[NUM_RUNS, None],
+)
+
+
+def build_etag(options, versions):
+    digest = hashlib.sha1(repr((options, versions)).encode("utf8")).hexdigest()
+    return f'"{digest}"'
+
+
+def _is_running(run):
+    return run["start_time"] is not None and run["end_time"] is None
+
+
+def _has_timers(job):
+    for run in job["runs"] or []:
+        if _is_running(run):
+            return True
+        for action_run in run["runs"] or []:
+            if _is_running(action_run) or action_run["in_delay"] is not None:
+                return True
+    return False
+
+
+def _refresh_run(run, elapsed):
+    if _is_running(run):
+        run["duration"] = str(timeutils.duration(run["start_time"]) or "")
+    if run.get("in_delay") is not None:
+        run["in_delay"] = run["in_delay"] - elapsed
+    return run
+
+
+class JobSnapshotEntry:
+    """The representation of one job, as of when it was built."""
+
+    def __init__(self, name, version, job_repr, published_at):
+        self.name = name
+        # The namespace of a job is the part of its name before the first "."
+        self.namespace = name.split(".")[0]
+        self.status = job_repr.get("status")
+        self.version = version
+        self.job_repr = job_repr
+        self.published_at = published_at
+        self.has_timers = _has_timers(job_repr)
+        # JobView -> encoded fragment
+        self.fragments = {}
+
+    def is_cacheable(self, view):
+        return not (view.include_job_runs and self.has_timers)
+
+    def render(self, view, now=None):
+        """Return the representation for a JobView, as the JobAdapter would
+        with the same options.
+        """
+        job_repr = self._render(view, now)
+        if view.fields is None:
+            return job_repr
+        return {field: job_repr[field] for field in view.fields if field in job_repr}
+
+    def _render(self, view, now):
+        job_repr = dict(self.job_repr)
+        if not view.include_action_graph:
+            job_repr["action_graph"] = None
+        if not view.include_node_pool:
+            job_repr["node_pool"] = None
+        if not view.include_job_runs or (view.fields is not None and "runs" not in view.fields):
+            job_repr["runs"] = None
+            return job_repr
+
+        runs = copy.deepcopy(job_repr["runs"][: view.num_runs])
+        if self.has_timers:
+            now = time.time() if now is None else now
+            elapsed = now - self.published_at
+            for run in runs:
+                _refresh_run(run, elapsed)
+                for action_run in run["runs"] or []:
+                    _refresh_run(action_run, elapsed)
+        if not view.include_action_runs:
+            for run in runs:
+                run["runs"] = None
+        job_repr["runs"] = runs
+        return job_repr
+
+    def get_fragment(self, view, encode):
+        """Return the encoded representation for a JobView."""
+        if not self.is_cacheable(view):
+            return encode(self.render(view))
+        fragment = self.fragments.get(view)
+        if fragment is None:
+            fragment = encode(self.render(view))
+            # Requests in other threads may encode the same fragment, which
+            # is harmless
+            if len(self.fragments) >= MAX_CACHED_VIEWS:
+                self.fragments.clear()
+            self.fragments[view] = fragment
+        return fragment
+
+
+class JobSnapshot:
+    """Entries of every job, sorted and indexed by name and namespace."""
+
+    def __init__(self, entries=()):
+        self.entries = tuple(sorted(entries, key=lambda entry: entry.name))
+        self.names = [entry.name for entry in self.entries]
+        # namespace -> (entries, names)
+        self.namespaces = {}
+        for entry in self.entries:
+            namespace_entries, names = self.namespaces.setdefault(entry.namespace, ([], []))
+            namespace_entries.append(entry)
+            names.append(entry.name)
+
+    def select(self, namespace=None, name_prefix=None, states=None, names=None, cursor=None, limit=None):
+        """Return (entries, next_cursor) for a page of up to `limit` entries,
+        in name order, which match every filter given. Pages start after the
+        name `cursor`. next_cursor is None for the last page.
+        """
+        if namespace is None:
+            entries, entry_names = self.entries, self.names
+        else:
+            entries, entry_names = self.namespaces.get(namespace, ((), []))
+
+        start = 0
+        if name_prefix:
+            start = bisect.bisect_left(entry_names, name_prefix)
+        if cursor is not None:
+            start = max(start, bisect.bisect_right(entry_names, cursor))
+
+        selected = []
+        for entry in itertools.islice(entries, start, None):
+            if name_prefix and not entry.name.startswith(name_prefix):
+                break
+            if states is not None and entry.status not in states:
+                continue
+            if names is not None and entry.name not in names:
+                continue
+            if limit is not None and len(selected) == limit:
+                return selected, selected[-1].name
+            selected.append(entry)
+        return selected, None
+
+
+class SnapshotPublisher:
+    """Builds JobSnapshots on the reactor thread, from the jobs of a
+    JobCollection, whenever the change log records a change to them.
+    """
+
+    def __init__(self, job_collection):
+        self.job_collection = job_collection
+        self.snapshot = JobSnapshot()
+        # job name -> (validation key, entry)
+        self.built = {}
+        # names of jobs with changes not yet in an entry
+        self.dirty = set()
+        self.change_version = None
+        self.rebuild_all = False
+        # Versions start from the time in microseconds, as those of the change
+        # log do, so that ETags from before a restart don't match
+        self._versions = itertools.count(int(time.time() * 1_000_000))
+        self._waiting = None
+
+    def start(self):
+        self.publish()
+
+    @staticmethod
+    def _validation_key(job):
+        # Enabling and reconfiguring a job aren't always recorded as changes,
+        # but they replace these attributes
+        return (id(job), job.enabled, id(job.scheduler), id(job.action_graph), id(job.node_pool))
+
+    def _collect_changes(self):
+        if self.change_version is None or not change_log.is_valid(self.change_version):
+            # Changes since the last publish can't be listed, so rebuild all
+            self.change_version = change_log.version
+            self.rebuild_all = True
+            return
+        self.change_version, changes = change_log.get_changes(self.change_version)
+        self.dirty.update(key[1] for key, _ in changes)
+
+    def _build_entry(self, job):
+        job_adapter = adapter.JobAdapter(
+            job,
+            include_job_runs=True,
+            include_action_runs=True,
+            include_action_graph=True,
+            include_node_pool=True,
+            num_runs=NUM_RUNS,
+        )
+        return JobSnapshotEntry(job.get_name(), next(self._versions), job_adapter.get_repr(), time.time())
+
+    def publish(self):
+        """Rebuild the entries of changed jobs, for up to
+        PUBLISH_BUDGET_SECONDS, and publish a new snapshot.
+        """
+        self._waiting = None
+        self._collect_changes()
+        deadline = time.time() + PUBLISH_BUDGET_SECONDS
+        built, entries, dirty, failed = {}, [], set(), set()
+        # At least one job is built each time, so publishing always progresses
+        first = True
+        for job in self.job_collection.get_jobs():
+            name = job.get_name()
+            validation_key = self._validation_key(job)
+            previous = self.built.get(name)
+            stale = self.rebuild_all or name in self.dirty
+            if previous is None or previous[0] != validation_key or stale:
+                if first or time.time() < deadline:
+                    first = False
+                    try:
+                        previous = (validation_key, self._build_entry(job))
+                    except Exception:
+                        log.exception(f"Failed to build a snapshot of {name}")
+                        failed.add(name)
+                else:
+                    dirty.add(name)
+            if previous is not None:
+                built[name] = previous
+                entries.append(previous[1])
+
+        self.built = built
+        # Failed jobs keep their previous entry (if any) until they're rebuilt
+        self.dirty = dirty | failed
+        self.rebuild_all = False
+        self.snapshot = JobSnapshot(entries)
+        if dirty:
+            timer_queue.call_later(0, self.publish)
+        else:
+            self._waiting = change_log.wait(RETRY_SECONDS if failed else REFRESH_SECONDS)
+            self._waiting.addCallbacks(lambda _: self.publish(), lambda f: f.trap(defer.CancelledError))
+
+    def stop(self):
+        if self._waiting is not None:
+            self._waiting.cancel()
+            self._waiting = None
@@ -0,0 +1,147 @@
+"""
+Incrementally encoded JSON responses.
+
+Large collections (e.g. every job with its runs) are not encoded into one
+string. A resource returns a StreamingResponse of encoded chunks instead, and
+it is written to the client with Twisted's producer/consumer interface: chunks
+are encoded (and gzipped, if the client accepts it) in a worker thread while
+the reactor writes the previous ones, and encoding pauses whenever the client
+is slower than the server. Peak memory is bounded by CHUNK_SIZE rather than by
+the size of the response.
+"""
+import logging
+import zlib
+
+from twisted.internet import threads
+
+log = logging.getLogger(__name__)
+
+# Bytes of encoded JSON to gather in a worker thread before writing them
+CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+
+
+def accepts_gzip(request):
+    accept_encoding = request.getHeader(b"accept-encoding") or b""
+    return any(encoding.split(b";")[0].strip() == b"gzip" for encoding in accept_encoding.lower().split(b","))
+
+
+def iter_json_array(fragments):
+    """Yield the encoded JSON array of already encoded fragments."""
+    yield b"["
+    for i, fragment in enumerate(fragments):
+        if i:
+            yield b", "
+        yield fragment
+    yield b"]"
+
+
+class StreamingResponse:
+    """Writes an iterable of encoded JSON chunks to a request, as a Twisted
+    IPushProducer. The iterable is consumed in worker threads, with
+    `run_in_thread`, so it may lazily build its chunks from tron's state.
+    """
+
+    def __init__(self, chunks, compress=False):
+        self.chunks = iter(chunks)
+        self.compress = compress
+        self.compressor = None
+        self.request = None
+        self.run_in_thread = None
+        self.paused = False
+        self.stopped = False
+        self.pending = False
+        self.written = 0
+
+    def start(self, request, run_in_thread=None):
+        self.request = request
+        self.run_in_thread = run_in_thread or threads.deferToThread
+        if self.compress:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            request.setHeader(b"content-encoding", b"gzip")
+        request.setHeader(b"vary", b"accept-encoding")
+        request.registerProducer(self, True)
+        self._produce()
+
+    def read(self):
+        """Return the next chunk of at least CHUNK_SIZE bytes, unless the
+        response ends first. None means the response is complete.
+        """
+        if self.stopped:
+            return None
+
+        parts, size, done = [], 0, False
+        while size < CHUNK_SIZE:
+            part = next(self.chunks, None)
+            if part is None:
+                done = True
+                break
+            parts.append(part)
+            size += len(part)
+
+        data = b"".join(parts)
+        if self.compressor:
+            data = self.compressor.compress(data)
+            if done:
+                data += self.compressor.flush()
+        if done and not data:
+            return None
+        return data, done
+
+    def _produce(self):
+        if self.paused or self.stopped or self.pending:
+            return
+        self.pending = True
+        d = self.run_in_thread(self.read)
+        d.addCallbacks(self._write, self._failed)
+
+    def _write(self, result):
+        self.pending = False
+        if self.stopped:
+            return
+        if result is None:
+            self._finish()
+            return
+
+        data, done = result
+        if data:
+            self.written += len(data)
+            self.request.write(data)
+        if done:
+            self._finish()
+        else:
+            self._next()
+
+    def _next(self):
+        """Read the next chunk, once the previous one is written."""
+        self._produce()
+
+    def _finish(self):
+        self.stopped = True
+        self.request.unregisterProducer()
+        self.request.finish()
+
+    def _failed(self, failure):
+        self.pending = False
+        if self.stopped:
+            return
+        self.stopped = True
+        self.request.unregisterProducer()
+        if not self.written:
+            self.request.processingFailed(failure)
+            return
+        # Headers and part of the body were sent, so the client can only be
+        # told by closing the connection before the end of the response
+        log.error(f"Error streaming response: {failure.getTraceback()}")
+        self.request.loseConnection()
+
+    def pauseProducing(self):
+        self.paused = True
+
+    def resumeProducing(self):
+        self.paused = False
+        self._produce()
+
+    def stopProducing(self):
+        # The client went away
+        self.stopped = True
@@ -7,6 +7,8 @@ from functools import reduce
 
 from tron.utils import timeutils
 
+_MISSING = object()
+
 
 def build_context(object, parent):
     """Construct a CommandContext for object. object must have a property
@@ -40,16 +42,65 @@ class CommandContext:
         base.__getattr__(name),
         next[name],
         next.__getattr__(name)
+
+    Chains of contexts are flattened into a table of the objects to look in,
+    in that order, so a lookup doesn't recurse through each CommandContext.
+    The tables are rebuilt when the base or next of any context changes.
     """
 
+    # Incremented whenever a context in any chain changes
+    _chain_version = 0
+
     def __init__(self, base=None, next=None):
         """
         base - Object to look for attributes in
         next - Next place to look for more pieces of context
                Generally this will be another instance of CommandContext
         """
-        self.base = base or {}
-        self.next = next or {}
+        # Set directly, as a new context doesn't change any existing chain
+        self._base = base or {}
+        self._next = next or {}
+        self._sources = (None, ())
+
+    @property
+    def base(self):
+        return self._base
+
+    @base.setter
+    def base(self, base):
+        self._base = base
+        CommandContext._chain_version += 1
+
+    @property
+    def next(self):
+        return self._next
+
+    @next.setter
+    def next(self, next):
+        self._next = next
+        CommandContext._chain_version += 1
+
+    def _get_sources(self):
+        """Return the (object, is_dict, has_items) to look names up in, in
+        lookup order.
+        """
+        # Replaced together, as commands are also rendered in API threads
+        version, sources = self._sources
+        if version != CommandContext._chain_version:
+            version = CommandContext._chain_version
+            sources = []
+            for target in (self._base, self._next):
+                if isinstance(target, CommandContext):
+                    sources.extend(target._get_sources())
+                    # Before the next object, the attributes of the context
+                    # itself are looked at
+                    sources.append((target, False, False))
+                else:
+                    has_items = isinstance(target, type) or hasattr(type(target), "__getitem__")
+                    sources.append((target, type(target) is dict, has_items))
+            sources = tuple(sources)
+            self._sources = (version, sources)
+        return sources
 
     def get(self, name, default=None):
         try:
@@ -58,14 +109,24 @@ class CommandContext:
             return default
 
     def __getitem__(self, name):
-        getters = [operator.itemgetter(name), operator.attrgetter(name)]
-        for target in [self.base, self.next]:
-            for getter in getters:
+        get_attr = operator.attrgetter(name) if "." in name else None
+        for target, is_dict, has_items in self._get_sources():
+            if is_dict:
+                if name in target:
+                    return target[name]
+            elif has_items:
                 try:
-                    return getter(target)
+                    return target[name]
                 except (KeyError, TypeError, AttributeError):
                     pass
 
+            try:
+                value = get_attr(target) if get_attr else getattr(target, name, _MISSING)
+            except (KeyError, TypeError, AttributeError):
+                continue
+            if value is not _MISSING:
+                return value
+
         raise KeyError(name)
 
     def __eq__(self, other):
@@ -75,11 +136,35 @@ class CommandContext:
         return not self == other
 
 
+class DateValueCache:
+    """The values of date arithmetic expressions (like 'shortdate-1') for one
+    time. They're rendered for every attempt, retry and trigger of a run, but
+    only change if the time does.
+    """
+
+    def __init__(self):
+        # Replaced together, as commands are also rendered in API threads
+        self.cached = (None, {})
+
+    def get(self, date_str, time):
+        if time is None:
+            # Relative to the current time, so never the same twice
+            return timeutils.DateArithmetic.parse(date_str, time)
+        cached_time, values = self.cached
+        if time != cached_time:
+            values = {}
+            self.cached = (time, values)
+        if date_str not in values:
+            values[date_str] = timeutils.DateArithmetic.parse(date_str, time)
+        return values[date_str]
+
+
 class JobContext:
     """A class which exposes properties for rendering commands."""
 
     def __init__(self, job):
         self.job = job
+        self._date_values = DateValueCache()
 
     @property
     def name(self):
@@ -94,10 +179,7 @@ class JobContext:
             last_success = self.job.runs.last_success
             last_success = last_success.run_time if last_success else None
 
-            time_value = timeutils.DateArithmetic.parse(
-                date_spec,
-                last_success,
-            )
+            time_value = self._date_values.get(date_spec, last_success)
             if time_value:
                 return time_value
 
@@ -117,6 +199,7 @@ class JobContext:
 class JobRunContext:
     def __init__(self, job_run):
         self.job_run = job_run
+        self._date_values = DateValueCache()
 
     @property
     def runid(self):
@@ -149,7 +232,7 @@ class JobRunContext:
            want to do arbitrary deltas here.
         """
         run_time = self.job_run.run_time
-        time_value = timeutils.DateArithmetic.parse(name, run_time)
+        time_value = self._date_values.get(name, run_time)
         if time_value:
             return time_value
 
@@ -1,6 +1,7 @@
 """
 A command line http client used by tronview, tronctl, and tronfig
 """
+import gzip
 import json
 import logging
 import os
@@ -29,6 +30,7 @@ Response = namedtuple("Response", "error msg content")
 
 default_headers = {
     "User-Agent": USER_AGENT,
+    "Accept-Encoding": "gzip",
 }
 
 
@@ -47,7 +49,10 @@ def load_response_content(http_response):
     encoding = http_response.headers.get_content_charset()
     if encoding is None:
         encoding = "utf8"
-    content = http_response.read().decode(encoding)
+    content = http_response.read()
+    if http_response.headers.get("Content-Encoding") == "gzip":
+        content = gzip.decompress(content)
+    content = content.decode(encoding)
     try:
         return Response(None, None, json.loads(content))
     except ValueError as e:
@@ -159,14 +164,37 @@ class Client:
         include_action_runs=False,
         include_action_graph=True,
         include_node_pool=True,
+        namespace=None,
+        state=None,
+        name_prefix=None,
+        fields=None,
+        page_size=None,
     ):
+        """Return the jobs which match every filter given. With `fields`,
+        jobs only have those fields. With `page_size`, jobs are fetched that
+        many at a time.
+        """
         params = {
             "include_job_runs": int(include_job_runs),
             "include_action_runs": int(include_action_runs),
             "include_action_graph": int(include_action_graph),
             "include_node_pool": int(include_node_pool),
         }
-        return self.http_get("/api/jobs", params).get("jobs")
+        filters = {"namespace": namespace, "state": state, "name_prefix": name_prefix}
+        params.update({key: value for key, value in filters.items() if value is not None})
+        if fields is not None:
+            params["fields"] = ",".join(fields)
+        if not page_size:
+            return self.http_get("/api/jobs", params).get("jobs")
+
+        jobs = []
+        params["limit"] = page_size
+        while True:
+            page = self.http_get("/api/jobs", params)
+            jobs.extend(page.get("jobs"))
+            if not page.get("next_cursor"):
+                return jobs
+            params["cursor"] = page["next_cursor"]
 
     def job(self, job_url, include_action_runs=False, count=0):
         params = {
@@ -190,6 +218,33 @@ class Client:
         }
         return self.http_get(action_run_url, params)
 
+    def action_run_output(self, action_run_url, stream="stdout", offset=None, num_lines=None):
+        """Return the lines of an action run's output written after the
+        `offset` token, with the token to pass next time.
+        """
+        params = {"output": stream}
+        if offset is not None:
+            params["offset"] = offset
+        if num_lines:
+            params["num_lines"] = num_lines
+        return self.http_get(action_run_url, params)
+
+    def schedule_horizon(self, hours=24):
+        return self.http_get("/api/schedule_horizon", {"hours": hours})
+
+    def triggers(self, action=None, event=None):
+        """Return the trigger edges around an action, or the actions waiting
+        on an event.
+        """
+        params = {"event": event} if event else {"action": action}
+        return self.http_get("/api/triggers", params)
+
+    def changes(self, since=None, wait=None):
+        params = {"since": since} if since is not None else {}
+        if wait:
+            params["wait"] = wait
+        return self.http_get("/api/changes", params)
+
     def http_get(self, url, data=None):
         return self.request(build_get_url(url, data))
 
@@ -395,6 +395,88 @@ class DisplayActionRuns(TableDisplay):
         )
 
 
+class DisplayScheduleHorizon(TableDisplay):
+    """Format the busiest minutes of a schedule horizon."""
+
+    columns = ["Minute", "Starts", "CPUs", "Memory"]
+    fields = ["minute", "starts", "cpus", "mem"]
+    widths = [22, 10, 10, 12]
+    title = "busiest minutes"
+    reversed = True
+
+    def __init__(self):
+        # Sort by number of starts, which is index 1
+        super().__init__(sort_index=1)
+
+    def format_value(self, field_idx, value):
+        if self.fields[field_idx] in ("cpus", "mem"):
+            value = f"{value:g}"
+        return super().format_value(field_idx, value)
+
+
+def format_schedule_horizon(content, num_shown=10):
+    """Format a schedule horizon as a summary followed by the `num_shown`
+    minutes with the most job starts.
+    """
+    summary = [
+        f"{'Horizon':<20}: {content['start_time']} - {content['end_time']}",
+        f"{'Scheduled jobs':<20}: {len(content['jobs'])}",
+        f"{'Total starts':<20}: {content['total_starts']}",
+        f"{'Peak starts/minute':<20}: {content['peak_starts']}",
+        f"{'Peak CPUs/minute':<20}: {content['peak_cpus']:g}",
+        f"{'Peak memory/minute':<20}: {content['peak_mem']:g}",
+    ]
+    busiest = sorted(content["minutes"], key=itemgetter("starts"), reverse=True)
+    return "\n".join(summary) + "\n" + DisplayScheduleHorizon().format(busiest[:num_shown])
+
+
+class DisplayTriggerEdges(TableDisplay):
+    """Format trigger edges: the event each downstream action waits on, and
+    whether its upstream action publishes it.
+    """
+
+    columns = ["Upstream", "Event", "Downstream", "Published"]
+    fields = ["upstream", "event", "downstream", "published"]
+    widths = [30, 50, 30, 10]
+    resize_fields = {"upstream", "event", "downstream"}
+
+    def __init__(self, title):
+        super().__init__()
+        self.title = title
+        # Resizing changes the widths, so each table gets its own
+        self.widths = list(self.widths)
+
+    def format_value(self, field_idx, value):
+        if self.fields[field_idx] == "published":
+            value = "yes" if value else "no"
+        return super().format_value(field_idx, value)
+
+    def color(self, col, field):
+        # Nothing publishes the event, so the downstream action waits forever
+        if self.fields[col] == "published" and not field:
+            return "red"
+        return None
+
+
+def format_triggers(content):
+    """Format the trigger edges around an action, or the actions waiting on
+    an event.
+    """
+    if "event" in content:
+        sections = [
+            f"{'Event':<10}: {content['event']}",
+            DisplayTriggerEdges("waiting actions").format(content["waiting"]),
+        ]
+    else:
+        sections = [
+            f"{'Action':<10}: {content['action']}\n"
+            f"{'Publishes':<10}: {', '.join(content['publishes']) or 'nothing'}",
+            DisplayTriggerEdges("upstream triggers").format(content["upstream"]),
+            DisplayTriggerEdges("downstream triggers").format(content["downstream"]),
+        ]
+    return "\n".join(section.rstrip("\n") for section in sections)
+
+
 def display_node(source, _=None):
     if not source:
         return ""
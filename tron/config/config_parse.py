@@ -25,9 +25,9 @@ from tron.config import schema
 from tron.config.config_utils import build_dict_name_validator
 from tron.config.config_utils import build_dict_value_validator
 from tron.config.config_utils import build_list_of_type_validator
+from tron.config.config_utils import compile_template
 from tron.config.config_utils import ConfigContext
 from tron.config.config_utils import PartialConfigContext
-from tron.config.config_utils import StringFormatter
 from tron.config.config_utils import valid_bool
 from tron.config.config_utils import valid_dict
 from tron.config.config_utils import valid_exit_code
@@ -42,6 +42,7 @@ from tron.config.schedule_parse import valid_schedule
 from tron.config.schema import CLEANUP_ACTION_NAME
 from tron.config.schema import ConfigAction
 from tron.config.schema import ConfigCleanupAction
+from tron.config.schema import ConfigConcurrencyLimits
 from tron.config.schema import ConfigConstraint
 from tron.config.schema import ConfigFieldSelectorSource
 from tron.config.schema import ConfigJob
@@ -79,7 +80,7 @@ def build_format_string_validator(context_object):
         )
 
         try:
-            StringFormatter(context).format(value)
+            compile_template(value).render(context)
             return value
         except (KeyError, ValueError) as e:
             error_msg = "Unknown context variable %s at %s: %s"
@@ -778,6 +779,7 @@ class ValidateJob(Validator):
         "monitoring": {},
         "time_zone": None,
         "expected_runtime": datetime.timedelta(hours=24),
+        "priority": 0,
         "use_k8s": False,
     }
 
@@ -796,6 +798,7 @@ class ValidateJob(Validator):
         "monitoring": valid_dict,
         "time_zone": valid_time_zone,
         "expected_runtime": config_utils.valid_time_delta,
+        "priority": valid_int,
         "use_k8s": valid_bool,
     }
 
@@ -958,12 +961,40 @@ class ValidateKubernetes(Validator):
         "non_retryable_exit_codes": build_list_of_type_validator(valid_exit_code, allow_empty=True),
         "default_volumes": build_list_of_type_validator(valid_volume, allow_empty=True),
         "watcher_kubeconfig_paths": build_list_of_type_validator(valid_string, allow_empty=True),
+        "submit_rate_limit": valid_float,
+        "submit_burst": valid_int,
     }
 
 
 valid_kubernetes_options = ValidateKubernetes()
 
 
+class ValidateConcurrencyLimits(Validator):
+    config_class = ConfigConcurrencyLimits
+    optional = True
+    defaults: dict[str, Any] = {
+        "namespaces": {},
+        "pools": {},
+        "executors": {},
+        "weights": {},
+    }
+
+    validators = {
+        "namespaces": build_dict_value_validator(valid_int, allow_empty=True),
+        "pools": build_dict_value_validator(valid_int, allow_empty=True),
+        "executors": build_dict_value_validator(valid_int, allow_empty=True),
+        "weights": build_dict_value_validator(valid_int, allow_empty=True),
+    }
+
+    def post_validation(self, valid_input, config_context):
+        for namespace, weight in valid_input["weights"].items():
+            if weight < 1:
+                raise ConfigError(f"Weight for {namespace} must be at least 1 at {config_context.path}")
+
+
+valid_concurrency_limits = ValidateConcurrencyLimits()
+
+
 def validate_jobs(config, config_context):
     """Validate jobs"""
     valid_jobs = build_dict_name_validator(valid_job, allow_empty=True)
@@ -1007,6 +1038,7 @@ class ValidateConfig(Validator):
         "jobs": (),
         "mesos_options": ConfigMesos(**ValidateMesos.defaults),
         "k8s_options": ConfigKubernetes(**ValidateKubernetes.defaults),
+        "concurrency_limits": ConfigConcurrencyLimits(**ValidateConcurrencyLimits.defaults),
         "eventbus_enabled": None,
         "read_json": False,
     }
@@ -1023,6 +1055,7 @@ class ValidateConfig(Validator):
         "node_pools": node_pools,
         "mesos_options": valid_mesos_options,
         "k8s_options": valid_kubernetes_options,
+        "concurrency_limits": valid_concurrency_limits,
         "eventbus_enabled": valid_bool,
         "read_json": valid_bool,
     }
@@ -1099,26 +1132,32 @@ def get_nodes_from_master_namespace(master):
     return set(itertools.chain(master.nodes, master.node_pools))
 
 
-def validate_config_mapping(config_mapping):
+def validate_named_fragment(name, content, master):
+    """Validate the config fragment for a namespace other than MASTER, given
+    the validated MASTER config.
+    """
+    context = ConfigContext(
+        name,
+        get_nodes_from_master_namespace(master),
+        master.command_context,
+        name,
+    )
+    # validation mutates the fragment - so let's make sure that we're making a
+    # copy in case the passed-in content is used elsewhere
+    return valid_named_config(deepcopy(content), config_context=context)
+
+
+def validate_config_mapping(config_mapping, validate_named_fragment=validate_named_fragment):
     if MASTER_NAMESPACE not in config_mapping:
         msg = "A config mapping requires a %s namespace"
         raise ConfigError(msg % MASTER_NAMESPACE)
 
-    # we mutate this mapping - so let's make sure that we're making a copy
-    # in case the passed-in mapping is used elsewhere
-    config_mapping_to_validate = deepcopy(config_mapping)
-    master = valid_config(config_mapping_to_validate.pop(MASTER_NAMESPACE))
-    nodes = get_nodes_from_master_namespace(master)
+    master = valid_config(deepcopy(config_mapping[MASTER_NAMESPACE]))
     yield MASTER_NAMESPACE, master
 
-    for name, content in config_mapping_to_validate.items():
-        context = ConfigContext(
-            name,
-            nodes,
-            master.command_context,
-            name,
-        )
-        yield name, valid_named_config(content, config_context=context)
+    for name, content in config_mapping.items():
+        if name != MASTER_NAMESPACE:
+            yield name, validate_named_fragment(name, content, master)
 
 
 class ConfigContainer:
@@ -1131,8 +1170,19 @@ class ConfigContainer:
         return self.configs.items()
 
     @classmethod
-    def create(cls, config_mapping):
-        return cls(dict(validate_config_mapping(config_mapping)))
+    def create(cls, config_mapping, validate_named_fragment=validate_named_fragment):
+        return cls(dict(validate_config_mapping(config_mapping, validate_named_fragment)))
+
+    def with_fragment(self, name, config):
+        """Return a copy of this container with a validated config as the
+        fragment for name, or without name if config is None.
+        """
+        configs = dict(self.configs)
+        if config is None:
+            configs.pop(name, None)
+        else:
+            configs[name] = config
+        return ConfigContainer(configs)
 
     # TODO: DRY with get_jobs()
     def get_job_names(self):
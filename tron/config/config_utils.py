@@ -9,6 +9,8 @@ from tron.config import ConfigError
 from tron.config.schema import MASTER_NAMESPACE
 
 MAX_IDENTIFIER_LENGTH = 255
+# Most templates (commands and triggers) kept compiled
+MAX_COMPILED_TEMPLATES = 16 * 1024
 IDENTIFIER_RE = re.compile(r"^[A-Za-z_][\w\-]{0,254}$")
 
 
@@ -27,6 +29,51 @@ class StringFormatter(Formatter):
             return Formatter.get_value(key, args, kwds)
 
 
+class CompiledTemplate:
+    """A format string parsed once, so rendering it only looks up its fields
+    in the context. Templates whose fields use attribute or index access,
+    positional fields or nested fields are rendered by StringFormatter.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.parts = list(_formatter.parse(template))
+        self.is_simple = all(
+            field_name is None
+            or (
+                field_name
+                and not field_name.isdigit()
+                and "." not in field_name
+                and "[" not in field_name
+                and "{" not in format_spec
+            )
+            for _, field_name, format_spec, _ in self.parts
+        )
+
+    def render(self, context):
+        if not self.is_simple:
+            return StringFormatter(context).format(self.template)
+
+        rendered = []
+        for literal, field_name, format_spec, conversion in self.parts:
+            rendered.append(literal)
+            if field_name is not None:
+                value = _formatter.convert_field(context[field_name], conversion)
+                rendered.append(format(value, format_spec))
+        return "".join(rendered)
+
+
+_formatter = Formatter()
+
+
+@functools.lru_cache(maxsize=MAX_COMPILED_TEMPLATES)
+def compile_template(template: str) -> CompiledTemplate:
+    """Return a template compiled for rendering. Raises a ValueError if it
+    isn't a valid format string.
+    """
+    return CompiledTemplate(template)
+
+
 class UniqueNameDict(dict):
     """A dict like object that throws a ConfigError if a key exists and
     __setitem__ is called to change the value of that key.
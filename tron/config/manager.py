@@ -1,18 +1,28 @@
+import collections
+import concurrent.futures
 import hashlib
 import logging
+import multiprocessing
 import os
 from copy import deepcopy
+from typing import Any
 
 from tron import yaml
 from tron.config import config_parse
 from tron.config import ConfigError
 from tron.config import schema
 from tron.core.jobgraph import JobGraph
+from tron.core.jobgraph import validate_dependencies
 from tron.utils import maybe_decode
 from tron.utils import maybe_encode
 
 log = logging.getLogger(__name__)
 
+# Configs with at least this many namespaces are loaded in worker processes,
+# as starting them costs more than validating a few namespaces
+PARALLEL_LOAD_MIN_NAMESPACES = 32
+PARALLEL_LOAD_MAX_WORKERS = 8
+
 
 def from_string(content):
     try:
@@ -49,13 +59,63 @@ def hash_digest(content: str | bytes) -> str:
     ).hexdigest()  # TODO: TRON-2293 maybe_encode is a relic of Python2->Python3 migration. Remove it.
 
 
+def hash_config(content: Any) -> str:
+    """Return a hash of parsed config content, whatever the order of its keys."""
+    return hash_digest(yaml.dump(content, sort_keys=True))
+
+
+def hash_master_context(master: Any) -> str:
+    """Return a hash of the parts of the MASTER config which other fragments
+    are validated against.
+    """
+    return hash_config(
+        {
+            "nodes": sorted(config_parse.get_nodes_from_master_namespace(master)),
+            "command_context": master.command_context,
+        },
+    )
+
+
+def load_named_fragment(name, filename, master):
+    """Read, parse and validate the fragment of a namespace other than MASTER.
+    Return (content, content hash, validated config, error), with error set
+    instead of the rest if the fragment is invalid. Run in worker processes.
+    """
+    try:
+        content = read(filename)
+        return content, hash_config(content), config_parse.validate_named_fragment(name, content, master), None
+    except Exception as e:
+        return None, None, None, f"{e.__class__.__name__}: {e}"
+
+
 class ManifestFile:
-    """Manage the manifest file, which tracks name to filename."""
+    """Manage the manifest file, which tracks name to filename. The manifest
+    is kept in memory, and only read again if the file changes.
+    """
 
     MANIFEST_FILENAME = "_manifest.yaml"
 
     def __init__(self, path):
         self.filename = os.path.join(path, self.MANIFEST_FILENAME)
+        self.file_mapping = None
+        # (inode, mtime, size) of the file when file_mapping was read
+        self.file_key = None
+
+    def _get_file_key(self):
+        stat = os.stat(self.filename)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        file_key = self._get_file_key()
+        if file_key != self.file_key:
+            self.file_mapping = read(self.filename)
+            self.file_key = file_key
+        return self.file_mapping
+
+    def _write(self, manifest):
+        write(self.filename, manifest)
+        self.file_mapping = manifest
+        self.file_key = self._get_file_key()
 
     def create(self):
         if os.path.isfile(self.filename):
@@ -63,42 +123,57 @@ class ManifestFile:
             log.info(msg % self.filename)
             return
 
-        write(self.filename, {})
+        self._write({})
 
     def add(self, name, filename):
-        manifest = read(self.filename)
+        manifest = dict(self._read())
         manifest[name] = filename
-        write(self.filename, manifest)
+        self._write(manifest)
 
     def delete(self, name):
-        manifest = read(self.filename)
+        manifest = dict(self._read())
         if name not in manifest:
             msg = "Namespace %s does not exist in manifest, cannot delete."
             log.info(msg % name)
             return
 
         del manifest[name]
-        write(self.filename, manifest)
+        self._write(manifest)
 
     def get_file_mapping(self):
-        return read(self.filename)
+        return dict(self._read())
 
     def get_file_name(self, name):
-        return self.get_file_mapping().get(name)
+        return self._read().get(name)
 
     def __contains__(self, name):
-        return name in self.get_file_mapping()
+        return name in self._read()
 
 
 class ConfigManager:
     """Read, load and write configuration."""
 
     DEFAULT_HASH = hash_digest("")
+    # Validated fragments are kept for twice the number of namespaces (the
+    # current config and a pending update of each) plus this many
+    EXTRA_VALIDATED_FRAGMENTS = 16
 
     def __init__(self, config_path, manifest=None):
         self.config_path = config_path
         self.manifest = manifest or ManifestFile(config_path)
         self.name_mapping = None
+        # The validated config of every namespace, updated as they're written
+        self.config_container = None
+        # (name, content hash, master context hash) -> validated fragment,
+        # least recently used first
+        self.validated_fragments = collections.OrderedDict()
+        # name -> hash_config() of its content, computed once per write
+        self.hashes = {}
+        # name -> the content of its file, as read or last written
+        self.raw_configs = {}
+        # The last MASTER config validated against, and hash_master_context()
+        # of it
+        self.master_context_hash = None
 
     def build_file_path(self, name):
         name = name.replace(".", "_").replace(os.path.sep, "_")
@@ -106,24 +181,32 @@ class ConfigManager:
 
     def read_raw_config(self, name: str = schema.MASTER_NAMESPACE) -> str:
         """Read the config file without converting to yaml."""
-        filename = self.manifest.get_file_name(name)
-        return read_raw(filename)
+        content: str | None = self.raw_configs.get(name)
+        if content is None:
+            filename = self.manifest.get_file_name(name)
+            content = self.raw_configs[name] = read_raw(filename)
+        return content
 
     def write_config(self, name: str, content: str) -> None:
         loaded_content = from_string(content)
-        self.validate_with_fragment(
+        content_hash = hash_config(loaded_content)
+        config_container = self.validate_with_fragment(
             name,
             content=loaded_content,
             # TODO: remove this constraint after tron triggers across clusters are supported.
             should_validate_missing_dependency=False,
+            content_hash=content_hash,
         )
         # validate_with_fragment throws if the updated content is invalid - so if we get here
         # we know it's safe to reflect the update in our config store
         self.get_config_name_mapping()[name] = loaded_content
+        self.hashes[name] = content_hash
+        self.config_container = config_container
 
         # ...and then let's also persist the update to disk since memory is temporary, but disk is forever™
         filename = self.get_filename_from_manifest(name)
         write_raw(filename, content)
+        self.raw_configs[name] = maybe_decode(content)
 
     def delete_config(self, name: str) -> None:
         filename = self.manifest.get_file_name(name)
@@ -135,6 +218,10 @@ class ConfigManager:
         # to avoid needing to reload from disk on every config load - we need to ensure that
         # we also persist config deletions into our cache
         self.get_config_name_mapping().pop(name, None)
+        self.hashes.pop(name, None)
+        self.raw_configs.pop(name, None)
+        if self.config_container is not None:
+            self.config_container = self.config_container.with_fragment(name, None)
         self.manifest.delete(name)
         os.remove(filename)
 
@@ -151,20 +238,64 @@ class ConfigManager:
         name,
         content,
         should_validate_missing_dependency=True,
+        content_hash=None,
     ):
-        # NOTE: we deepcopy rather than swap values to keep this a pure function
-        # get_config_name_mapping() returns a shared dict, so this would otherwise
-        # actually update the mapping - which would be unwanted/need to be rolled-back
-        # should validation fail.
-        name_mapping = deepcopy(self.get_config_name_mapping())
-        name_mapping[name] = content
+        """Validate content as the config for name, and return the config of
+        every namespace with it. Only the fragment itself is validated, unless
+        it's MASTER, which every other fragment depends on.
+        """
+        if name == schema.MASTER_NAMESPACE:
+            # NOTE: we copy rather than swap values to keep this a pure function
+            # get_config_name_mapping() returns a shared dict, so this would otherwise
+            # actually update the mapping - which would be unwanted/need to be rolled-back
+            # should validation fail.
+            name_mapping = dict(self.get_config_name_mapping())
+            name_mapping[name] = content
+            config_container = self.create_config_container(name_mapping)
+            changed_configs = config_container
+        else:
+            current = self.load()
+            config = self.validate_named_fragment(name, content, current.get_master(), content_hash)
+            config_container = current.with_fragment(name, config)
+            changed_configs = config_parse.ConfigContainer({name: config})
+
         try:
-            JobGraph(
-                config_parse.ConfigContainer.create(name_mapping),
-                should_validate_missing_dependency=should_validate_missing_dependency,
-            )
+            # The actions of the other namespaces were built when they were
+            # validated, so only the new ones need building
+            JobGraph(changed_configs)
+            if should_validate_missing_dependency:
+                validate_dependencies(config_container.get_jobs())
         except ValueError as e:
             raise ConfigError(str(e))
+        return config_container
+
+    def validate_named_fragment(self, name, content, master, content_hash=None):
+        """Validate the fragment for a namespace other than MASTER, unless the
+        same content was validated against the same MASTER nodes and command
+        context before.
+        """
+        if content_hash is None:
+            if self.get_config_name_mapping().get(name) is content:
+                content_hash = self.get_hash(name)
+            else:
+                content_hash = hash_config(content)
+        if self.master_context_hash is None or self.master_context_hash[0] is not master:
+            self.master_context_hash = (master, hash_master_context(master))
+        key = (name, content_hash, self.master_context_hash[1])
+        config = self.validated_fragments.get(key)
+        if config is not None:
+            self.validated_fragments.move_to_end(key)
+            return config
+
+        config = config_parse.validate_named_fragment(name, content, master)
+        self.validated_fragments[key] = config
+        max_fragments = 2 * len(self.get_config_name_mapping()) + self.EXTRA_VALIDATED_FRAGMENTS
+        while len(self.validated_fragments) > max_fragments:
+            self.validated_fragments.popitem(last=False)
+        return config
+
+    def create_config_container(self, name_mapping):
+        return config_parse.ConfigContainer.create(name_mapping, validate_named_fragment=self.validate_named_fragment)
 
     def get_config_name_mapping(self):
         if self.name_mapping is None:
@@ -175,29 +306,81 @@ class ConfigManager:
 
     def load(self):
         """Return the fully constructed configuration."""
-        log.info("Loading full config from %s" % self.config_path)
-        name_mapping = self.get_config_name_mapping()
-        return config_parse.ConfigContainer.create(name_mapping)
+        if self.config_container is None:
+            log.info("Loading full config from %s" % self.config_path)
+            file_mapping = self.manifest.get_file_mapping()
+            if (
+                self.name_mapping is None
+                and schema.MASTER_NAMESPACE in file_mapping
+                and len(file_mapping) >= PARALLEL_LOAD_MIN_NAMESPACES
+            ):
+                self.config_container = self.load_parallel(file_mapping)
+            else:
+                name_mapping = self.get_config_name_mapping()
+                self.config_container = self.create_config_container(name_mapping)
+        return self.config_container
+
+    def load_parallel(self, file_mapping):
+        """Read and validate every namespace other than MASTER in worker
+        processes, and return the validated config. Every invalid namespace
+        is reported in the ConfigError raised.
+        """
+        master_content = read(file_mapping[schema.MASTER_NAMESPACE])
+        master = config_parse.valid_config(deepcopy(master_content))
+        names = [name for name in file_mapping if name != schema.MASTER_NAMESPACE]
+        workers = min(PARALLEL_LOAD_MAX_WORKERS, os.cpu_count() or 1)
+        log.info(f"Loading {len(names)} namespaces with {workers} workers")
+        # Workers are spawned rather than forked, as other threads may be
+        # running
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            results = list(
+                executor.map(
+                    load_named_fragment,
+                    names,
+                    [file_mapping[name] for name in names],
+                    [master] * len(names),
+                    chunksize=max(1, len(names) // (workers * 4)),
+                )
+            )
+
+        errors = [f"{name}: {error}" for name, (_, _, _, error) in zip(names, results) if error]
+        if errors:
+            raise ConfigError("Invalid config for namespaces:\n%s" % "\n".join(errors))
+
+        # Merged in manifest order, as get_config_name_mapping() would
+        contents = {name: result for name, result in zip(names, results)}
+        self.name_mapping = {
+            name: master_content if name == schema.MASTER_NAMESPACE else contents[name][0] for name in file_mapping
+        }
+        master_context_hash = hash_master_context(master)
+        self.master_context_hash = (master, master_context_hash)
+        configs = {schema.MASTER_NAMESPACE: master}
+        for name, (_, content_hash, config, _) in contents.items():
+            self.hashes[name] = content_hash
+            self.validated_fragments[(name, content_hash, master_context_hash)] = config
+            configs[name] = config
+        return config_parse.ConfigContainer(configs)
 
     def get_hash(self, name: str) -> str:
         """Return a hash of the configuration contents for name."""
         if name not in self:
             return self.DEFAULT_HASH
 
+        content_hash: str | None = self.hashes.get(name)
+        if content_hash is not None:
+            return content_hash
+
         if name in self.get_config_name_mapping():
             # unfortunately, we have the parsed dict in memory.
             # rather than hit the disk to get the raw string - let's convert
             # the in-memory dict to a yaml string and hash that to save a couple
             # ms (in testing, ~3ms over loading from disk and ~1ms over dumping to json :p)
-            # TODO: consider storing the hash alongside the config so that we only calculate
-            # hashes once?
-            return hash_digest(
-                yaml.dump(
-                    self.get_config_name_mapping()[name],
-                    # ensure that the keys are always in a stable order
-                    sort_keys=True,
-                )
-            )
+            # the hash is stored until the config is next written
+            content_hash = self.hashes[name] = hash_config(self.get_config_name_mapping()[name])
+            return content_hash
 
         # the config for any name should always be in our name mapping
         # ...but just in case, let's fallback to reading from disk.
@@ -59,6 +59,7 @@ TronConfig = config_object_factory(
         "jobs",  # dict of ConfigJob
         "mesos_options",  # ConfigMesos
         "k8s_options",  # ConfigKubernetes
+        "concurrency_limits",  # ConfigConcurrencyLimits
         "eventbus_enabled",  # bool or None
         "read_json",  # bool, deprecated — accepted but ignored
     ],
@@ -135,6 +136,18 @@ ConfigKubernetes = config_object_factory(
         "non_retryable_exit_codes",
         "default_volumes",
         "watcher_kubeconfig_paths",
+        "submit_rate_limit",  # float, max task submissions per second
+        "submit_burst",  # int
+    ],
+)
+
+ConfigConcurrencyLimits = config_object_factory(
+    name="ConfigConcurrencyLimits",
+    optional=[
+        "namespaces",  # dict of str -> int
+        "pools",  # dict of str -> int
+        "executors",  # dict of str -> int
+        "weights",  # dict of namespace -> int
     ],
 )
 
@@ -158,6 +171,7 @@ ConfigJob = config_object_factory(
         "max_runtime",  # datetime.Timedelta
         "time_zone",  # pytz time zone
         "expected_runtime",  # datetime.Timedelta
+        "priority",  # int
         # TODO: cleanup once we're fully off of Mesos and all non-SSH jobs *only* use k8s
         "use_k8s",  # bool
     ],
@@ -23,6 +23,17 @@ from tron.utils.persistable import Persistable
 log = logging.getLogger(__name__)
 
 
+def get_trigger_templates(trigger_downstreams: bool | dict | None) -> list[str]:
+    """Return the templates of the triggers an action publishes when it
+    succeeds, without the action's own name in front.
+    """
+    if not trigger_downstreams:
+        return []
+    if isinstance(trigger_downstreams, dict):
+        return [f"{k}.{v}" for k, v in trigger_downstreams.items()]
+    return ["shortdate.{shortdate}"]
+
+
 @dataclass
 class ActionCommandConfig(Persistable):
     """A configurable data object for one try of an Action."""
@@ -1,3 +1,4 @@
+import itertools
 import logging
 from collections import namedtuple
 from collections.abc import Mapping
@@ -8,6 +9,9 @@ from tron.utils.timeutils import delta_total_seconds
 
 log = logging.getLogger(__name__)
 Trigger = namedtuple("Trigger", ["name", "command"])
+# Stamps for the config of each ActionGraph, so job runs can tell which one
+# the configs of their action runs came from
+_config_versions = itertools.count(1)
 
 
 class ActionGraph:
@@ -26,6 +30,7 @@ class ActionGraph:
         for action_triggers in self.required_triggers.values():
             self.all_triggers |= action_triggers
         self.all_triggers -= set(self.action_map)
+        self.config_version = next(_config_versions)
 
     def get_dependencies(self, action_name: str, include_triggers: bool = False) -> Sequence[Action | Trigger]:
         """Given an Action's name return the Actions (and optionally, Triggers)
@@ -39,6 +44,16 @@ class ActionGraph:
             dependencies += [self[trigger_name] for trigger_name in self.required_triggers[action_name]]
         return dependencies
 
+    def get_changed_actions(self, previous: "ActionGraph") -> set[str]:
+        """Return the names of the actions whose command config isn't the
+        same as in a previous graph.
+        """
+        return {
+            name
+            for name, action in self.action_map.items()
+            if name not in previous.action_map or previous.action_map[name].command_config != action.command_config
+        }
+
     def names(self, include_triggers=False):
         names = set(self.action_map)
         if include_triggers:
@@ -27,11 +27,12 @@ from tron.bin.action_runner import build_environment
 from tron.bin.action_runner import build_labels
 from tron.command_context import CommandContext
 from tron.config import schema
-from tron.config.config_utils import StringFormatter
+from tron.config.config_utils import compile_template
 from tron.config.schema import ExecutorTypes
 from tron.core import action
 from tron.core.action import ActionCommandConfig
 from tron.core.actiongraph import ActionGraph
+from tron.core.concurrency import concurrency_limiter
 from tron.eventbus import EventBus
 from tron.kubernetes import KubernetesClusterRepository
 from tron.kubernetes import KubernetesTask
@@ -47,6 +48,8 @@ from tron.utils.observer import Observable
 from tron.utils.observer import Observer
 from tron.utils.persistable import Persistable
 from tron.utils.state import Machine
+from tron.utils.timerqueue import timer_queue
+from tron.utils.timerqueue import TimerCall
 
 if TYPE_CHECKING:
     from twisted.internet.epollreactor import EPollReactor
@@ -128,6 +131,7 @@ class ActionRunFactory:
             "triggered_by": action.triggered_by,
             "on_upstream_rerun": action.on_upstream_rerun,
             "trigger_timeout_timestamp": trigger_timeout.timestamp(),
+            "priority": job_run.priority,
         }
         if action.executor == ExecutorTypes.mesos.value:
             return MesosActionRun(**args)
@@ -386,6 +390,7 @@ class ActionRun(Observable, Persistable):
         on_upstream_rerun: schema.ActionOnRerun | None = None,
         trigger_timeout_timestamp: float | None = None,
         original_command: str | None = None,
+        priority: int = 0,
     ):
         super().__init__()
         self.job_run_id = maybe_decode(
@@ -420,9 +425,11 @@ class ActionRun(Observable, Persistable):
         self.on_upstream_rerun = on_upstream_rerun
         self.trigger_timeout_timestamp = trigger_timeout_timestamp
         self.trigger_timeout_call = None
+        # not persisted, runs restored from state use the default priority
+        self.priority = priority
 
         self.action_command = None
-        self.in_delay = None  # type: Optional[DelayedCall]
+        self.in_delay = None  # type: Optional[TimerCall]
 
     @property
     def state(self) -> str:
@@ -558,6 +565,10 @@ class ActionRun(Observable, Persistable):
         # Recovery will look for unknown runs
         if run.is_active:
             run.transition_and_notify("fail_unknown")
+        if run.is_unknown and run.end_time is None:
+            # May still be running, so it holds a concurrency slot until
+            # recovery finds out
+            concurrency_limiter.restore(run)
         return run
 
     def start(self, original_command: bool = True) -> bool | ActionCommand | None:
@@ -570,6 +581,13 @@ class ActionRun(Observable, Persistable):
         if not self.machine.check("start"):
             return False
 
+        if not concurrency_limiter.try_acquire(self):
+            # started by the limiter once there's room. Until then it's
+            # waiting rather than scheduled, so its JobRun isn't pending.
+            if self.machine.check("ready"):
+                self.transition_and_notify("ready")
+            return False
+
         if len(self.attempts) == 0:
             log.info(f"{self} starting")
         else:
@@ -678,7 +696,7 @@ class ActionRun(Observable, Persistable):
     def restart(self, original_command: bool = True) -> bool | ActionCommand | None:
         """Used by `fail` when action run has to be re-tried"""
         if self.retries_delay is not None:
-            self.in_delay = reactor.callLater(  # type: ignore  # no twisted stubs
+            self.in_delay = timer_queue.call_later(
                 self.retries_delay.total_seconds(),
                 self.start_after_delay,
             )
@@ -729,15 +747,7 @@ class ActionRun(Observable, Persistable):
             return self._done("fail", exit_status)
 
     def triggers_to_emit(self) -> list[str]:
-        if not self.trigger_downstreams:
-            return []
-
-        if isinstance(self.trigger_downstreams, bool):
-            templates = ["shortdate.{shortdate}"]
-        elif isinstance(self.trigger_downstreams, dict):
-            templates = [f"{k}.{v}" for k, v in self.trigger_downstreams.items()]
-
-        return [self.render_template(trig) for trig in templates]
+        return [self.render_template(trig) for trig in action.get_trigger_templates(self.trigger_downstreams)]
 
     def emit_triggers(self):
         triggers = self.triggers_to_emit()
@@ -893,7 +903,7 @@ class ActionRun(Observable, Persistable):
 
     def render_template(self, template):
         """Render our configured command using the command context."""
-        return StringFormatter(self.context).format(template)
+        return compile_template(template).render(self.context)
 
     def render_command(self, command):
         """Render our configured command using the command context."""
@@ -943,7 +953,7 @@ class ActionRun(Observable, Persistable):
         if self.trigger_timeout_timestamp:
             now = timeutils.current_time().timestamp()
             delay = max(self.trigger_timeout_timestamp - now, 1)
-            self.trigger_timeout_call = reactor.callLater(
+            self.trigger_timeout_call = timer_queue.call_later(
                 delay,
                 self.trigger_timeout_reached,
             )
@@ -972,6 +982,10 @@ class ActionRun(Observable, Persistable):
     def is_blocked_on_trigger(self):
         return not self.is_done and bool(self.remaining_triggers)
 
+    @property
+    def is_waiting_for_slot(self):
+        return concurrency_limiter.is_waiting(self)
+
     def clear_end_state(self):
         self.exit_status = None
         self.end_time = None
@@ -1001,6 +1015,8 @@ class ActionRun(Observable, Persistable):
 
     def transition_and_notify(self, target: str) -> bool | None:
         if self.machine.transition(target):
+            if self.is_done:
+                concurrency_limiter.release(self)
             self.notify(self.state)
             return True
         return None
@@ -1401,7 +1417,7 @@ class KubernetesActionRun(ActionRun, Observer):
         self.watch(task)
 
         try:
-            k8s_cluster.submit(task)
+            k8s_cluster.submit(task, priority=self.priority)
         except Exception:
             log.exception(f"Unable to submit task for ActionRun {self.id}")
             self.fail(exitcode.EXIT_KUBERNETES_TASK_INVALID)
@@ -1602,6 +1618,16 @@ class ActionRunCollection:
     def __init__(self, action_graph: ActionGraph, run_map: dict[str, ActionRun]):
         self.action_graph = action_graph
         self.run_map: dict[str, ActionRun] = run_map
+        # Built the first time startable runs are looked for, then kept up to
+        # date by update_run_state, so a run finishing only touches the runs
+        # which depend on it
+        self._dependents: dict[str, list[str]] | None = None
+        # Action name -> how many of the runs it depends on aren't complete
+        self._unsatisfied: dict[str, int] = {}
+        self._complete: set[str] = set()
+        # Names of the runs with no unsatisfied dependencies
+        self._unblocked: set[str] = set()
+        self._positions: dict[str, int] = {}
         # Setup proxies
         self.proxy_action_runs_with_cleanup = proxy.CollectionProxy(
             self.get_action_runs_with_cleanup,
@@ -1612,6 +1638,7 @@ class ActionRunCollection:
                 proxy.attr_proxy("is_cancelled", any),
                 proxy.attr_proxy("is_active", any),
                 proxy.attr_proxy("is_waiting", any),
+                proxy.attr_proxy("is_waiting_for_slot", any),
                 proxy.attr_proxy("is_queued", all),
                 proxy.attr_proxy("is_complete", all),
                 proxy.func_proxy("queue", eager_all),
@@ -1639,11 +1666,15 @@ class ActionRunCollection:
 
     action_runs = property(get_action_runs)
 
-    def update_action_config(self, action_graph):
+    def update_action_config(self, action_graph, action_names=None):
         # If there are new command configs that match the action name, update them
         # Do not update the actual action_graph
         updated = False
-        for action_run in self.get_action_runs_with_cleanup():
+        if action_names is None:
+            action_runs = self.get_action_runs_with_cleanup()
+        else:
+            action_runs = [self.run_map[name] for name in action_names if name in self.run_map]
+        for action_run in action_runs:
             new_action = action_graph.action_map.get(action_run.action_name)
             if new_action and new_action.command_config != action_run.command_config:
                 action_run.command_config = new_action.command_config
@@ -1663,10 +1694,60 @@ class ActionRunCollection:
         if self.cleanup_action_run:
             return self.cleanup_action_run.state_data
 
+    def _build_dependency_counts(self):
+        self._dependents = {name: [] for name in self.run_map}
+        self._unsatisfied = {}
+        self._complete = {run.action_name for run in self.action_runs if run.is_complete}
+        for run in self.action_runs:
+            required_runs = list(
+                self.action_runs_for_actions(self.action_graph.get_dependencies(run.action_name)),
+            )
+            for required_run in required_runs:
+                self._dependents[required_run.action_name].append(run.action_name)
+            self._unsatisfied[run.action_name] = sum(not required_run.is_complete for required_run in required_runs)
+        self._unblocked = {name for name, count in self._unsatisfied.items() if not count}
+        self._positions = {name: index for index, name in enumerate(self.run_map)}
+
+    def update_run_state(self, action_run):
+        """Update the dependency counts of the runs which depend on an action
+        run after its state changed.
+        """
+        if self._dependents is None:
+            # Nothing is counted yet, so the counts will start from this state
+            return
+        name = action_run.action_name
+        if self._unsatisfied.get(name) == 0 and not action_run.is_done:
+            # Retried, so it may need starting again
+            self._unblocked.add(name)
+        if action_run.is_complete == (name in self._complete):
+            return
+
+        if action_run.is_complete:
+            self._complete.add(name)
+            change = -1
+        else:
+            self._complete.discard(name)
+            change = 1
+        for dependent in self._dependents.get(name, []):
+            self._unsatisfied[dependent] += change
+            if self._unsatisfied[dependent]:
+                self._unblocked.discard(dependent)
+            else:
+                self._unblocked.add(dependent)
+
     def get_startable_action_runs(self):
         """Returns any actions that are scheduled or queued that can be run."""
-
-        return [r for r in self.action_runs if r.machine.check("start") and not self._is_run_blocked(r)]
+        if self._dependents is None:
+            self._build_dependency_counts()
+
+        startable = []
+        for name in list(self._unblocked):
+            run = self.run_map.get(name)
+            if run is None or run.is_done:
+                self._unblocked.discard(name)
+            elif run.machine.check("start") and not run.is_blocked_on_trigger:
+                startable.append(run)
+        return sorted(startable, key=lambda run: self._positions[run.action_name])
 
     @property
     def has_startable_action_runs(self):
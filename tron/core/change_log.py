@@ -0,0 +1,140 @@
+"""
+A monotonically increasing version of tron's state, and which jobs, job runs
+and action runs changed at each version.
+
+Polling clients remember the version of the last state they saw and ask only
+for what changed since then, instead of downloading everything again. Each
+object is kept once, under the version of its latest change. Removed job runs
+and jobs are kept as tombstones so clients learn about removals, up to
+MAX_REMOVED of them. A client that asks for changes from before the oldest
+version still known (or from before a restart) is told to reset, i.e. fetch
+the full state again.
+"""
+import collections
+import logging
+import threading
+import time
+
+from twisted.internet import defer
+
+from tron.utils.timerqueue import timer_queue
+
+log = logging.getLogger(__name__)
+
+# Number of removed jobs and job runs to remember
+MAX_REMOVED = 10000
+
+
+class ChangeLog:
+    JOB = "job"
+    JOB_RUN = "job_run"
+    ACTION_RUN = "action_run"
+
+    def __init__(self):
+        # Versions start from the time in microseconds, so they keep
+        # increasing across restarts and clients of a previous trond reset
+        self.version = int(time.time() * 1_000_000)
+        self.min_version = self.version
+        # key -> (version, removed), ordered by version
+        self.entries = collections.OrderedDict()
+        self.removed_count = 0
+        self.lock = threading.Lock()
+        self.waiters = []
+        self._wake_call = None
+
+    def _record(self, key, removed=False):
+        with self.lock:
+            self.version += 1
+            previous = self.entries.pop(key, None)
+            if previous and previous[1]:
+                self.removed_count -= 1
+            self.entries[key] = (self.version, removed)
+            if removed:
+                self.removed_count += 1
+                self._prune_removed()
+        self._schedule_wake()
+
+    def _prune_removed(self):
+        while self.removed_count > MAX_REMOVED:
+            for key, (version, removed) in self.entries.items():
+                if removed:
+                    del self.entries[key]
+                    self.removed_count -= 1
+                    # Changes since before this one can no longer be listed
+                    self.min_version = max(self.min_version, version)
+                    break
+
+    def record_job(self, job):
+        self._record((self.JOB, job.get_name()))
+
+    def record_job_run(self, job_run):
+        self._record((self.JOB_RUN, job_run.job_name, job_run.run_num))
+
+    def record_action_run(self, job_run, action_run):
+        self._record((self.ACTION_RUN, job_run.job_name, job_run.run_num, action_run.action_name))
+
+    def record_job_run_removed(self, job_run):
+        with self.lock:
+            for action_run in job_run.action_runs:
+                self.entries.pop((self.ACTION_RUN, job_run.job_name, job_run.run_num, action_run.action_name), None)
+        self._record((self.JOB_RUN, job_run.job_name, job_run.run_num), removed=True)
+
+    def record_job_removed(self, job_name):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] != self.JOB and key[1] == job_name]:
+                del self.entries[key]
+        self._record((self.JOB, job_name), removed=True)
+
+    def is_valid(self, since):
+        """Return True if the changes since a version can be listed."""
+        return self.min_version <= since <= self.version
+
+    def has_changes(self, since):
+        return self.version > since
+
+    def get_changes(self, since):
+        """Return (version, changes) where changes is a list of (key, removed)
+        for every object changed after `since`, oldest first.
+        """
+        with self.lock:
+            changes = []
+            for key, (version, removed) in reversed(self.entries.items()):
+                if version <= since:
+                    break
+                changes.append((key, removed))
+            changes.reverse()
+            return self.version, changes
+
+    def wait(self, timeout):
+        """Return a Deferred which fires with True once something changes, or
+        with False after timeout seconds.
+        """
+        d = defer.Deferred(canceller=self._cancel_waiter)
+        timeout_call = timer_queue.call_later(timeout, self._timeout_waiter, d)
+        self.waiters.append((d, timeout_call))
+        return d
+
+    def _timeout_waiter(self, d):
+        self.waiters = [(waiter, call) for waiter, call in self.waiters if waiter is not d]
+        d.callback(False)
+
+    def _cancel_waiter(self, d):
+        for waiter, timeout_call in self.waiters:
+            if waiter is d:
+                timeout_call.cancel()
+        self.waiters = [(waiter, call) for waiter, call in self.waiters if waiter is not d]
+
+    def _schedule_wake(self):
+        # Wake waiters once for all the changes made in the same reactor tick
+        if self._wake_call is None and self.waiters:
+            self._wake_call = timer_queue.call_later(0, self._wake)
+
+    def _wake(self):
+        self._wake_call = None
+        waiters, self.waiters = self.waiters, []
+        for d, timeout_call in waiters:
+            timeout_call.cancel()
+            d.callback(True)
+
+
+change_log = ChangeLog()
@@ -0,0 +1,241 @@
+"""
+Global limits on how many ActionRuns may be running at once, per namespace,
+per Kubernetes pool and per executor.
+
+ActionRuns which would exceed a limit wait instead of starting. When a slot
+frees up, waiting runs are started in weighted fair order across namespaces:
+the namespace using the smallest share of its weight goes first, so one
+namespace's backfill can't hold every slot while others wait. Within a
+namespace runs start in the order they arrived.
+"""
+import collections
+import logging
+
+import tron.prom_metrics as prom_metrics
+from tron.utils import timeutils
+from tron.utils.timerqueue import timer_queue
+
+log = logging.getLogger(__name__)
+
+# The node selector which Kubernetes actions use to pick a pool
+POOL_NODE_SELECTOR = "yelp.com/pool"
+
+
+def get_namespace(action_run):
+    return action_run.job_run_id.split(".")[0]
+
+
+def get_pool(action_run):
+    node_selectors = getattr(action_run.command_config, "node_selectors", None) or {}
+    return node_selectors.get(POOL_NODE_SELECTOR)
+
+
+def get_scopes(action_run):
+    """Return the (scope, key) pairs an ActionRun is counted against."""
+    scopes = [("namespace", get_namespace(action_run))]
+    pool = get_pool(action_run)
+    if pool:
+        scopes.append(("pool", pool))
+    if action_run.executor:
+        scopes.append(("executor", action_run.executor))
+    return scopes
+
+
+class ConcurrencyLimiter:
+    """Tracks running ActionRuns against the configured limits and queues
+    the ones which would exceed them.
+
+    Waiting runs are indexed by id, and queued per namespace by the scopes
+    they're counted against, so finding the next run to start only looks at
+    the first run of each queue. Runs which stop waiting are removed from the
+    index, and from the queues the next time they reach the front.
+    """
+
+    def __init__(self):
+        self.limits = {}
+        self.weights = {}
+        # (scope, key) -> number of running ActionRuns
+        self.running = collections.Counter()
+        # ActionRun id -> scopes the run holds a slot in
+        self.holders = {}
+        # ActionRun id -> (ActionRun, scopes, time it started waiting)
+        self.waiting_runs = {}
+        # namespace -> scopes -> deque of entries of waiting_runs, oldest first
+        self.waiting = collections.defaultdict(dict)
+        # namespace -> number of waiting ActionRuns
+        self.num_waiting = collections.Counter()
+        self._dispatch_call = None
+
+    def configure(self, concurrency_limits):
+        self.limits = {}
+        self.weights = {}
+        if concurrency_limits:
+            for scope, limits in (
+                ("namespace", concurrency_limits.namespaces),
+                ("pool", concurrency_limits.pools),
+                ("executor", concurrency_limits.executors),
+            ):
+                for key, limit in limits.items():
+                    self.limits[(scope, key)] = limit
+            self.weights = dict(concurrency_limits.weights)
+        # Limits may have been raised or removed
+        self._schedule_dispatch()
+
+    def _fits(self, scopes):
+        return all(self.running[scope] < self.limits.get(scope, float("inf")) for scope in scopes)
+
+    def _acquire(self, action_run, scopes):
+        self.holders[action_run.id] = scopes
+        for scope in scopes:
+            self.running[scope] += 1
+            prom_metrics.tron_concurrency_running_gauge.labels(*scope).set(self.running[scope])
+
+    def try_acquire(self, action_run):
+        """Return True if the ActionRun may start now, and count it as
+        running. Otherwise queue it to be started once there is room.
+        """
+        if action_run.id in self.holders:
+            return True
+
+        scopes = tuple(get_scopes(action_run))
+        namespace = get_namespace(action_run)
+        if not self.num_waiting[namespace] and self._fits(scopes):
+            self._acquire(action_run, scopes)
+            return True
+
+        if not self.is_waiting(action_run):
+            log.info(f"{action_run} waiting for a concurrency slot")
+            entry = (action_run, scopes, timeutils.current_timestamp())
+            self.waiting_runs[action_run.id] = entry
+            self.waiting[namespace].setdefault(scopes, collections.deque()).append(entry)
+            self._set_num_waiting(namespace, 1)
+            # It may fit even though runs ahead of it in its namespace don't
+            self._schedule_dispatch()
+        return False
+
+    def restore(self, action_run):
+        """Count an ActionRun restored from state, which may still be running,
+        as holding its slots.
+        """
+        if action_run.id not in self.holders:
+            self._acquire(action_run, tuple(get_scopes(action_run)))
+
+    def is_waiting(self, action_run):
+        entry = self.waiting_runs.get(action_run.id)
+        return entry is not None and entry[0] is action_run
+
+    def release(self, action_run):
+        """Free the slots held by an ActionRun, or stop it waiting for one."""
+        scopes = self.holders.pop(action_run.id, None)
+        if scopes is None:
+            if self.is_waiting(action_run):
+                self._remove_waiting(action_run)
+            return
+
+        for scope in scopes:
+            self.running[scope] -= 1
+            prom_metrics.tron_concurrency_running_gauge.labels(*scope).set(self.running[scope])
+        self._schedule_dispatch()
+
+    def _remove_waiting(self, action_run):
+        # Left in its queue until it reaches the front
+        del self.waiting_runs[action_run.id]
+        self._set_num_waiting(get_namespace(action_run), -1)
+
+    def _set_num_waiting(self, namespace, change):
+        self.num_waiting[namespace] += change
+        prom_metrics.tron_concurrency_waiting_gauge.labels(namespace).set(self.num_waiting[namespace])
+        if not self.num_waiting[namespace]:
+            del self.num_waiting[namespace]
+            self.waiting.pop(namespace, None)
+
+    def get_queue_depths(self):
+        return dict(self.num_waiting)
+
+    def _schedule_dispatch(self):
+        # Start waiting runs from the reactor rather than from inside the
+        # state transition of the run which released the slot
+        if self._dispatch_call is None and self.waiting_runs:
+            self._dispatch_call = timer_queue.call_later(0, self.dispatch)
+
+    def _namespace_share(self, namespace):
+        return self.running[("namespace", namespace)] / self.weights.get(namespace, 1)
+
+    def _get_head(self, queue):
+        """Return the first entry of a queue which is still waiting and may
+        start, dropping the ones before it.
+        """
+        while queue:
+            entry = queue[0]
+            action_run = entry[0]
+            if self.waiting_runs.get(action_run.id) is entry:
+                if action_run.machine.check("start"):
+                    return entry
+                # No longer startable, e.g. cancelled while waiting
+                self._remove_waiting(action_run)
+            queue.popleft()
+        return None
+
+    def _get_heads(self, namespace):
+        """Return the first waiting entry of each queue of a namespace,
+        oldest first.
+        """
+        queues = self.waiting.get(namespace, {})
+        heads = []
+        for scopes, queue in list(queues.items()):
+            head = self._get_head(queue)
+            if head is None:
+                del queues[scopes]
+            else:
+                heads.append(head)
+        return sorted(heads, key=lambda entry: entry[2])
+
+    def _pop_next(self):
+        """Remove and return the next waiting run which fits the limits,
+        taking namespaces in order of the share of their weight in use.
+        """
+        heads = {namespace: self._get_heads(namespace) for namespace in list(self.waiting)}
+        namespaces = sorted(
+            (namespace for namespace, entries in heads.items() if entries),
+            key=lambda namespace: (self._namespace_share(namespace), heads[namespace][0][2]),
+        )
+        for namespace in namespaces:
+            for entry in heads[namespace]:
+                action_run, scopes, enqueued_at = entry
+                if self._fits(scopes):
+                    self.waiting[namespace][scopes].popleft()
+                    self._remove_waiting(action_run)
+                    return action_run, scopes, enqueued_at
+        return None
+
+    def dispatch(self):
+        """Start as many waiting runs as the limits allow."""
+        self._dispatch_call = None
+        while True:
+            next_run = self._pop_next()
+            if next_run is None:
+                return
+
+            action_run, scopes, enqueued_at = next_run
+            wait = timeutils.current_timestamp() - enqueued_at
+            prom_metrics.tron_concurrency_wait_seconds_histogram.labels(get_namespace(action_run)).observe(wait)
+            log.info(f"{action_run} got a concurrency slot after waiting {wait:.1f}s")
+            self._acquire(action_run, scopes)
+            try:
+                action_run.start()
+            except Exception:
+                log.exception(f"Error starting {action_run}")
+                self.release(action_run)
+
+    def clear(self):
+        self.running.clear()
+        self.holders.clear()
+        self.waiting_runs.clear()
+        self.waiting.clear()
+        self.num_waiting.clear()
+        if self._dispatch_call is not None:
+            self._dispatch_call.cancel()
+            self._dispatch_call = None
+
+
+concurrency_limiter = ConcurrencyLimiter()
@@ -71,6 +71,7 @@ class Job(Observable, Observer, Persistable):
         "time_zone",
         "expected_runtime",
         "run_limit",
+        "priority",
     ]
 
     def __init__(
@@ -92,6 +93,7 @@ class Job(Observable, Observer, Persistable):
         time_zone: datetime.tzinfo | None = None,
         expected_runtime: datetime.timedelta | None = None,
         run_limit: int | None = None,
+        priority: int = 0,
     ):
         super().__init__()
         self.name = maybe_decode(
@@ -118,6 +120,7 @@ class Job(Observable, Observer, Persistable):
         self.output_path.append(name.split(".")[-1])  # job-name
         self.context = command_context.build_context(self, parent_context)
         self.run_limit = run_limit
+        self.priority = priority
         log.info(f"{self} created")
 
     @staticmethod
@@ -176,6 +179,7 @@ class Job(Observable, Observer, Persistable):
             max_runtime=job_config.max_runtime,
             expected_runtime=job_config.expected_runtime,
             run_limit=job_config.run_limit,
+            priority=job_config.priority,
         )
 
     def watch(self, observable, event=True):
@@ -190,19 +194,27 @@ class Job(Observable, Observer, Persistable):
         actually takes an already constructed job and copies out its
         configuration data.
         """
+        previous_graph = self.action_graph
         for attr in self.equality_attributes:
             setattr(self, attr, getattr(job, attr))
+        if self.action_graph == previous_graph:
+            # Keep the graph the runs were built from, so they're known to be
+            # up to date
+            self.action_graph = previous_graph
 
-        self.update_action_config()
+        self.update_action_config(previous_graph)
 
         # the run_limit is a property on the JobRunCollection, not on the
         # Job itself so we need to handle that separately
         self.runs.run_limit = job.run_limit
         log.info(f"{self} reconfigured")
 
-    def update_action_config(self):
+    def update_action_config(self, previous_graph=None):
+        changed_actions = None
+        if previous_graph is not None and self.action_graph is not None and previous_graph is not self.action_graph:
+            changed_actions = self.action_graph.get_changed_actions(previous_graph)
         for job_run in self.runs:
-            job_run.update_action_config(self.action_graph)
+            job_run.update_action_config(self.action_graph, previous_graph, changed_actions)
 
     @property
     def status(self):
@@ -22,9 +22,17 @@ class JobCollection:
             ],
         )
 
-    def update_from_config(self, job_configs, factory, reconfigure, namespace_to_reconfigure=None):
+    def update_from_config(
+        self,
+        job_configs,
+        factory,
+        reconfigure,
+        namespace_to_reconfigure=None,
+        job_names_to_reconfigure=None,
+    ):
         """Apply a configuration to this collection and return a generator of
-        jobs which were added.
+        jobs which were added. When reconfiguring, job_names_to_reconfigure
+        (if given) limits the jobs rebuilt further than the namespace does.
         """
         self.jobs.filter_by_name(job_configs)
 
@@ -35,7 +43,11 @@ class JobCollection:
                     job_scheduler.schedule()
 
         def reconfigure_filter(config):
-            if not reconfigure or not namespace_to_reconfigure:
+            if not reconfigure:
+                return True
+            if job_names_to_reconfigure is not None:
+                return config.name in job_names_to_reconfigure
+            if not namespace_to_reconfigure:
                 return True
             else:
                 return config.namespace == namespace_to_reconfigure
@@ -10,18 +10,21 @@ from tron.scheduler import scheduler_from_config
 from tron.serialize import filehandler
 from tron.utils import timeutils
 from tron.utils.observer import Observer
+from tron.utils.timerqueue import timer_queue
+from tron.utils.timerqueue import TimerCall
 
 log = logging.getLogger(__name__)
 
 
 class JobScheduler(Observer):
     """A JobScheduler is responsible for scheduling Jobs and running JobRuns
-    based on a Jobs configuration. Runs jobs by setting a callback to fire
-    x seconds into the future.
+    based on a Jobs configuration. Runs jobs by setting a callback on the
+    shared timer queue to fire x seconds into the future.
     """
 
     def __init__(self, job: Job):
         self.job = job
+        self.run_callbacks: dict[str, TimerCall] = {}
         self.watch(job)
 
     def restore_state(self, job_state_data, config_action_runner):
@@ -39,6 +42,9 @@ class JobScheduler(Observer):
             master_action_runner=config_action_runner,
         )
 
+        for job_run in job_runs:
+            job_run.resume()
+
         scheduled = self.job.runs.get_scheduled()
         # for those that were already scheduled, we reschedule them to run.
         for job_run in scheduled:
@@ -70,6 +76,8 @@ class JobScheduler(Observer):
     def disable(self):
         """Disable the job and cancel and pending scheduled jobs."""
         self.job.enabled = False
+        self.job.notify(Job.NOTIFY_STATE_CHANGE)
+        self._cancel_callbacks()
         self.job.runs.cancel_pending()
 
     def manual_start(self, run_time=None):
@@ -91,6 +99,7 @@ class JobScheduler(Observer):
             log.warning(f"{self.job} has {len(pending_run_times)} pending runs, not 1")
         next_run_time = None if len(pending_run_times) == 0 else pending_run_times[0]
 
+        self._cancel_callbacks()
         self.job.runs.remove_pending()
         self.create_and_schedule_runs(next_run_time=next_run_time)
 
@@ -129,13 +138,21 @@ class JobScheduler(Observer):
         seconds = job_run.seconds_until_run_time()
         human_time = humanize.naturaltime(seconds, future=True)
         log.info(f"Scheduling {job_run} {human_time} ({seconds} seconds)")
-        reactor.callLater(seconds, self.run_job, job_run)
+        self.run_callbacks[job_run.id] = timer_queue.call_later(seconds, self.run_job, job_run)
+
+    def _cancel_callbacks(self):
+        """Cancel the callbacks of all scheduled JobRuns."""
+        for callback in self.run_callbacks.values():
+            callback.cancel()
+        self.run_callbacks.clear()
 
     # TODO: new class for this method
     def run_job(self, job_run, run_queued=False):
         """Triggered by a callback to actually start the JobRun. Also
         schedules the next JobRun.
         """
+        self.run_callbacks.pop(job_run.id, None)
+
         # If the Job has been disabled after this run was scheduled, then cancel
         # the JobRun and do not schedule another
         if not self.job.enabled:
@@ -170,7 +187,7 @@ class JobScheduler(Observer):
     def schedule_termination(self, job_run):
         if self.job.max_runtime:
             seconds = timeutils.delta_total_seconds(self.job.max_runtime)
-            reactor.callLater(seconds, job_run.stop)
+            timer_queue.call_later(seconds, job_run.stop)
 
     def _queue_or_cancel_active(self, job_run):
         if self.job.queueing:
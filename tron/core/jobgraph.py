@@ -1,13 +1,153 @@
+import re
 from collections import defaultdict
 from collections import namedtuple
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
 from typing import DefaultDict
 
 from tron.config.config_parse import ConfigContainer
+from tron.config.schema import ConfigJob
 from tron.core.action import Action
+from tron.core.action import get_trigger_templates
 from tron.core.actiongraph import ActionGraph
 from tron.utils import maybe_decode
 
 AdjListEntry = namedtuple("AdjListEntry", ["action_name", "is_trigger"])
+# `downstream` waits on the `event` template, which `upstream` publishes if
+# `published`
+TriggerEdge = namedtuple("TriggerEdge", ["upstream", "downstream", "event", "published"])
+# Action name -> the (action, next action) trigger edges reachable from it
+TriggerClosures = dict[str, frozenset[tuple[str, str]]]
+
+
+def validate_dependencies(job_configs: Mapping[str, ConfigJob]) -> None:
+    """Raise a ValueError if any action depends on an action which doesn't
+    exist.
+    """
+    all_actions = {
+        f"{job_name}.{action_name}"
+        for job_name, job_config in job_configs.items()
+        for action_name in job_config.actions
+    }
+    missing_dependent_actions = defaultdict(list)
+    for job_name, job_config in job_configs.items():
+        for action_name, action_config in job_config.actions.items():
+            dependencies = [f"{job_name}.{required_action}" for required_action in action_config.requires or []]
+            dependencies += [get_trigger_action_name(trigger) for trigger in action_config.triggered_by or []]
+            for dependency in dependencies:
+                if dependency not in all_actions:
+                    missing_dependent_actions[dependency].append(f"{job_name}.{action_name}")
+
+    error_messages = []
+    for action_name, child_action_names in missing_dependent_actions.items():
+        error_messages.append(
+            "Action {} is dependency of actions:\n{}".format(
+                action_name,
+                "\n".join(
+                    [f"  - {child_action_name}" for child_action_name in child_action_names],
+                ),
+            ),
+        )
+
+    if error_messages:
+        raise ValueError(
+            (
+                "The following actions are dependencies of other actions but missing:\n"
+                "{}\n"
+                "Please check if you have deleted/renamed any of them or their containing jobs."
+            ).format(
+                "\n".join(error_messages),
+            ),
+        )
+
+
+def get_trigger_action_name(trigger: str) -> str:
+    """Return the name of the action which publishes a trigger."""
+    return ".".join(trigger.split(".")[:3])
+
+
+def _event_matches(template: str, event: str) -> bool:
+    """Return True if an event is the template, or the template rendered for
+    a run.
+    """
+    if template == event:
+        return True
+    pattern = ".+".join(re.escape(part) for part in re.split(r"\{[^}]*\}", template))
+    return re.fullmatch(pattern, event) is not None
+
+
+def _find_components(names: Iterable[str], get_successors: Callable[[str], Iterable[str]]) -> list[list[str]]:
+    """Return the strongly connected components of a graph (Tarjan's
+    algorithm, without recursion), each after every component it reaches.
+    """
+    indexes: dict[str, int] = {}
+    lowlinks: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components = []
+
+    def visit(name):
+        indexes[name] = lowlinks[name] = len(indexes)
+        stack.append(name)
+        on_stack.add(name)
+        return name, iter(get_successors(name))
+
+    for root in names:
+        if root in indexes:
+            continue
+        work = [visit(root)]
+        while work:
+            name, successors = work[-1]
+            for successor in successors:
+                if successor not in indexes:
+                    work.append(visit(successor))
+                    break
+                if successor in on_stack:
+                    lowlinks[name] = min(lowlinks[name], indexes[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[name])
+                if lowlinks[name] == indexes[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+    return components
+
+
+def _get_closures(components: list[list[str]], successors: Mapping[str, list[str]]) -> TriggerClosures:
+    """Return the edges reachable from each name, given the components of
+    the graph with every component after the ones it reaches.
+    """
+    component_indexes: dict[str, int] = {}
+    component_closures: list[frozenset[tuple[str, str]]] = []
+    closures: TriggerClosures = {}
+    for index, component in enumerate(components):
+        for name in component:
+            component_indexes[name] = index
+
+        edges = set()
+        reached = set()
+        for name in component:
+            for successor in successors.get(name, ()):
+                edges.add((name, successor))
+                reached.add(component_indexes[successor])
+        reached.discard(index)
+        for reached_index in reached:
+            edges |= component_closures[reached_index]
+
+        closure = frozenset(edges)
+        component_closures.append(closure)
+        for name in component:
+            closures[name] = closure
+    return closures
 
 
 class JobGraph:
@@ -23,77 +163,210 @@ class JobGraph:
         self._actions_for_job: DefaultDict[str, list[str]] = defaultdict(list)
         self._adj_list: DefaultDict[str, list[AdjListEntry]] = defaultdict(list)
         self._rev_adj_list: DefaultDict[str, list[AdjListEntry]] = defaultdict(list)
+        self._job_configs: dict[str, ConfigJob] = {}
+        # Action name -> the templates of the triggers it waits on
+        self._triggered_by: dict[str, list[str]] = {}
+        # Built when first asked for, and dropped when a reconfigure changes
+        # them
+        self._action_graphs: dict[str, ActionGraph] = {}
+        self._trigger_closures: tuple[TriggerClosures, TriggerClosures] | None = None
 
-        all_actions = set()
-        for job_name, job_config in config_container.get_jobs().items():
-            for action_name, action_config in job_config.actions.items():
-                full_name = self._save_action(action_name, job_name, action_config)
-                all_actions.add(full_name)
+        job_configs = config_container.get_jobs()
+        for job_name, job_config in job_configs.items():
+            self._add_job(job_name, job_config)
 
-                for required_action in action_config.requires or []:
-                    required_action_name = f"{job_name}.{required_action}"
-                    self._rev_adj_list[full_name].append(AdjListEntry(required_action_name, False))
+        if should_validate_missing_dependency:
+            validate_dependencies(job_configs)
 
-                for trigger in action_config.triggered_by or []:
-                    trigger_action_name = ".".join(trigger.split(".")[:3])
-                    self._rev_adj_list[full_name].append(AdjListEntry(trigger_action_name, True))
+    def _add_job(self, job_name, job_config):
+        self._job_configs[job_name] = job_config
+        for action_name, action_config in job_config.actions.items():
+            full_name = self._save_action(action_name, job_name, action_config)
 
-                for parent_action, is_trigger in self._rev_adj_list[full_name]:
-                    self._adj_list[parent_action].append(AdjListEntry(full_name, is_trigger))
+            for required_action in action_config.requires or []:
+                required_action_name = f"{job_name}.{required_action}"
+                self._rev_adj_list[full_name].append(AdjListEntry(required_action_name, False))
 
-            cleanup_action_config = job_config.cleanup_action
-            if cleanup_action_config:
-                self._save_action(cleanup_action_config.name, job_name, cleanup_action_config)
+            if action_config.triggered_by:
+                self._triggered_by[full_name] = list(action_config.triggered_by)
+            for trigger in action_config.triggered_by or []:
+                trigger_action_name = get_trigger_action_name(trigger)
+                self._rev_adj_list[full_name].append(AdjListEntry(trigger_action_name, True))
 
-        if should_validate_missing_dependency:
-            missing_dependent_actions = defaultdict(list)
-            for action_name in self._rev_adj_list:
-                for dependent_action_entry in self._rev_adj_list[action_name]:
-                    if dependent_action_entry.action_name not in all_actions:
-                        missing_dependent_actions[dependent_action_entry.action_name].append(action_name)
-
-            error_messages = []
-            for action_name, child_action_names in missing_dependent_actions.items():
-                error_messages.append(
-                    "Action {} is dependency of actions:\n{}".format(
-                        action_name,
-                        "\n".join(
-                            [f"  - {child_action_name}" for child_action_name in child_action_names],
-                        ),
-                    ),
-                )
-
-            if error_messages:
-                raise ValueError(
-                    (
-                        "The following actions are dependencies of other actions but missing:\n"
-                        "{}\n"
-                        "Please check if you have deleted/renamed any of them or their containing jobs."
-                    ).format(
-                        "\n".join(error_messages),
-                    ),
-                )
+            for parent_action, is_trigger in self._rev_adj_list[full_name]:
+                self._adj_list[parent_action].append(AdjListEntry(full_name, is_trigger))
+
+        cleanup_action_config = job_config.cleanup_action
+        if cleanup_action_config:
+            self._save_action(cleanup_action_config.name, job_name, cleanup_action_config)
+
+    def _remove_job(self, job_name):
+        del self._job_configs[job_name]
+        for full_name in self._actions_for_job.pop(job_name, []):
+            del self.action_map[full_name]
+            self._triggered_by.pop(full_name, None)
+            # Edges from the actions this one depends on go, but edges to the
+            # actions which depend on it stay, as they're part of their jobs
+            for parent_action, _ in self._rev_adj_list.pop(full_name, []):
+                self._adj_list[parent_action] = [
+                    entry for entry in self._adj_list[parent_action] if entry.action_name != full_name
+                ]
+
+    def update_namespace(self, config_container: ConfigContainer, namespace: str) -> set[str]:
+        """Replace the jobs of a namespace with those in config_container,
+        rebuilding only the jobs whose config changed. Return the names of the
+        jobs whose action graphs may have changed: those jobs, and the jobs
+        connected to them by triggers.
+        """
+        new_configs = {
+            job_name: job_config
+            for job_name, job_config in config_container.get_jobs().items()
+            if job_config.namespace == namespace
+        }
+        old_names = {
+            job_name for job_name, job_config in self._job_configs.items() if job_config.namespace == namespace
+        }
+        changed = {
+            job_name
+            for job_name in old_names | new_configs.keys()
+            if self._job_configs.get(job_name) != new_configs.get(job_name)
+        }
+
+        # Triggers both before and after the change count
+        affected = self._get_trigger_connected_jobs(changed)
+        for job_name in changed:
+            if job_name in self._job_configs:
+                self._remove_job(job_name)
+            if job_name in new_configs:
+                self._add_job(job_name, new_configs[job_name])
+        affected |= self._get_trigger_connected_jobs(changed)
+
+        if changed:
+            self._trigger_closures = None
+        for job_name in affected:
+            self._action_graphs.pop(job_name, None)
+        return affected
+
+    def _get_trigger_connected_jobs(self, job_names: set[str]) -> set[str]:
+        stack = [action_name for job_name in job_names for action_name in self._actions_for_job.get(job_name, [])]
+        visited = set(stack)
+        while stack:
+            current_action = stack.pop()
+            for adj_list in (self._adj_list, self._rev_adj_list):
+                for next_action, is_trigger in adj_list.get(current_action, []):
+                    if is_trigger and next_action not in visited:
+                        visited.add(next_action)
+                        stack.append(next_action)
+        return set(job_names) | {action_name.rsplit(".", 1)[0] for action_name in visited}
 
     def get_action_graph_for_job(self, job_name):
-        """Traverse the JobGraph for a specific job to construct an ActionGraph for it"""
+        """Return the ActionGraph of a job, built once and then reused until a
+        reconfigure changes it.
+        """
+        action_graph = self._action_graphs.get(job_name)
+        if action_graph is None:
+            action_graph = self._action_graphs[job_name] = self._build_action_graph(job_name)
+        return action_graph
+
+    def _build_action_graph(self, job_name):
         job_action_map = {}
         required_actions, required_triggers = defaultdict(set), defaultdict(set)
+        up_closures, down_closures = self._get_trigger_closures()
 
-        for action_name in self._actions_for_job[job_name]:
+        for action_name in self._actions_for_job.get(job_name, []):
             # Any actions that belong to _this job_ are not prefixed by the job name
             short_action_name = action_name.split(".")[-1]
             job_action_map[short_action_name] = self.action_map[action_name]
             required_actions[short_action_name] = {
-                entry.action_name.split(".")[-1] for entry in self._rev_adj_list[action_name] if not entry.is_trigger
+                entry.action_name.split(".")[-1]
+                for entry in self._rev_adj_list.get(action_name, [])
+                if not entry.is_trigger
             }
 
-            # We call this twice to build the complete DAG for the job; the first time
-            # we search the forward adjacency list and the second time we search the
-            # reverse adjancency list.  This ensures we don't miss any triggers
-            required_triggers = self._get_required_triggers(action_name, required_triggers)
-            required_triggers = self._get_required_triggers(action_name, required_triggers, search_up=False)
+            # The triggers the action waits on, however indirectly, and the
+            # triggers which wait on it, so the job's DAG is complete
+            for current_action, trigger in up_closures.get(action_name, ()):
+                if current_action == action_name:
+                    current_action = short_action_name
+                required_triggers[current_action].add(trigger)
+            for current_action, downstream in down_closures.get(action_name, ()):
+                if current_action == action_name:
+                    current_action = short_action_name
+                required_triggers[downstream].add(current_action)
         return ActionGraph(job_action_map, required_actions, required_triggers)
 
+    def _get_trigger_closures(self) -> tuple[TriggerClosures, TriggerClosures]:
+        """Return, for every action with triggers, the trigger edges reachable
+        from it upstream and downstream, as (action, trigger) pairs.
+
+        Actions in a trigger cycle reach the same edges, so closures are
+        computed once per strongly connected component, in topological order,
+        with each one built from the closures of the components it reaches.
+        """
+        if self._trigger_closures is not None:
+            return self._trigger_closures
+
+        triggers = {
+            action_name: [entry.action_name for entry in entries if entry.is_trigger]
+            for action_name, entries in self._rev_adj_list.items()
+        }
+        downstreams: DefaultDict[str, list[str]] = defaultdict(list)
+        for action_name, action_triggers in triggers.items():
+            for trigger in action_triggers:
+                downstreams[trigger].append(action_name)
+
+        # Components reachable upstream come before the ones which reach them
+        components = _find_components(list(triggers) + list(downstreams), lambda name: triggers.get(name, ()))
+        up_closures = _get_closures(components, triggers)
+        down_closures = _get_closures(components[::-1], downstreams)
+        self._trigger_closures = up_closures, down_closures
+        return self._trigger_closures
+
+    def get_trigger_edges(self, action_name: str, downstream: bool = False) -> list[TriggerEdge]:
+        """Return the trigger edges an action waits on, however indirectly,
+        or with `downstream`, the edges of the actions which wait on it.
+        """
+        up_closures, down_closures = self._get_trigger_closures()
+        if downstream:
+            pairs = down_closures.get(action_name, frozenset())
+        else:
+            pairs = frozenset((upstream, current) for current, upstream in up_closures.get(action_name, ()))
+        return sorted(
+            {
+                self._build_trigger_edge(upstream, waiting_action, event)
+                for upstream, waiting_action in pairs
+                for event in self._triggered_by.get(waiting_action, [])
+                if get_trigger_action_name(event) == upstream
+            }
+        )
+
+    def get_event_waiters(self, event: str) -> list[TriggerEdge]:
+        """Return the trigger edges of the actions which wait on an event,
+        given as a template or as rendered for a run.
+        """
+        upstream = get_trigger_action_name(event)
+        return sorted(
+            {
+                self._build_trigger_edge(upstream, entry.action_name, template)
+                for entry in self._adj_list.get(upstream, [])
+                if entry.is_trigger
+                for template in self._triggered_by.get(entry.action_name, [])
+                if get_trigger_action_name(template) == upstream and _event_matches(template, event)
+            }
+        )
+
+    def get_published_triggers(self, action_name: str) -> list[str]:
+        """Return the templates of the triggers an action publishes when it
+        succeeds.
+        """
+        action = self.action_map.get(action_name)
+        if action is None:
+            return []
+        return [f"{action_name}.{template}" for template in get_trigger_templates(action.trigger_downstreams)]
+
+    def _build_trigger_edge(self, upstream, downstream, event):
+        return TriggerEdge(upstream, downstream, event, event in self.get_published_triggers(upstream))
+
     def _save_action(self, action_name, job_name, config):
         action_name = maybe_decode(
             action_name
@@ -102,30 +375,3 @@ class JobGraph:
         self.action_map[full_name] = Action.from_config(config)
         self._actions_for_job[job_name].append(full_name)
         return full_name
-
-    def _get_required_triggers(self, action_name, triggers, search_up=True):
-        stack = [action_name]
-        visited = set()
-
-        # Do DFS to search the adjacency list and find all of the required triggers
-        # for a particular action
-        while stack:
-            current_action = stack.pop()
-            visited.add(current_action)
-            adj_list = self._rev_adj_list if search_up else self._adj_list
-            for next_action, is_trigger in adj_list[current_action]:
-                if not is_trigger:
-                    continue
-
-                if next_action not in visited:
-                    stack.append(next_action)
-
-                if current_action == action_name:
-                    current_action = current_action.split(".")[-1]
-
-                if search_up:
-                    triggers[current_action].add(next_action)
-                else:
-                    triggers[next_action].add(current_action)
-
-        return triggers
@@ -63,6 +63,7 @@ class JobRun(Observable, Observer, Persistable):
         action_runs: ActionRunCollection | None = None,
         action_graph: ActionGraph | None = None,
         manual: bool | None = None,
+        priority: int = 0,
     ):
         super().__init__()
         self.job_name = maybe_decode(
@@ -76,7 +77,11 @@ class JobRun(Observable, Observer, Persistable):
         self.action_runs_proxy = None
         self._action_runs = None
         self.action_graph = action_graph
+        # The config_version of the ActionGraph the action runs' configs came
+        # from, or None if they were restored from state
+        self.action_config_version = None
         self.manual = manual
+        self.priority = priority
 
         if action_runs:
             self.action_runs = action_runs
@@ -165,6 +170,7 @@ class JobRun(Observable, Observer, Persistable):
             base_context=job.context,
             action_graph=job.action_graph,
             manual=manual,
+            priority=job.priority,
         )
 
         # We do this at creation to ensure each JobRun is counted once, regardless of when it actually executes.
@@ -175,6 +181,7 @@ class JobRun(Observable, Observer, Persistable):
             job.action_runner,
         )
         run.action_runs = action_runs
+        run.action_config_version = job.action_graph.config_version
         return run
 
     @classmethod
@@ -257,9 +264,19 @@ class JobRun(Observable, Observer, Persistable):
         _del_action_runs,
     )
 
-    def update_action_config(self, action_graph):
+    def update_action_config(self, action_graph, previous_graph=None, changed_actions=None):
+        """Update the configs of the action runs from action_graph. Nothing is
+        compared if they already came from it, and if they came from
+        previous_graph, only the changed_actions are updated.
+        """
         self.action_graph = action_graph
-        self.action_runs.update_action_config(action_graph)
+        if self.action_config_version == action_graph.config_version:
+            return
+        if previous_graph is not None and self.action_config_version == previous_graph.config_version:
+            self.action_runs.update_action_config(action_graph, changed_actions)
+        else:
+            self.action_runs.update_action_config(action_graph)
+        self.action_config_version = action_graph.config_version
 
     def seconds_until_run_time(self):
         run_time = self.run_time
@@ -281,6 +298,13 @@ class JobRun(Observable, Observer, Persistable):
             log.info(f"{self} started")
             return True
 
+    def resume(self):
+        """Start the action runs of a run restored from state which were
+        waiting to start (e.g., for a concurrency slot) when it was saved.
+        """
+        if self.action_runs.is_waiting:
+            self._start_action_runs()
+
     def stop(self):
         if self.action_runs.is_done:
             return
@@ -316,8 +340,10 @@ class JobRun(Observable, Observer, Persistable):
                 )
             return None
 
+        self.action_runs.update_run_state(action_run)
+
         # propagate all state changes (from action runs) up to state serializer
-        self.notify(self.NOTIFY_STATE_CHANGED)
+        self.notify(self.NOTIFY_STATE_CHANGED, event_data=action_run)
         self.log_state_update(
             state=action_run.state,
             action_name=action_run.name,
@@ -432,6 +458,8 @@ class JobRun(Observable, Observer, Persistable):
             return ActionRun.FAILED
         if self.action_runs.is_waiting and self.action_runs.is_blocked_on_trigger:
             return ActionRun.WAITING
+        if self.action_runs.is_waiting_for_slot:
+            return ActionRun.WAITING
         if self.action_runs.is_scheduled:
             return ActionRun.SCHEDULED
         if self.action_runs.is_queued:
@@ -0,0 +1,118 @@
+"""
+Compute every scheduled start of every job over a time horizon, for capacity
+planning. Run times are computed in bulk from the job schedulers without
+building any JobRuns, and starts are bucketed per minute together with the
+cpus and memory that the Kubernetes actions starting at that time request.
+"""
+import collections
+import datetime
+import logging
+
+import pytz
+
+from tron import scheduler
+from tron.core.actionrun import KUBERNETES_ACTIONRUN_EXECUTORS
+
+log = logging.getLogger(__name__)
+
+# Upper bound on the horizon that can be requested, in hours
+MAX_HORIZON_HOURS = 24 * 7
+
+
+def get_start_resources(action_graph):
+    """Return the (cpus, mem) requested by the Kubernetes actions which start
+    as soon as a run of the job starts, i.e. those without any dependencies.
+    """
+    cpus = mem = 0.0
+    for action in action_graph.action_map.values():
+        if action.executor not in KUBERNETES_ACTIONRUN_EXECUTORS:
+            continue
+        if action_graph.required_actions.get(action.name) or action_graph.required_triggers.get(action.name):
+            continue
+        cpus += action.command_config.cpus or 0
+        mem += action.command_config.mem or 0
+    return cpus, mem
+
+
+def to_local_naive(run_time):
+    """Convert a run time to a naive datetime in the local time zone, which
+    is how tron represents run times of jobs without a time zone.
+    """
+    if run_time.tzinfo is None:
+        return run_time
+    return run_time.astimezone().replace(tzinfo=None)
+
+
+def get_run_times(jobs, start_time, end_time):
+    """Return a list of the run times in (start_time, end_time] for each job.
+    start_time and end_time are naive local datetimes.
+    """
+    aware_start = start_time.astimezone(pytz.utc)
+    aware_end = end_time.astimezone(pytz.utc)
+
+    # Jobs without a time zone schedule in naive local time, the others
+    # need aware boundaries so they can be converted to the job's time zone.
+    naive = [i for i, job in enumerate(jobs) if not job.scheduler.time_zone]
+    aware = [i for i, job in enumerate(jobs) if job.scheduler.time_zone]
+    run_times = [None] * len(jobs)
+    for indices, start, end in ((naive, start_time, end_time), (aware, aware_start, aware_end)):
+        schedulers = [jobs[i].scheduler for i in indices]
+        for i, times in zip(indices, scheduler.get_run_times_until(schedulers, start, end)):
+            run_times[i] = [to_local_naive(run_time) for run_time in times]
+    return run_times
+
+
+def build_schedule_horizon(jobs, start_time, hours):
+    """Return every run time of every enabled job within `hours` of
+    start_time, along with per-minute histograms of starts and of the
+    resources those starts request.
+    """
+    start_time = start_time.replace(second=0, microsecond=0)
+    end_time = start_time + datetime.timedelta(hours=hours)
+    jobs = [job for job in jobs if job.enabled]
+
+    starts = collections.Counter()
+    cpus = collections.Counter()
+    mem = collections.Counter()
+    job_horizons = []
+    for job, run_times in zip(jobs, get_run_times(jobs, start_time, end_time)):
+        if not run_times:
+            continue
+
+        num_nodes = len(job.node_pool.nodes) if job.all_nodes and job.node_pool else 1
+        job_cpus, job_mem = get_start_resources(job.action_graph)
+        for run_time in run_times:
+            minute = run_time.replace(second=0, microsecond=0)
+            starts[minute] += num_nodes
+            cpus[minute] += job_cpus * num_nodes
+            mem[minute] += job_mem * num_nodes
+
+        job_horizons.append(
+            {
+                "name": job.get_name(),
+                "run_times": run_times,
+                "cpus": job_cpus,
+                "mem": job_mem,
+            }
+        )
+
+    minutes = [
+        {
+            "minute": minute,
+            "starts": starts[minute],
+            "cpus": cpus[minute],
+            "mem": mem[minute],
+        }
+        for minute in sorted(starts)
+    ]
+    log.debug(f"Computed schedule horizon of {hours}h for {len(jobs)} jobs")
+    return {
+        "start_time": start_time,
+        "end_time": end_time,
+        "jobs": job_horizons,
+        "minutes": minutes,
+        "total_starts": sum(starts.values()),
+        "peak_starts": max(starts.values(), default=0),
+        "peak_cpus": max(cpus.values(), default=0),
+        "peak_mem": max(mem.values(), default=0),
+    }
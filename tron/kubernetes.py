@@ -26,6 +26,7 @@ from tron.config.schema import ConfigTopologySpreadConstraints
 from tron.config.schema import ConfigVolume
 from tron.serialize.filehandler import OutputStreamSerializer
 from tron.utils import exitcode
+from tron.utils.admission import AdmissionQueue
 from tron.utils.queue import PyDeferredQueue
 
 if TYPE_CHECKING:
@@ -297,6 +298,8 @@ class KubernetesCluster:
         pod_launch_timeout: int | None = None,
         watcher_kubeconfig_paths: list[str] | None = None,
         non_retryable_exit_codes: list[int] | None = [],
+        submit_rate_limit: float | None = None,
+        submit_burst: int = 1,
     ):
         # general k8s config
         self.kubeconfig_path = kubeconfig_path
@@ -305,6 +308,11 @@ class KubernetesCluster:
         self.default_volumes: list[ConfigVolume] | None = default_volumes or []
         self.pod_launch_timeout = pod_launch_timeout or DEFAULT_POD_LAUNCH_TIMEOUT_S
         self.watcher_kubeconfig_paths = watcher_kubeconfig_paths or []
+        # smooths out bursts of submissions (e.g., many jobs scheduled at the top of the hour)
+        # so that they don't all hit the API server in the same reactor tick
+        self.admission = AdmissionQueue(f"k8s submissions for {kubeconfig_path}", submit_rate_limit, submit_burst)
+        # tasks waiting for admission, by Pod name, so that they can be killed before they're submitted
+        self.queued_tasks: dict[str, KubernetesTask] = {}
         # creating a task_proc executor has a couple steps:
         # * create a TaskProcessor
         # * load the desired plugin (in this case, the k8s one)
@@ -446,7 +454,14 @@ class KubernetesCluster:
     def kill(self, task_id: str) -> bool:
         """
         Instructs task_processing to stop running a given task given a Pod name.
+
+        Tasks still waiting to be submitted are failed without ever being submitted.
         """
+        queued_task = self.queued_tasks.pop(task_id, None)
+        if queued_task is not None:
+            queued_task.log.info("Killed while waiting for the submission rate limit, not submitting.")
+            queued_task.exited(1)
+            return True
         return self.runner.kill(task_id)  # type: ignore  # we need to add type annotation to task_proc
 
     def stop(self, fail_tasks: bool = False) -> None:
@@ -470,6 +485,11 @@ class KubernetesCluster:
                 # set the task status to unknown
                 task.exited(exit_status=None)
                 del self.tasks[key]
+            # tasks waiting for admission were never submitted, so they can't be recovered later
+            queued_tasks, self.queued_tasks = self.queued_tasks, {}
+            for task in queued_tasks.values():
+                task.log.info("Not starting task, Kubernetes cluster was stopped.")
+                task.exited(1)
 
     def set_enabled(self, is_enabled: bool) -> None:
         """
@@ -486,6 +506,9 @@ class KubernetesCluster:
     def configure_tasks(self, default_volumes: list[ConfigVolume] | None) -> None:
         self.default_volumes = default_volumes
 
+    def configure_admission(self, submit_rate_limit: float | None, submit_burst: int) -> None:
+        self.admission.configure(submit_rate_limit, submit_burst)
+
     def create_task(
         self,
         action_run_id: str,
@@ -581,9 +604,12 @@ class KubernetesCluster:
         elif self.deferred is None or self.deferred.called:
             self.handle_next_event()
 
-    def submit(self, task: KubernetesTask) -> None:
+    def submit(self, task: KubernetesTask, priority: int = 0) -> None:
         """
         Given a KubernetesTask, submit it to the configured Kubernetes cluster in order to attempt to run it.
+
+        Submissions are rate limited per cluster if submit_rate_limit is configured, in which case the task
+        may be submitted later, ahead of any waiting tasks with a lower priority.
         """
         # Submitting a task while k8s usage is disabled should fail the task so that
         # users know that they have to take action and re-run whatever was scheduled
@@ -593,6 +619,36 @@ class KubernetesCluster:
             task.exited(1)
             return
 
+        self.queued_tasks[task.get_kubernetes_id()] = task
+        self.admission.admit(self._submit_admitted, task, priority=priority)
+
+    def _submit_admitted(self, task: KubernetesTask, delay: float) -> None:
+        if self.queued_tasks.get(task.get_kubernetes_id()) is not task:
+            # killed (or failed by stop()) while waiting for admission
+            return
+        del self.queued_tasks[task.get_kubernetes_id()]
+
+        if not delay:
+            self._submit(task)
+            return
+
+        task.log.info(f"Submission was delayed by {delay:.1f}s by the submission rate limit")
+        prom_metrics.tron_k8s_submit_delay_seconds_histogram.observe(delay)
+        # we're no longer running inside of the ActionRun that submitted this task,
+        # so there's nobody else to fail the task if something goes wrong
+        try:
+            self._submit(task)
+        except Exception:
+            log.exception(f"Unable to submit task {task.get_kubernetes_id()}")
+            task.exited(1)
+
+    def _submit(self, task: KubernetesTask) -> None:
+        # k8s usage may have been disabled while this task was waiting to be submitted
+        if not self.enabled:
+            task.log.info("Not starting task, Kubernetes usage is disabled.")
+            task.exited(1)
+            return
+
         # it's possible that we're the first task submission following k8s going from
         # disabled -> enabled, so make sure everything is correctly setup
         self._check_connection()
@@ -646,6 +702,8 @@ class KubernetesClusterRepository:
     default_volumes: list[ConfigVolume] | None = None
     watcher_kubeconfig_paths: list[str] | None = None
     non_retryable_exit_codes: list[int] | None = None
+    submit_rate_limit: float | None = None
+    submit_burst: int = 1
 
     # metadata config
     clusters: dict[str, KubernetesCluster] = {}
@@ -673,6 +731,8 @@ class KubernetesClusterRepository:
                 default_volumes=cls.default_volumes,
                 watcher_kubeconfig_paths=cls.watcher_kubeconfig_paths,
                 non_retryable_exit_codes=cls.non_retryable_exit_codes,
+                submit_rate_limit=cls.submit_rate_limit,
+                submit_burst=cls.submit_burst,
             )
             cls.clusters[kubeconfig_path] = cluster
 
@@ -691,7 +751,10 @@ class KubernetesClusterRepository:
         cls.default_volumes = kubernetes_options.default_volumes
         cls.watcher_kubeconfig_paths = kubernetes_options.watcher_kubeconfig_paths
         cls.non_retryable_exit_codes = kubernetes_options.non_retryable_exit_codes
+        cls.submit_rate_limit = kubernetes_options.submit_rate_limit
+        cls.submit_burst = kubernetes_options.submit_burst or 1
 
         for cluster in cls.clusters.values():
             cluster.set_enabled(cls.kubernetes_enabled)
             cluster.configure_tasks(default_volumes=cls.default_volumes)
+            cluster.configure_admission(cls.submit_rate_limit, cls.submit_burst)
@@ -7,6 +7,8 @@ from tron import node
 from tron import prom_metrics
 from tron.config import manager
 from tron.config.schema import MASTER_NAMESPACE
+from tron.core.change_log import change_log
+from tron.core.concurrency import concurrency_limiter
 from tron.core.job import Job
 from tron.core.job_collection import JobCollection
 from tron.core.job_scheduler import JobSchedulerFactory
@@ -38,6 +40,7 @@ class MasterControlProgram:
         self.jobs = JobCollection()
         self.working_dir = working_dir
         self.config = manager.ConfigManager(config_path)
+        self.job_graph = None
         self.context = command_context.CommandContext()
         self.state_watcher = statemanager.StateChangeWatcher()
         self.boot_time = boot_time
@@ -129,6 +132,7 @@ class MasterControlProgram:
             ),
             (MesosClusterRepository.configure, "mesos_options"),
             (KubernetesClusterRepository.configure, "k8s_options"),
+            (concurrency_limiter.configure, "concurrency_limits"),
             (self.configure_eventbus, "eventbus_enabled"),
         ]
         master_config = config_container.get_master()
@@ -142,21 +146,33 @@ class MasterControlProgram:
             namespace_to_reconfigure = None
 
         # TODO: unify NOTIFY_STATE_CHANGE and simplify this
-        self.job_graph = JobGraph(config_container)
+        job_names_to_reconfigure = None
+        if reconfigure and namespace_to_reconfigure and self.job_graph is not None:
+            # Only the jobs of the namespace whose config changed, and the jobs
+            # connected to them by triggers, need rebuilding
+            job_names_to_reconfigure = self.job_graph.update_namespace(config_container, namespace_to_reconfigure)
+        else:
+            self.job_graph = JobGraph(config_container)
         # This factory is how Tron internally manages scheduling jobs
         factory = self.build_job_scheduler_factory(master_config, self.job_graph)
+        previous_job_names = set(self.jobs.get_names())
         updated_jobs = self.jobs.update_from_config(
             config_container.get_jobs(),
             factory,
             reconfigure,
             namespace_to_reconfigure,
+            job_names_to_reconfigure,
         )
 
         # We will build the schedulers once the watcher is invoked
         log.info(
             f"Tron built the schedulers for Tron jobs internally! Time elapsed since Tron started {time.time() - self.boot_time}s"
         )
-        self.state_watcher.watch_all(updated_jobs, [Job.NOTIFY_STATE_CHANGE, Job.NOTIFY_NEW_RUN])
+        for job in updated_jobs:
+            self.state_watcher.watch(job, [Job.NOTIFY_STATE_CHANGE, Job.NOTIFY_NEW_RUN])
+            change_log.record_job(job)
+        for job_name in previous_job_names - set(self.jobs.get_names()):
+            change_log.record_job_removed(job_name)
 
         # Do this last so that all Job objects, schedulers, and action graphs are fully built and linked within the JobCollection
         self._update_metrics()
@@ -33,6 +33,13 @@ tron_dynamodb_partitions_histogram = Histogram(
     buckets=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, float("inf")],
 )
 
+# Only submissions which were actually held back by the rate limit are observed
+tron_k8s_submit_delay_seconds_histogram = Histogram(
+    "tron_k8s_submit_delay_seconds",
+    "Distribution of how long Kubernetes task submissions were delayed by the submission rate limit",
+    buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, float("inf")],
+)
+
 tron_job_count_gauge = Gauge("tron_job_count", "Total number of Jobs configured in Tron")
 tron_job_runs_created_counter = Counter("tron_job_runs_created", "Total number of JobRuns created")
 tron_job_runs_completed_counter = Counter(
@@ -79,6 +86,35 @@ duration_buckets_sec = [
     float("inf"),
 ]
 
+tron_concurrency_running_gauge = Gauge(
+    "tron_concurrency_running",
+    "Number of ActionRuns holding a concurrency slot",
+    ["scope", "key"],
+)
+tron_concurrency_waiting_gauge = Gauge(
+    "tron_concurrency_waiting",
+    "Number of ActionRuns waiting for a concurrency slot",
+    ["namespace"],
+)
+tron_concurrency_wait_seconds_histogram = Histogram(
+    "tron_concurrency_wait_seconds",
+    "Distribution of how long ActionRuns waited for a concurrency slot",
+    ["namespace"],
+    buckets=duration_buckets_sec,
+)
+
+tron_api_queue_depth_gauge = Gauge(
+    "tron_api_queue_depth",
+    "Number of API requests waiting for a thread or the state lock",
+    ["pool"],
+)
+tron_api_wait_seconds_histogram = Histogram(
+    "tron_api_wait_seconds",
+    "Distribution of how long API requests waited for a thread or the state lock",
+    ["pool"],
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf")],
+)
+
 # We can get more granular with these, but it's a good start. As it is right now, this looks like:
 #
 # Total Startup Time (tron_last_startup_duration_seconds)
@@ -72,6 +72,45 @@ def scheduler_from_config(config, time_zone):
         )
 
 
+def _get_shared_run_times(schedulers, start_time, get_matches):
+    """Call get_matches(time_spec, start_time) for each scheduler and return
+    the results in the same order as schedulers. Schedulers with an equal time
+    specification share one computation, so this stays cheap for many jobs
+    with the same few schedules.
+    """
+    matches = {}
+    run_times = []
+    for scheduler in schedulers:
+        localized_start = scheduler.localize(start_time)
+        key = (scheduler.time_spec, localized_start)
+        if key not in matches:
+            matches[key] = get_matches(scheduler.time_spec, localized_start)
+        run_times.append(matches[key])
+    return run_times
+
+
+def get_next_run_times(schedulers, start_time, count):
+    """Returns a list with the next `count` run times after start_time
+    (without jitter) for each scheduler, in the same order as schedulers.
+    """
+    return _get_shared_run_times(
+        schedulers,
+        start_time,
+        lambda time_spec, start: time_spec.get_matches(start, count),
+    )
+
+
+def get_run_times_until(schedulers, start_time, end_time):
+    """Returns a list with every run time after start_time and up to end_time
+    (without jitter) for each scheduler, in the same order as schedulers.
+    """
+    return _get_shared_run_times(
+        schedulers,
+        start_time,
+        lambda time_spec, start: time_spec.get_matches_until(start, end_time),
+    )
+
+
 def get_jitter(time_delta):
     if not time_delta:
         return datetime.timedelta()
@@ -134,8 +173,10 @@ class GeneralScheduler:
             timezone=time_zone.zone if time_zone else None,
         )
 
-    def next_run_time(self, start_time):
-        """Find the next time to run."""
+    def localize(self, start_time):
+        """Return start_time in this scheduler's time zone, or the current
+        time if start_time is None.
+        """
         if not start_time:
             start_time = timeutils.current_time(tz=self.time_zone)
         elif self.time_zone:
@@ -149,9 +190,17 @@ class GeneralScheduler:
                 # tz-naive start times need to be localized first to the requested
                 # time zone.
                 start_time = trontimespec.naive_as_timezone(start_time, self.time_zone)
+        return start_time
 
+    def next_run_time(self, start_time):
+        """Find the next time to run."""
+        start_time = self.localize(start_time)
         return self.time_spec.get_match(start_time) + get_jitter(self.jitter)
 
+    def next_run_times(self, start_time, count):
+        """Find the next `count` times to run, without jitter."""
+        return self.time_spec.get_matches(self.localize(start_time), count)
+
     def __str__(self):
         return f"{self.name} {self.original}{get_jitter_str(self.jitter)}"
 
@@ -4,13 +4,11 @@ Tools for managing and properly closing file handles.
 import logging
 import os.path
 import shutil
-import sys
 import time
 from collections import OrderedDict
-from subprocess import PIPE
-from subprocess import Popen
 from threading import RLock
 
+from tron.utils import filetail
 from tron.utils import maybe_encode
 
 log = logging.getLogger(__name__)
@@ -175,22 +173,14 @@ class OutputStreamSerializer:
     def full_path(self, filename):
         return os.path.join(self.base_path, filename)
 
-    # TODO: do not use subprocess
     def tail(self, filename: str, num_lines: int | None = None) -> list[str]:
-        """Tail a file using `tail`."""
+        """Return the last num_lines lines of a file, or all the lines which
+        fit in filetail.MAX_TAIL_BYTES.
+        """
         path = self.full_path(filename)
         if not path or not os.path.exists(path):
             return []
-        if not num_lines:
-            num_lines = sys.maxsize
-
-        try:
-            cmd = ("tail", "-n", str(num_lines), path)
-            tail_sub = Popen(cmd, stdout=PIPE)
-            return list(line.rstrip().decode() for line in (tail_sub.stdout if tail_sub.stdout else []))
-        except OSError as e:
-            log.error(f"Could not tail {path}: {e}")
-            return []
+        return filetail.file_tailer.tail(path, num_lines)
 
     def open(self, filename):
         """Return a FileHandleManager for the output path."""
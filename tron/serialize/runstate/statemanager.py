@@ -11,6 +11,7 @@ from typing import cast
 from tron.config import schema
 from tron.core import job
 from tron.core import jobrun
+from tron.core.change_log import change_log
 from tron.mesos import MesosClusterRepository
 from tron.serialize import runstate
 from tron.serialize.runstate.dynamodb_state_store import DynamoDBStateStore
@@ -259,13 +260,19 @@ class StateChangeWatcher(observer.Observer):
                 else:
                     log.debug(f"Watching new run {event_data}")
                     self.watch(event_data)
+                    change_log.record_job_run(event_data)
             else:
                 self.save_job(observable)
+                change_log.record_job(observable)
         elif isinstance(observable, jobrun.JobRun):
             if event == jobrun.JobRun.NOTIFY_REMOVED:
                 self.delete_job_run(observable)
+                change_log.record_job_run_removed(observable)
             else:
                 self.save_job_run(observable)
+                change_log.record_job_run(observable)
+                if event_data is not None:
+                    change_log.record_action_run(observable, event_data)
 
     def save_job(self, job):
         self._save_object(runstate.JOB_STATE, job)
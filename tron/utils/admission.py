@@ -0,0 +1,138 @@
+"""
+Admission control for bursts of work that all become ready in the same
+reactor tick, such as hundreds of jobs scheduled at the top of the hour.
+
+An AdmissionQueue lets calls through at a sustained rate with a token bucket.
+Calls that arrive while the bucket is empty wait in a priority queue and are
+released, highest priority first, as tokens refill. Each call is told how long
+it was held back so callers can report the delay.
+"""
+import heapq
+import itertools
+import logging
+
+from tron.utils.timerqueue import timer_queue
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, and up to `burst`
+    at once after a quiet period.
+    """
+
+    def __init__(self, rate, burst, clock):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.last_refill = clock.seconds()
+
+    def _refill(self):
+        now = self.clock.seconds()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self):
+        """Take a token if one is available and return True, else False."""
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def seconds_until_available(self):
+        """Return how long until a token will be available."""
+        self._refill()
+        return max(1 - self.tokens, 0) / self.rate
+
+
+class AdmissionQueue:
+    """Rate limit calls with a TokenBucket, queueing the calls which can't be
+    admitted yet by priority (higher first) and then arrival order. A rate of
+    None disables the limit and every call is admitted immediately.
+    """
+
+    def __init__(self, name, rate=None, burst=1, timers=None):
+        self.name = name
+        self.timers = timers if timers is not None else timer_queue
+        self._heap = []
+        self._counter = itertools.count()
+        self._drain_call = None
+        self.admitted = 0
+        self.delayed = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+        self.bucket = None
+        self.configure(rate, burst)
+
+    def configure(self, rate, burst=1):
+        """Change the rate limit. Queued calls are kept and drained at the
+        new rate. The tokens already in the bucket are kept (up to the new
+        burst), so reconfiguring doesn't allow another burst.
+        """
+        self.rate = rate
+        previous = self.bucket
+        if not rate:
+            self.bucket = None
+        elif previous is None or previous.rate != rate or previous.burst != max(burst, 1):
+            self.bucket = TokenBucket(rate, burst, self.timers.clock)
+            if previous is not None:
+                previous._refill()
+                self.bucket.tokens = min(previous.tokens, self.bucket.burst)
+        self._schedule_drain()
+
+    def admit(self, func, *args, priority=0):
+        """Call func(*args, delay) as soon as the rate limit allows, where
+        delay is the number of seconds the call was held back.
+        """
+        if not self._heap and (self.bucket is None or self.bucket.try_acquire()):
+            self._run(func, args, 0.0)
+            return
+
+        enqueued_at = self.timers.clock.seconds()
+        heapq.heappush(self._heap, (-priority, next(self._counter), enqueued_at, func, args))
+        self._schedule_drain()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def get_stats(self):
+        return {
+            "rate": self.rate,
+            "queued": len(self),
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "total_delay": self.total_delay,
+            "max_delay": self.max_delay,
+        }
+
+    def _run(self, func, args, delay):
+        self.admitted += 1
+        if delay > 0:
+            self.delayed += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+        func(*args, delay)
+
+    def _schedule_drain(self):
+        if self._drain_call is not None:
+            self._drain_call.cancel()
+            self._drain_call = None
+        if not self._heap:
+            return
+        wait = self.bucket.seconds_until_available() if self.bucket else 0
+        self._drain_call = self.timers.call_later(wait, self._drain)
+
+    def _drain(self):
+        self._drain_call = None
+        now = self.timers.clock.seconds()
+        while self._heap and (self.bucket is None or self.bucket.try_acquire()):
+            _, _, enqueued_at, func, args = heapq.heappop(self._heap)
+            try:
+                self._run(func, args, now - enqueued_at)
+            except Exception:
+                log.exception(f"Error running call admitted by {self.name}")
+        if self._heap:
+            log.info(f"{self.name}: {len(self._heap)} calls waiting for admission")
+        self._schedule_drain()
@@ -0,0 +1,257 @@
+"""
+Read the last lines of a file without running `tail`.
+
+Files are read backwards, a block at a time, until enough lines are found, so
+the cost of a tail depends on the lines returned rather than on the size of
+the file. Files of at least MMAP_THRESHOLD bytes are searched through mmap
+instead, without copying blocks. No more than MAX_TAIL_BYTES are read for one
+tail, so asking for every line of a huge file returns only the last ones.
+
+Clients following the output of a running action tail the same files over and
+over. The offset each file was read up to, and the lines found, are kept in
+an LRU cache, so the next tail of the file only reads what was appended. The
+bytes just before the offset are kept too, and compared with the file, so a
+file rewritten in place isn't mistaken for one which was appended to.
+Clients which keep their own offset use read_lines() to read only the lines
+after it.
+"""
+import collections
+import logging
+import mmap
+import os
+import threading
+from typing import BinaryIO
+
+log = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+MAX_TAIL_BYTES = 16 * 1024 * 1024
+MAX_FOLLOWED_FILES = 256
+# Bytes before the offset a file was read up to which are kept, to check that
+# the file wasn't rewritten in place since
+CHECK_BYTES = 64
+
+
+def _rfind_blocks(fh, end, limit, count):
+    """Return the offset after the count-th newline before end, searching no
+    further back than limit, or None if there aren't that many.
+    """
+    pos = end
+    while pos > limit:
+        start = max(pos - BLOCK_SIZE, limit)
+        fh.seek(start)
+        block = fh.read(pos - start)
+        index = len(block)
+        while True:
+            index = block.rfind(b"\n", 0, index)
+            if index < 0:
+                break
+            count -= 1
+            if not count:
+                return start + index + 1
+        pos = start
+    return None
+
+
+def _rfind_mmap(mapped, end, limit, count):
+    index = end
+    while True:
+        index = mapped.rfind(b"\n", limit, index)
+        if index < 0:
+            return None
+        count -= 1
+        if not count:
+            return index + 1
+
+
+def _find_start(fh, mapped, size, num_lines, limit):
+    """Return the offset of the first of the last num_lines lines, or limit
+    if they don't all start after it.
+    """
+    if not num_lines:
+        return limit
+    # A newline at the very end ends the last line, rather than starting
+    # another
+    end = size - 1 if size and _read_at(fh, mapped, size - 1, size) == b"\n" else size
+    if mapped is not None:
+        found = _rfind_mmap(mapped, end, limit, num_lines)
+    else:
+        found = _rfind_blocks(fh, end, limit, num_lines)
+    return limit if found is None else found
+
+
+def _read_tail(fh, size, num_lines, max_bytes):
+    """Return (lines, partial) for the end of a file: its last complete
+    lines, without their newlines, and what follows the last newline.
+    """
+    limit = max(size - max_bytes, 0)
+    mapped = mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ) if size >= MMAP_THRESHOLD else None
+    try:
+        start = _find_start(fh, mapped, size, num_lines, limit)
+        data = _read_at(fh, mapped, start, size)
+        partial_start = start == limit and limit > 0 and _read_at(fh, mapped, limit - 1, limit) != b"\n"
+    finally:
+        if mapped is not None:
+            mapped.close()
+
+    parts = data.split(b"\n")
+    if partial_start:
+        # The budget ran out in the middle of a line
+        parts = parts[1:]
+    if not parts:
+        return [], b""
+    return parts[:-1], parts[-1]
+
+
+def _get_file_id(stat):
+    return stat.st_dev, stat.st_ino
+
+
+def read_lines(path, file_id=None, offset=None, num_lines=None, max_bytes=MAX_TAIL_BYTES, final=False):
+    """Return (lines, file_id, offset) for the lines of a file after a byte
+    offset, and the offset to read from next time. Without an offset, or if
+    the file was replaced (it isn't file_id) or truncated since, the last
+    num_lines lines are read instead.
+
+    Up to max_bytes are read. Unless `final` (nothing more will be written),
+    a line is only returned once its newline is written.
+    """
+    with open(path, "rb") as fh:
+        stat = os.fstat(fh.fileno())
+        size = stat.st_size
+        skip_partial = False
+        if offset is None or file_id != _get_file_id(stat) or size < offset:
+            limit = max(size - max_bytes, 0)
+            if num_lines and not final and size and _read_at(fh, None, size - 1, size) != b"\n":
+                # The last line isn't complete, so it's not returned yet
+                num_lines += 1
+            offset = _find_start(fh, None, size, num_lines, limit)
+            skip_partial = offset == limit and limit > 0 and _read_at(fh, None, limit - 1, limit) != b"\n"
+        data = _read_at(fh, None, offset, min(size, offset + max_bytes))
+
+    if skip_partial:
+        # The budget ran out in the middle of a line
+        skip = data.find(b"\n") + 1
+        offset, data = offset + skip, data[skip:]
+    if not final:
+        end = data.rfind(b"\n") + 1
+        if end or len(data) < max_bytes:
+            data = data[:end]
+        # Otherwise the line is longer than max_bytes, so it's returned in
+        # parts
+
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()
+    decoded = [line.rstrip().decode("utf-8", errors="replace") for line in lines]
+    return decoded, _get_file_id(stat), offset + len(data)
+
+
+def _read_at(fh, mapped, start, end):
+    if mapped is not None:
+        return mapped[start:end]
+    fh.seek(start)
+    return fh.read(end - start)
+
+
+def _decode(lines: list[bytes], partial: bytes, num_lines: int | None) -> list[str]:
+    if partial:
+        lines = lines + [partial]
+    if num_lines:
+        lines = lines[-num_lines:]
+    return [line.rstrip().decode("utf-8", errors="replace") for line in lines]
+
+
+class FollowedFile:
+    """Where a file was last read up to, and the lines found by then."""
+
+    __slots__ = ["file_id", "offset", "lines", "partial", "check"]
+
+    def __init__(self, file_id, offset, lines, partial, check):
+        self.file_id = file_id
+        self.offset = offset
+        self.lines = lines
+        self.partial = partial
+        # The bytes just before offset
+        self.check = check
+
+
+class FileTailer:
+    def __init__(self, max_files=MAX_FOLLOWED_FILES):
+        self.max_files = max_files
+        # (path, num_lines, max_bytes) -> FollowedFile, least recently used
+        # first
+        self.followed = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get_followed(self, key, fh, file_id, size):
+        with self.lock:
+            followed = self.followed.get(key)
+        if followed is None:
+            return None
+        if (
+            followed.file_id != file_id
+            or size < followed.offset
+            or _read_at(fh, None, followed.offset - len(followed.check), followed.offset) != followed.check
+        ):
+            # Replaced, truncated or rewritten, so the cached lines are wrong
+            with self.lock:
+                if self.followed.get(key) is followed:
+                    del self.followed[key]
+            return None
+        with self.lock:
+            if key in self.followed:
+                self.followed.move_to_end(key)
+        return followed
+
+    def _set_followed(self, key, followed):
+        with self.lock:
+            self.followed[key] = followed
+            self.followed.move_to_end(key)
+            while len(self.followed) > self.max_files:
+                self.followed.popitem(last=False)
+
+    def tail(self, path: str, num_lines: int | None = None, max_bytes: int = MAX_TAIL_BYTES) -> list[str]:
+        """Return the last num_lines lines of a file (or as many as are in
+        its last max_bytes) without trailing whitespace.
+        """
+        try:
+            with open(path, "rb") as fh:
+                stat = os.fstat(fh.fileno())
+                return self._tail(fh, path, _get_file_id(stat), stat.st_size, num_lines, max_bytes)
+        except (OSError, ValueError) as e:
+            log.error(f"Could not tail {path}: {e}")
+            return []
+
+    def _tail(
+        self,
+        fh: BinaryIO,
+        path: str,
+        file_id: tuple[int, int],
+        size: int,
+        num_lines: int | None,
+        max_bytes: int,
+    ) -> list[str]:
+        if not num_lines:
+            lines, partial = _read_tail(fh, size, num_lines, max_bytes)
+            return _decode(lines, partial, num_lines)
+
+        key = (path, num_lines, max_bytes)
+        followed = self._get_followed(key, fh, file_id, size)
+        if followed is not None and size - followed.offset + len(followed.partial) <= max_bytes:
+            if size == followed.offset:
+                return _decode(followed.lines, followed.partial, num_lines)
+            fh.seek(followed.offset)
+            parts = (followed.partial + fh.read(size - followed.offset)).split(b"\n")
+            lines, partial = (followed.lines + parts[:-1])[-num_lines:], parts[-1]
+        else:
+            lines, partial = _read_tail(fh, size, num_lines, max_bytes)
+            lines = lines[-num_lines:]
+
+        check = _read_at(fh, None, max(size - CHECK_BYTES, 0), size)
+        self._set_followed(key, FollowedFile(file_id, size, lines, partial, check))
+        return _decode(lines, partial, num_lines)
+
+
+file_tailer = FileTailer()
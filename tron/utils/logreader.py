@@ -1,7 +1,14 @@
+import collections
+import concurrent.futures
 import datetime
+import itertools
 import json
 import logging
 import operator
+import os
+import re
+import threading
+import time
 from collections.abc import Iterator
 from functools import lru_cache
 
@@ -32,6 +39,36 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 USE_SRV_CONFIGS = -1
+SOACONFIG_DIR = "/nail/etc/services"
+MAX_CACHED_DAYS = 64
+MAX_FETCH_THREADS = 4
+# Days which ended this long ago are complete. Lines can reach S3 a while
+# after they're logged, so later days are only cached briefly.
+SETTLE_SECONDS = 60 * 60
+CURRENT_DAY_TTL_SECONDS = 30
+RUN_NUMBER_RE = re.compile(r'"tron_run_number"\s*:\s*"?(-?\d+)')
+
+
+class FileLogsReader:
+    """A stand-in for S3LogsReader which reads streams from local files, one
+    per day, named <log_dir>/<stream>/<YYYY-MM-DD>.log. Whole days are read,
+    whatever the times in the range.
+    """
+
+    def __init__(self, log_dir: str) -> None:
+        self.log_dir = log_dir
+
+    def get_log_reader(
+        self, log_name: str, start_datetime: datetime.datetime, end_datetime: datetime.datetime
+    ) -> Iterator[str]:
+        for day in get_days(start_datetime, end_datetime):
+            path = os.path.join(self.log_dir, log_name, f"{day.isoformat()}.log")
+            try:
+                with open(path) as f:
+                    for line in f:
+                        yield line.rstrip("\n")
+            except FileNotFoundError:
+                continue
 
 
 @lru_cache(maxsize=1)
@@ -45,17 +82,65 @@ def get_superregion() -> str:
         return f.read().strip()
 
 
+class SoaConfigCache:
+    """The service each action of a namespace runs as, from the namespace's
+    yelp-soaconfig file. Files are parsed once and parsed again only when
+    their mtime or size changes.
+    """
+
+    def __init__(self) -> None:
+        # path -> ((mtime, size), {(job_name, action): service})
+        self.services: dict[str, tuple[tuple[int, int], dict[tuple[str, str], str]]] = {}
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.services.clear()
+
+    def get_services(self, namespace: str, paasta_cluster: str) -> dict[tuple[str, str], str]:
+        path = os.path.join(SOACONFIG_DIR, namespace, f"tron-{paasta_cluster}.yaml")
+        stat = os.stat(path)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            cached = self.services.get(path)
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+
+        services: dict[tuple[str, str], str] = {}
+        try:
+            with open(path) as f:
+                config = yaml.load(f, Loader=yaml.CSafeLoader)
+            services = _index_services(config)
+        finally:
+            # Broken files are cached too, so they're not parsed again until
+            # they change
+            with self.lock:
+                self.services[path] = (file_key, services)
+        return services
+
+
+def _index_services(config: dict) -> dict[tuple[str, str], str]:
+    services = {}
+    for job_name, job_config in (config or {}).items():
+        for action, action_config in ((job_config or {}).get("actions") or {}).items():
+            service = (action_config or {}).get("service")
+            if service:
+                services[(job_name, action)] = service
+    return services
+
+
+soaconfig_cache = SoaConfigCache()
+
+
 def decompose_action_id(action_run_id: str, paasta_cluster: str) -> tuple[str, str, str, str]:
     namespace, job_name, run_num, action = action_run_id.split(".")
     # NOTE: some services use an unfortunate feature that allows an action to use another service's
     # image - thus we need to read from soaconfigs to determine the "real" service name since we're
     # not passing this information down to tron atm
     try:
-        with open(f"/nail/etc/services/{namespace}/tron-{paasta_cluster}.yaml") as f:
-            config = yaml.load(f, Loader=yaml.CSafeLoader)
-            service: str | None = config.get(job_name, {}).get("actions", {}).get(action, {}).get("service", None)
-            if service:
-                return service, job_name, run_num, action
+        service = soaconfig_cache.get_services(namespace, paasta_cluster).get((job_name, action))
+        if service:
+            return service, job_name, run_num, action
     except FileNotFoundError:
         # afaict, this should only be possible if the service is getting deleted and we haven't run setup_tron_namespace yet
         log.warning(f"yelp-soaconfig file tron-{paasta_cluster}.yaml not found for action_run_id {action_run_id}.")
@@ -71,6 +156,135 @@ def decompose_action_id(action_run_id: str, paasta_cluster: str) -> tuple[str, s
     return namespace, job_name, run_num, action
 
 
+def get_days(start_datetime: datetime.datetime, end_datetime: datetime.datetime) -> list[datetime.date]:
+    """Return the UTC days from start_datetime to end_datetime."""
+    start = start_datetime.astimezone(datetime.timezone.utc).date()
+    end = end_datetime.astimezone(datetime.timezone.utc).date()
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class LogDayIndex:
+    """The lines of a stream logged on one day, by run number. Only the run
+    number of each line is parsed, so building the index is cheap, and only
+    the lines of the run being read are decoded.
+    """
+
+    __slots__ = ["lines_by_run", "num_lines", "malformed_lines", "max_lines", "truncated", "expires_at"]
+
+    def __init__(self, max_lines: int | None, expires_at: float | None) -> None:
+        self.lines_by_run: dict[int, list[str]] = collections.defaultdict(list)
+        self.num_lines = 0
+        self.malformed_lines = 0
+        self.max_lines = max_lines
+        self.truncated = False
+        self.expires_at = expires_at
+
+    def add_lines(self, stream: Iterator[str], stream_name: str) -> None:
+        for line in stream:
+            # Like PaaSTALogs.fetch(), stop after max_lines so huge streams
+            # can't hold up tron
+            if self.max_lines is not None and self.num_lines == self.max_lines:
+                self.truncated = True
+                break
+            self.num_lines += 1
+
+            match = RUN_NUMBER_RE.search(line)
+            if match:
+                self.lines_by_run[int(match.group(1))].append(line)
+                continue
+            try:
+                payload = json.loads(line)
+            except json.decoder.JSONDecodeError:
+                log.error(f"Unable to decode log line from stream ({stream_name}): {line}")
+                self.malformed_lines += 1
+                continue
+            self.lines_by_run[int(payload.get("tron_run_number", -1))].append(line)
+
+    def covers(self, max_lines: int | None, now: float) -> bool:
+        """Return True if the index can be used to read up to max_lines."""
+        if self.expires_at is not None and now >= self.expires_at:
+            return False
+        if not self.truncated:
+            return True
+        return max_lines is not None and self.max_lines is not None and max_lines <= self.max_lines
+
+
+class LogStreamCache:
+    """Indexes of the days of PaaSTA log streams read recently. Reading the
+    output of a Kubernetes action run reads every line its job logged on the
+    days it ran; with the index, the next read of any run of the job on those
+    days reads nothing from S3.
+    """
+
+    def __init__(self, max_days: int = MAX_CACHED_DAYS) -> None:
+        self.max_days = max_days
+        # (superregion, stream_name, day) -> LogDayIndex, least recently used
+        # first
+        self.indexes: collections.OrderedDict[tuple[str, str, datetime.date], LogDayIndex] = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.indexes.clear()
+
+    def _get(self, key: tuple[str, str, datetime.date], max_lines: int | None, now: float) -> LogDayIndex | None:
+        with self.lock:
+            index = self.indexes.get(key)
+            if index is None or not index.covers(max_lines, now):
+                return None
+            self.indexes.move_to_end(key)
+            return index
+
+    def _set(self, key: tuple[str, str, datetime.date], index: LogDayIndex) -> None:
+        with self.lock:
+            self.indexes[key] = index
+            self.indexes.move_to_end(key)
+            while len(self.indexes) > self.max_days:
+                self.indexes.popitem(last=False)
+
+    def get_indexes(
+        self, superregion: str, stream_name: str, days: list[datetime.date], max_lines: int | None
+    ) -> list[LogDayIndex]:
+        """Return the index of each day of a stream, reading the days which
+        aren't cached from S3 concurrently.
+        """
+        now = time.time()
+        indexes: dict[datetime.date, LogDayIndex] = {}
+        missing = []
+        for day in days:
+            index = self._get((superregion, stream_name, day), max_lines, now)
+            if index is None:
+                missing.append(day)
+            else:
+                indexes[day] = index
+        if missing:
+            reader = S3LogsReader(superregion)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_FETCH_THREADS) as executor:
+                results = executor.map(
+                    lambda day: self._read_day(reader, stream_name, day, max_lines, now),
+                    missing,
+                )
+                for day, index in zip(missing, results):
+                    self._set((superregion, stream_name, day), index)
+                    indexes[day] = index
+        return [indexes[day] for day in days]
+
+    def _read_day(
+        self, reader: S3LogsReader, stream_name: str, day: datetime.date, max_lines: int | None, now: float
+    ) -> LogDayIndex:
+        start_datetime = datetime.datetime.combine(day, datetime.time(), tzinfo=datetime.timezone.utc)
+        # Ranges include their end, so this is the last moment of the day
+        end_datetime = start_datetime + datetime.timedelta(days=1, microseconds=-1)
+        settled = end_datetime.timestamp() + SETTLE_SECONDS <= now
+        index = LogDayIndex(max_lines, expires_at=None if settled else now + CURRENT_DAY_TTL_SECONDS)
+        stream = reader.get_log_reader(log_name=stream_name, start_datetime=start_datetime, end_datetime=end_datetime)
+        index.add_lines(stream, stream_name)
+        return index
+
+
+log_stream_cache = LogStreamCache()
+
+
 class PaaSTALogs:
     def __init__(self, component: str, paasta_cluster: str, action_run_id: str) -> None:
         self.component = component
@@ -89,6 +303,7 @@ class PaaSTALogs:
         self.truncated_output = False
 
     def fetch(self, stream: Iterator[str], max_lines: int | None) -> None:
+        run_num = str(self.run_num)
         for line in stream:
             if max_lines is not None and self.num_lines == max_lines:
                 self.truncated_output = True
@@ -97,6 +312,9 @@ class PaaSTALogs:
             # so we can't just truncate after seeing X number of lines for the run number in question - we
             # need to count how many total lines we've seen and bail out early to preserve tron's uptime
             self.num_lines += 1
+            if run_num not in line:
+                # Can't be a line of this run, so don't bother decoding it
+                continue
 
             try:
                 payload = json.loads(line)
@@ -129,11 +347,29 @@ def read_log_stream_for_action_run(
     paasta_cluster: str | None,
     max_lines: int | None = USE_SRV_CONFIGS,
 ) -> list[str]:
+    lines, notices = read_log_stream_parts_for_action_run(
+        action_run_id, component, min_date, max_date, paasta_cluster, max_lines
+    )
+    return lines + notices
+
+
+def read_log_stream_parts_for_action_run(
+    action_run_id: str,
+    component: str,
+    min_date: datetime.datetime | None,
+    max_date: datetime.datetime | None,
+    paasta_cluster: str | None,
+    max_lines: int | None = USE_SRV_CONFIGS,
+) -> tuple[list[str], list[str]]:
+    """Return (lines, notices) for the output of an action run: the lines it
+    logged, and messages about the output (e.g., that it was truncated) to
+    show after them.
+    """
     if min_date is None:
-        return [f"{action_run_id} has not started yet."]
+        return [], [f"{action_run_id} has not started yet."]
 
     if not s3reader_available:
-        return ["logreader (internal Yelp package) is not available - unable to display logs."]
+        return [], ["logreader (internal Yelp package) is not available - unable to display logs."]
 
     if max_lines == USE_SRV_CONFIGS:
         config_watcher = get_config_watcher()
@@ -144,7 +380,7 @@ def read_log_stream_for_action_run(
         superregion = get_superregion()
     except OSError:
         log.warning("Unable to read location mapping files from disk (/nail/etc/)")
-        return [
+        return [], [
             "Unable to determine where Tron is located. If you're seeing this inside Yelp, report this to #compute-infra"
         ]
 
@@ -165,10 +401,13 @@ def read_log_stream_for_action_run(
     )
 
     log.debug("Using S3LogsReader to retrieve logs")
-    s3_reader = S3LogsReader(superregion).get_log_reader(
-        log_name=stream_name, start_datetime=start_datetime, end_datetime=end_datetime
+    indexes = log_stream_cache.get_indexes(superregion, stream_name, get_days(start_datetime, end_datetime), max_lines)
+    paasta_logs.fetch(
+        itertools.chain.from_iterable(index.lines_by_run.get(paasta_logs.run_num, ()) for index in indexes),
+        max_lines,
     )
-    paasta_logs.fetch(s3_reader, max_lines)
+    paasta_logs.malformed_lines += sum(index.malformed_lines for index in indexes)
+    paasta_logs.truncated_output |= any(index.truncated for index in indexes)
 
     # S3LogsReader does not guarantee order of logs in the output - so we'll sort based on log timestamp set by producer.
     lines = paasta_logs.sorted_lines()
@@ -187,4 +426,4 @@ def read_log_stream_for_action_run(
     )
     truncated = truncation_message if paasta_logs.truncated_output else []
 
-    return lines + malformed + truncated
+    return lines, malformed + truncated
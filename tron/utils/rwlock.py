@@ -0,0 +1,69 @@
+"""
+A fair reader/writer lock for code running on the reactor thread.
+
+Acquiring returns a Deferred instead of blocking, so waiting for the lock
+never stalls the reactor. Waiters are granted the lock in arrival order: a
+reader which arrives while a writer is waiting queues behind the writer, so a
+steady stream of readers can't starve writers (and vice versa). Consecutive
+readers at the head of the queue share the lock.
+"""
+import collections
+
+from twisted.internet import defer
+
+READ = "read"
+WRITE = "write"
+
+
+class ReadWriteLock:
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        # deque of (mode, Deferred)
+        self.waiting = collections.deque()
+
+    def acquire_read(self):
+        return self._acquire(READ)
+
+    def acquire_write(self):
+        return self._acquire(WRITE)
+
+    def _acquire(self, mode):
+        d = defer.Deferred(canceller=self._cancel)
+        self.waiting.append((mode, d))
+        self._grant()
+        return d
+
+    def _cancel(self, d):
+        self.waiting = collections.deque(item for item in self.waiting if item[1] is not d)
+        # Waiters behind a cancelled writer may be able to go now
+        self._grant()
+
+    def release_read(self):
+        self.readers -= 1
+        self._grant()
+
+    def release_write(self):
+        self.writer = False
+        self._grant()
+
+    def _grant(self):
+        granted = []
+        while self.waiting and not self.writer:
+            mode, d = self.waiting[0]
+            if mode == WRITE:
+                if self.readers:
+                    break
+                self.writer = True
+            else:
+                self.readers += 1
+            self.waiting.popleft()
+            granted.append(d)
+
+        # Fire after updating the state so callbacks which release or
+        # acquire see a consistent lock
+        for d in granted:
+            d.callback(self)
+
+    def get_queue_depth(self):
+        return len(self.waiting)
@@ -0,0 +1,161 @@
+"""
+A priority queue of delayed calls driven by a single reactor timer.
+
+Every job wake-up used to be its own `reactor.callLater`, so with many jobs
+the reactor's delayed-call heap grew with the job count and reconfiguration
+churned it. A TimerQueue keeps all of those calls in one heap and only ever
+has one DelayedCall pending on the reactor, for the earliest deadline.
+Cancelled calls are dropped lazily when they reach the head of the heap.
+"""
+import heapq
+import itertools
+import logging
+
+from twisted.internet import reactor
+
+log = logging.getLogger(__name__)
+
+# Once the heap holds at least this many entries, rebuild it when more than
+# half of them are cancelled calls.
+COMPACT_THRESHOLD = 64
+
+
+class TimerCall:
+    """A handle for a call scheduled on a TimerQueue. It implements the
+    parts of twisted's IDelayedCall used by tron. Unlike a DelayedCall,
+    cancelling an inactive call is a no-op.
+    """
+
+    __slots__ = ("queue", "time", "seq", "func", "args", "kwargs", "cancelled", "called")
+
+    def __init__(self, queue, time, seq, func, args, kwargs):
+        self.queue = queue
+        self.time = time
+        self.seq = seq
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.called = False
+
+    def getTime(self):
+        return self.time
+
+    def active(self):
+        return not (self.cancelled or self.called)
+
+    def cancel(self):
+        if not self.active():
+            return
+        self.cancelled = True
+        self.queue._call_cancelled(self)
+
+    def __lt__(self, other):
+        return (self.time, self.seq) < (other.time, other.seq)
+
+    def __repr__(self):
+        func_name = getattr(self.func, "__qualname__", repr(self.func))
+        return f"<{self.__class__.__name__} {func_name} at {self.time:.3f}>"
+
+
+class TimerQueue:
+    """Schedules delayed calls in one heap, with a single reactor timer set
+    for whichever call is due first.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or reactor
+        self._heap = []
+        self._counter = itertools.count()
+        self._num_active = 0
+        self._wakeup = None
+
+    def call_later(self, seconds, func, *args, **kwargs):
+        """Schedule func(*args, **kwargs) to run in `seconds` seconds and
+        return a TimerCall that can be used to cancel it.
+        """
+        time = self.clock.seconds() + max(seconds, 0)
+        call = TimerCall(self, time, next(self._counter), func, args, kwargs)
+        heapq.heappush(self._heap, call)
+        self._num_active += 1
+        self._arm()
+        return call
+
+    def upcoming(self, limit=None):
+        """Return the active calls in the order they will fire."""
+        calls = sorted(call for call in self._heap if call.active())
+        return calls[:limit] if limit is not None else calls
+
+    def next_fire_time(self):
+        """Return the time the earliest active call is due, or None."""
+        self._drop_cancelled_head()
+        return self._heap[0].time if self._heap else None
+
+    def clear(self):
+        """Cancel every pending call."""
+        for call in self._heap:
+            call.cancelled = True
+        self._heap = []
+        self._num_active = 0
+        self._arm()
+
+    def __len__(self):
+        return self._num_active
+
+    def _call_cancelled(self, call):
+        self._num_active -= 1
+        if len(self._heap) >= COMPACT_THRESHOLD and self._num_active < len(self._heap) // 2:
+            self._heap = [c for c in self._heap if c.active()]
+            heapq.heapify(self._heap)
+        if not self._num_active:
+            self._arm()
+
+    def _drop_cancelled_head(self):
+        while self._heap and not self._heap[0].active():
+            heapq.heappop(self._heap)
+
+    def _arm(self):
+        """Make sure the reactor timer is set for the earliest active call.
+        A timer set earlier than that is left alone, it will re-arm when it
+        fires.
+        """
+        self._drop_cancelled_head()
+        if not self._heap:
+            if self._wakeup is not None:
+                self._wakeup.cancel()
+                self._wakeup = None
+            return
+
+        next_time = self._heap[0].time
+        if self._wakeup is not None:
+            if self._wakeup.getTime() <= next_time:
+                return
+            self._wakeup.cancel()
+        delay = max(next_time - self.clock.seconds(), 0)
+        self._wakeup = self.clock.callLater(delay, self._fire)
+
+    def _fire(self):
+        self._wakeup = None
+        now = self.clock.seconds()
+        # Collect everything that is due before running any of it, so calls
+        # scheduled by these callbacks wait for the next reactor iteration,
+        # like reactor.callLater would.
+        due = []
+        while self._heap and self._heap[0].time <= now:
+            call = heapq.heappop(self._heap)
+            if call.active():
+                due.append(call)
+
+        for call in due:
+            if not call.active():
+                continue
+            call.called = True
+            self._num_active -= 1
+            try:
+                call.func(*call.args, **call.kwargs)
+            except Exception:
+                log.exception(f"Error running {call}")
+        self._arm()
+
+
+timer_queue = TimerQueue()
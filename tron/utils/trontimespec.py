@@ -10,6 +10,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """A complete time specification based on the Google App Engine GROC spec."""
+import bisect
 import calendar
 import datetime
 
@@ -126,9 +127,33 @@ def validate_spec(source, value_range, type, default=None, allow_last=False):
     return sorted_source
 
 
+def to_bitset(values):
+    """Returns an int with a bit set for each integer in values."""
+    bits = 0
+    for value in values:
+        bits |= 1 << value
+    return bits
+
+
+def next_bit(bits, start):
+    """Returns the lowest set bit in bits which is >= start, or None."""
+    remaining = bits >> start
+    if not remaining:
+        return None
+    return start + (remaining & -remaining).bit_length() - 1
+
+
+# Number of (year, month) day lists to keep per TimeSpecification
+MAX_CACHED_MONTHS = 64
+
+
 class TimeSpecification:
     """TimeSpecification determines the next time which matches the
     configured pattern.
+
+    The hour, minute, second and month fields are compiled into bitsets so
+    the next matching value can be found with a bit scan, and the matching
+    days of each month are computed once and memoized.
     """
 
     def __init__(
@@ -179,97 +204,103 @@ class TimeSpecification:
         )
         self.timezone = get_timezone(timezone)
 
-    def next_day(self, first_day, year, month):
-        """Returns matching days for the given year and month."""
-        first_day_of_month, last_day_of_month = calendar.monthrange(
-            year,
-            month,
-        )
-
-        def map_last(day):
-            return last_day_of_month if day == TOKEN_LAST else day
-
-        def day_filter(day):
-            return first_day <= day <= last_day_of_month
-
-        def sort_days(days):
-            return sorted(filter(day_filter, days))
-
+        self.hour_bits = to_bitset(self.hours)
+        self.minute_bits = to_bitset(self.minutes)
+        self.second_bits = to_bitset(self.seconds)
+        self.month_bits = to_bitset(self.months)
+        self.first_time = datetime.time(self.hours[0], self.minutes[0], self.seconds[0])
+        self._days_by_month = {}
+
+    def _days_in_month(self, year, month):
+        """Returns the sorted tuple of all matching days in the month."""
+        key = (year, month)
+        days = self._days_by_month.get(key)
+        if days is not None:
+            return days
+
+        first_day_of_month, last_day_of_month = calendar.monthrange(year, month)
         if self.monthdays:
-            return sort_days(map_last(day) for day in self.monthdays)
-
-        start_day = (first_day_of_month + 1) % 7
+            candidates = (last_day_of_month if day == TOKEN_LAST else day for day in self.monthdays)
+        else:
+            start_day = (first_day_of_month + 1) % 7
+            candidates = (
+                ((weekday - start_day) % 7) + (ordinal - 1) * 7 + 1
+                for ordinal in self.ordinals
+                for weekday in self.weekdays
+            )
+        days = tuple(sorted({day for day in candidates if 1 <= day <= last_day_of_month}))
+
+        if len(self._days_by_month) >= MAX_CACHED_MONTHS:
+            self._days_by_month.clear()
+        self._days_by_month[key] = days
+        return days
 
-        def days_from_weekdays():
-            for ordinal in self.ordinals:
-                week = (ordinal - 1) * 7
-                for weekday in self.weekdays:
-                    yield ((weekday - start_day) % 7) + week + 1
-
-        return sort_days(days_from_weekdays())
+    def next_day(self, first_day, year, month):
+        """Returns matching days for the given year and month."""
+        days = self._days_in_month(year, month)
+        return list(days[bisect.bisect_left(days, first_day) :])
 
     def next_month(self, start_date):
         """Create a generator which yields valid months after the start month."""
-        current = start_date.month
-        potential = [m for m in self.months if m >= current]
-        year_wraps = 0
-
+        month, year = start_date.month, start_date.year
         while True:
-            if not potential:
-                year_wraps += 1
-                potential = list(self.months)
-
-            yield potential.pop(0), start_date.year + year_wraps
+            month = next_bit(self.month_bits, month)
+            if month is None:
+                month, year = next_bit(self.month_bits, 1), year + 1
+            yield month, year
+            month += 1
 
     def next_time(self, start_date, is_start_day):
         """Return the next valid time."""
-        start_hour = start_date.time().hour
-
-        def hour_filter(hour):
-            return not is_start_day or hour >= start_hour
-
-        for hour in filter(hour_filter, self.hours):
-            for minute in self.minutes:
-                for second in self.seconds:
-                    candidate = datetime.time(hour, minute, second)
-
-                    if is_start_day and start_date.time() >= candidate:
-                        continue
-
-                    return candidate
+        if not is_start_day:
+            return self.first_time
+
+        hour, minute, second = start_date.hour, start_date.minute, start_date.second
+        if self.hour_bits >> hour & 1:
+            if self.minute_bits >> minute & 1:
+                next_second = next_bit(self.second_bits, second + 1)
+                if next_second is not None:
+                    return datetime.time(hour, minute, next_second)
+            next_minute = next_bit(self.minute_bits, minute + 1)
+            if next_minute is not None:
+                return datetime.time(hour, next_minute, self.seconds[0])
+        next_hour = next_bit(self.hour_bits, hour + 1)
+        if next_hour is not None:
+            return datetime.time(next_hour, self.minutes[0], self.seconds[0])
+        return None
 
     def get_match(self, start):
         """Returns the next datetime match after start."""
         start_date = to_timezone(start, self.timezone).replace(tzinfo=None)
-
-        def get_first_day(month, year):
-            if (month, year) != (start_date.month, start_date.year):
-                return 1
-            return start_date.day
+        start_day = (start_date.year, start_date.month, start_date.day)
 
         for month, year in self.next_month(start_date):
-            first_day = get_first_day(month, year)
+            first_day = start_date.day if (year, month) == start_day[:2] else 1
 
             for day in self.next_day(first_day, year, month):
-                is_start_day = start_date.timetuple()[:3] == (year, month, day)
-
-                time = self.next_time(start_date, is_start_day)
+                time = self.next_time(start_date, (year, month, day) == start_day)
                 if time is None:
                     continue
 
-                candidate = start_date.replace(
-                    year,
-                    month,
-                    day,
-                    time.hour,
-                    time.minute,
-                    second=time.second,
-                    microsecond=0,
-                )
-                candidate = self.handle_timezone(candidate, start.tzinfo)
-                if not candidate:
-                    continue
-                return candidate
+                candidate = datetime.datetime(year, month, day, time.hour, time.minute, time.second)
+                return self.handle_timezone(candidate, start.tzinfo)
+
+    def get_matches(self, start, count):
+        """Returns the next `count` datetime matches after start."""
+        matches = []
+        for _ in range(count):
+            start = self.get_match(start)
+            matches.append(start)
+        return matches
+
+    def get_matches_until(self, start, end):
+        """Returns every datetime match after start, up to and including end."""
+        matches = []
+        match = self.get_match(start)
+        while match <= end:
+            matches.append(match)
+            match = self.get_match(match)
+        return matches
 
     # TODO: test
     def handle_timezone(self, out, tzinfo):
@@ -292,3 +323,17 @@ class TimeSpecification:
 
     def __ne__(self, other):
         return not self == other
+
+    def __hash__(self):
+        return hash(
+            (
+                tuple(self.hours),
+                tuple(self.minutes),
+                tuple(self.seconds),
+                tuple(self.ordinals),
+                tuple(self.weekdays),
+                tuple(self.months),
+                tuple(self.monthdays),
+                self.timezone,
+            )
+        )